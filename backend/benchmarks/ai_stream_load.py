@@ -0,0 +1,74 @@
+"""Load-test the streaming AI review endpoint.
+
+Start the ASGI server with the local stub model so no network access is needed, e.g.
+
+    AI_BACKEND=stub uvicorn core.asgi:application --workers 1
+
+then run
+
+    python benchmarks/ai_stream_load.py --token <access token> [--requests 50] [--url ...]
+
+Every request asks for a code review of different code, so none is served from the
+cache. Reports time to first byte and total duration per request.
+"""
+import time
+import asyncio
+import argparse
+import statistics
+
+import httpx
+
+
+async def review(client, url, token, index):
+    body = {
+        "code": f"int main() {{ return {index}; }}",
+        "reviewType": "codeReview",
+        "problem_name": "Load test",
+        "problem_statement": "",
+        "problem_constraints": "",
+    }
+    start = time.perf_counter()
+    first_byte = None
+    events = 0
+    async with client.stream("POST", url, json=body, headers={"Authorization": f"Bearer {token}"}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            if line.startswith("event: error"):
+                raise RuntimeError(f"request {index} failed")
+            if line.startswith("data:"):
+                events += 1
+    return first_byte, time.perf_counter() - start, events
+
+
+def report(label, values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    print(f"{label:<12} p50 {statistics.median(values) * 1000:8.1f} ms   p95 {p95 * 1000:8.1f} ms   max {values[-1] * 1000:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/v1/ai-review/stream/")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(timeout=None) as client:
+        results = await asyncio.gather(
+            *(review(client, args.url, args.token, index) for index in range(args.requests)),
+            return_exceptions=True,
+        )
+    elapsed = time.perf_counter() - start
+
+    completed = [result for result in results if not isinstance(result, BaseException)]
+    print(f"{len(completed)} of {args.requests} requests completed in {elapsed:.2f} s")
+    if completed:
+        report("first byte", [first_byte for first_byte, _, _ in completed])
+        report("total", [total for _, total, _ in completed])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
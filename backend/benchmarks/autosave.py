@@ -0,0 +1,157 @@
+"""Measure how many database writes and request bytes editor autosaves cost.
+
+Run from the backend directory with the usual environment (``.env``) in place:
+
+    python benchmarks/autosave.py [--editors 50] [--seconds 20] [--interval 0.3]
+
+Every editor types into a program of about 1.5 KB in bursts of two to eight seconds with
+pauses of one to five seconds between them, and saves every ``--interval`` seconds while
+it types, as the editor does. Each mode runs against a fresh database in a temporary
+directory:
+
+    full     the whole code on every save, written as soon as the write-behind thread can
+    patch    a patch to the last saved version, coalesced for AUTOSAVE_DEBOUNCE_SECONDS
+
+Saves call ``save_draft`` directly, so the numbers leave out HTTP but count the bytes of
+the request bodies the editor would send.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORDS = ["for", "int", "while", "return", "if", "else", "print", "range", "len", "x", "y", "ans", "+=", "=", "(", ")"]
+
+
+def make_program(rng):
+    lines = []
+    while sum(len(line) + 1 for line in lines) < 1500:
+        lines.append("    " * rng.randrange(3) + " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 8))))
+    return "\n".join(lines) + "\n"
+
+
+def type_some(rng, code, cursor):
+    # Mostly typing at the cursor, sometimes a deletion or a jump elsewhere.
+    if rng.random() < 0.05:
+        cursor = rng.randrange(len(code) + 1)
+    if rng.random() < 0.15 and cursor > 0:
+        removed = min(cursor, rng.randint(1, 3))
+        return code[:cursor - removed] + code[cursor:], cursor - removed
+    text = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz ()=+\n") for _ in range(rng.randint(1, 4)))
+    return code[:cursor] + text + code[cursor:], cursor + len(text)
+
+
+def get_patch(old, new):
+    # The single edit between the two texts, as the editor computes it.
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return [[prefix, len(old) - suffix, new[prefix:len(new) - suffix]]]
+
+
+def run_editor(args, mode, user_id, problem_id, seed, counts, lock):
+    from submission.autosave import save_draft
+
+    rng = random.Random(seed)
+    code = make_program(rng)
+    cursor = rng.randrange(len(code))
+    saved, version = None, 0
+    deadline = time.monotonic() + args.seconds
+    local = {"saves": 0, "bytes": 0}
+    while time.monotonic() < deadline:
+        burst_end = time.monotonic() + rng.uniform(2, 8)
+        while time.monotonic() < min(burst_end, deadline):
+            for _ in range(rng.randint(1, 4)):
+                code, cursor = type_some(rng, code, cursor)
+            body = {"user_id": user_id, "problem_id": problem_id, "language": "py"}
+            if mode == "patch" and saved is not None:
+                body.update({"patch": get_patch(saved, code), "base_version": version})
+            else:
+                body["code"] = code
+            local["bytes"] += len(json.dumps(body))
+            version = save_draft(
+                user_id, problem_id, "py", body.get("code"), body.get("patch"), body.get("base_version")
+            )
+            saved = code
+            local["saves"] += 1
+            time.sleep(args.interval)
+        time.sleep(rng.uniform(1, 5))
+    with lock:
+        counts["saves"] += local["saves"]
+        counts["bytes"] += local["bytes"]
+
+
+def measure(args, mode):
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connections
+    from accounts.models import CustomUser
+    from problems.models import Problem
+    from submission.models import CodeSaveModel
+    from submission.write_behind import writer
+
+    call_command("migrate", verbosity=0)
+    for index in range(1, args.editors + 1):
+        CustomUser.objects.create(id=index, username=f"user{index}", email=f"user{index}@example.com")
+    problem = Problem.objects.create(problem_name="Problem", problem_statement="-", constraints="-", difficulty="Easy")
+
+    if mode == "full":
+        settings.AUTOSAVE_DEBOUNCE_SECONDS = settings.AUTOSAVE_MAX_DELAY_SECONDS = 0
+    written_before = writer.get_stats()["written"]
+    counts = {"saves": 0, "bytes": 0}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=run_editor, args=(args, mode, index, problem.id, args.seed + index, counts, lock))
+        for index in range(1, args.editors + 1)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.flush()
+    assert CodeSaveModel.objects.count() == args.editors
+    connections.close_all()
+    return counts["saves"], writer.get_stats()["written"] - written_before, counts["bytes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--editors", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=0.3)
+    parser.add_argument("--mode", choices=["full", "patch"])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.mode is None:
+        print(f"{args.editors} editors typing for {args.seconds:g}s, saving every {args.interval:g}s")
+        for mode in ["full", "patch"]:
+            subprocess.run([sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--mode", mode], check=True)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="codeastra-bench-") as temp_dir:
+        os.environ["SQLITE_PATH"] = os.path.join(temp_dir, "db.sqlite3")
+        sys.path.insert(0, BACKEND_DIR)
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+        import django
+
+        django.setup()
+        saves, written, request_bytes = measure(args, args.mode)
+    print(
+        f"{args.mode:>6}: {saves} saves, {written} rows written ({saves / max(written, 1):.1f} saves per write), "
+        f"{request_bytes / saves:.0f} bytes per request"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Measure how much smaller code gets in the deduplicated, compressed blob table.
+
+Run from the backend directory with the usual environment (``.env``) in place:
+
+    python benchmarks/code_storage.py [--users 200] [--problems 30]
+
+Builds a sample in a fresh database in a temporary directory. Every user attempts about
+eight problems in C++ or Python, from a personal template as competitive programmers
+do. Each attempt is one to six submissions: a third of the resubmissions are the same
+code again, the rest change a few lines. The editor's saved code is the last version.
+Prints the report of ``python manage.py codestorage`` and the time to load a page of
+submission history next to the time to load the code of one submission.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CPP_TEMPLATE = """#include <bits/stdc++.h>
+using namespace std;
+
+#define ll long long
+#define pb push_back
+#define all(x) (x).begin(), (x).end()
+#define rep(i, a, b) for (int i = (a); i < (b); i++)
+const int MOD = 1e9 + 7;
+const ll INF = 1e18;
+
+template <typename T> void read(vector<T> &v) { for (auto &x : v) cin >> x; }
+ll power(ll b, ll e, ll m = MOD) { ll r = 1; b %= m; while (e) { if (e & 1) r = r * b % m; b = b * b % m; e >>= 1; } return r; }
+
+void solve() {
+{body}
+}
+
+int main() {
+    ios_base::sync_with_stdio(false);
+    cin.tie(NULL);
+    int t = 1;
+    {main}
+    while (t--) solve();
+    return 0;
+}
+"""
+PY_TEMPLATE = """import sys
+from collections import defaultdict, deque
+input = sys.stdin.readline
+
+
+def solve():
+{body}
+
+
+{main}
+"""
+CPP_LINES = [
+    "int n; cin >> n;", "vector<ll> a(n); read(a);", "ll ans = 0;", "sort(all(a));",
+    "rep(i, 0, n) ans += a[i] * (i + 1) % MOD;", "map<ll, int> cnt;", "for (auto x : a) cnt[x]++;",
+    "ll best = -INF;", "rep(i, 1, n) best = max(best, a[i] - a[i - 1]);", 'cout << ans % MOD << "\\n";',
+    "vector<vector<int>> g(n);", "rep(i, 0, n - 1) { int u, v; cin >> u >> v; u--; v--; g[u].pb(v); g[v].pb(u); }",
+    "vector<ll> dp(n + 1, 0);", "dp[0] = 1;", "rep(i, 1, n + 1) dp[i] = (dp[i - 1] * {n}) % MOD;",
+    'if (n == {n}) { cout << -1 << "\\n"; return; }', "priority_queue<ll> pq(all(a));", "string s; cin >> s;",
+]
+PY_LINES = [
+    "n = int(input())", "a = list(map(int, input().split()))", "ans = 0", "a.sort()",
+    "for i, x in enumerate(a):\n        ans += x * (i + {n})", "cnt = defaultdict(int)", "for x in a:\n        cnt[x] += 1",
+    "print(ans % (10 ** 9 + 7))", "q = deque([0])", "seen = [False] * n", "best = max(a) - min(a) + {n}",
+    "if n == {n}:\n        print(-1)\n        return", "s = input().strip()", "dp = [0] * (n + 1)",
+]
+
+
+def make_body(rng, language):
+    lines = CPP_LINES if language == "cpp" else PY_LINES
+    body = []
+    for _ in range(rng.randint(5, 14)):
+        line = rng.choice(lines)
+        body.append("    " + line.replace("{n}", str(rng.randint(1, 100))))
+    return body
+
+
+def render(language, body, multitest):
+    if language == "cpp":
+        return CPP_TEMPLATE.replace("{body}", "\n".join(body)).replace("{main}", "cin >> t;" if multitest else "")
+    main = "for _ in range(int(input())):\n    solve()" if multitest else "solve()"
+    return PY_TEMPLATE.replace("{body}", "\n".join(body)).replace("{main}", main)
+
+
+def build_sample(args):
+    from accounts.models import CustomUser
+    from problems.models import Problem
+    from submission.models import CodeSaveModel, SubmissionModel
+
+    rng = random.Random(args.seed)
+    problems = [
+        Problem.objects.create(problem_name=f"Problem {index}", problem_statement="-", constraints="-", difficulty="Easy")
+        for index in range(args.problems)
+    ]
+    submissions = 0
+    for index in range(args.users):
+        user = CustomUser.objects.create(username=f"user{index}", email=f"user{index}@example.com")
+        language, multitest = rng.choice(["cpp", "cpp", "py"]), rng.random() < 0.5
+        for problem in rng.sample(problems, min(len(problems), rng.randint(4, 12))):
+            body = make_body(rng, language)
+            for attempt in range(rng.randint(1, 6)):
+                if attempt and rng.random() > 1 / 3:
+                    for _ in range(rng.randint(1, 3)):
+                        body[rng.randrange(len(body))] = make_body(rng, language)[0]
+                code = render(language, body, multitest)
+                SubmissionModel.objects.create(
+                    user_id=user, problem_id=problem, language=language, code=code, verdict="Wrong Answer"
+                )
+                submissions += 1
+            CodeSaveModel.objects.create(user_id=user, problem_id=problem, language=language, code=code)
+    return submissions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--problems", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="codeastra-bench-") as temp_dir:
+        os.environ["SQLITE_PATH"] = os.path.join(temp_dir, "db.sqlite3")
+        sys.path.insert(0, BACKEND_DIR)
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+        import django
+
+        django.setup()
+
+        from django.core.management import call_command
+        from submission.models import SubmissionModel
+        from submission.serializers import SubmissionListSerializer
+
+        call_command("migrate", verbosity=0)
+        start = time.perf_counter()
+        submissions = build_sample(args)
+        print(f"{args.users} users made {submissions} submissions in {time.perf_counter() - start:.1f}s")
+        call_command("codestorage")
+
+        user_id = SubmissionModel.objects.values_list("user_id", flat=True).first()
+        start = time.perf_counter()
+        for _ in range(100):
+            rows = list(
+                SubmissionModel.objects.filter(user_id=user_id).select_related("problem_id")
+                .only(*SubmissionListSerializer.QUERY_FIELDS).order_by("-timestamp", "-id")[:20]
+            )
+            SubmissionListSerializer(rows, many=True).data
+        page_ms = (time.perf_counter() - start) * 10
+        submission_id = rows[0].id
+        start = time.perf_counter()
+        for _ in range(100):
+            SubmissionModel.objects.select_related("code_blob").only("id", "code_blob__data").get(id=submission_id).code
+        code_ms = (time.perf_counter() - start) * 10
+        print(f"page of 20 submissions: {page_ms:.2f} ms, code of one submission: {code_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
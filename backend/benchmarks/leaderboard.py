@@ -0,0 +1,118 @@
+"""Measure the contest leaderboard with simulated participants, entirely in memory.
+
+Run from the backend directory with the usual environment (``.env``) in place:
+
+    python benchmarks/leaderboard.py [--participants 100000] [--problems 10] [--verdicts 500000]
+
+Verdicts for random participants and problems are applied in submission order over a
+three hour contest, about one in three of them accepted. The run reports the cost of
+applying a verdict, of a participant's rank and of a page of standings, next to sorting
+every participant once, which is what recomputing the standings per request would cost.
+It also times saving and restoring a snapshot against replaying every verdict.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTEST_SECONDS = 3 * 60 * 60
+
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+
+def report(name, samples_us):
+    print(
+        f"{name:>28}: mean {statistics.mean(samples_us):8.1f} us  "
+        f"p50 {percentile(samples_us, 0.5):8.1f} us  p99 {percentile(samples_us, 0.99):8.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, default=100000)
+    parser.add_argument("--problems", type=int, default=10)
+    parser.add_argument("--verdicts", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    import django
+
+    django.setup()
+
+    from contests.leaderboard import ContestLeaderboard
+
+    rng = random.Random(args.seed)
+    times = sorted(rng.randrange(CONTEST_SECONDS) for _ in range(args.verdicts))
+    verdicts = [
+        (
+            rng.randrange(args.participants),
+            rng.randrange(args.problems),
+            "Accepted" if rng.random() < 0.35 else rng.choice(["Wrong Answer", "Time Limit Exceeded", "Compilation Error"]),
+            at,
+        )
+        for at in times
+    ]
+    print(f"{args.participants} participants, {args.problems} problems, {args.verdicts} verdicts")
+
+    leaderboard = ContestLeaderboard()
+    apply_us = []
+    replay_start = time.perf_counter()
+    for user_id, problem_id, verdict, at in verdicts:
+        start = time.perf_counter()
+        leaderboard.apply(user_id, problem_id, verdict, at)
+        apply_us.append((time.perf_counter() - start) * 1e6)
+    replay_seconds = time.perf_counter() - replay_start
+    print(f"{len(leaderboard)} participants ranked")
+    report("apply verdict", apply_us)
+
+    user_ids = list(leaderboard.keys)
+    rank_us = []
+    for _ in range(args.queries):
+        user_id = rng.choice(user_ids)
+        start = time.perf_counter()
+        leaderboard.get_user_row(user_id)
+        rank_us.append((time.perf_counter() - start) * 1e6)
+    report("rank of a participant", rank_us)
+
+    for name, offsets in [("top 50", [0]), ("page of 50 at random", None)]:
+        page_us = []
+        for _ in range(args.queries // 10):
+            offset = rng.randrange(len(leaderboard)) if offsets is None else offsets[0]
+            start = time.perf_counter()
+            leaderboard.get_page(offset, 50)
+            page_us.append((time.perf_counter() - start) * 1e6)
+        report(name, page_us)
+
+    sort_us = []
+    for _ in range(5):
+        start = time.perf_counter()
+        sorted(leaderboard.keys.values())
+        sort_us.append((time.perf_counter() - start) * 1e6)
+    report("sort everyone (baseline)", sort_us)
+
+    start = time.perf_counter()
+    snapshot = json.dumps(leaderboard.to_dict(), separators=(",", ":"))
+    save_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = ContestLeaderboard.from_dict(json.loads(snapshot))
+    restore_seconds = time.perf_counter() - start
+    assert restored.get_page(0, 1000) == leaderboard.get_page(0, 1000)
+    print(
+        f"snapshot {len(snapshot) / 1e6:.1f} MB: saved in {save_seconds:.2f}s, restored in {restore_seconds:.2f}s, "
+        f"against {replay_seconds:.2f}s to replay every verdict"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare start-up latency of Python submissions with and without the fork server.
+
+Run from the backend directory with the usual environment (``.env``) in place:
+
+    python benchmarks/python_startup.py [--runs 50]
+
+Every run judges a small program through ``run_program``, so the numbers include the
+launcher or fork server, the pipes and the usage report, just as for a real submission.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+
+django.setup()
+
+from django.conf import settings
+from submission import utils
+
+PROGRAM = "import sys\nfrom collections import Counter\nprint(sum(map(int, sys.stdin.read().split())))\n"
+
+
+def measure(runs, folder_path, unique_name):
+    command, error = utils.prepare_program(PROGRAM, "py", folder_path, unique_name)
+    if error:
+        raise SystemExit(error["details"])
+
+    # One untimed run, so the warm case does not include starting the fork server.
+    utils.run_program(command, b"1 2 3", "bytes", timeout_seconds=5)
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = utils.run_program(command, b"1 2 3", "bytes", timeout_seconds=5)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if result["status"] != "success":
+            raise SystemExit(f"Unexpected result: {result}")
+    return latencies
+
+
+def report(label, latencies):
+    latencies = sorted(latencies)
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{label:<6} mean {statistics.mean(latencies):7.2f} ms   "
+        f"p50 {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    results = {}
+    with utils.code_workspace() as (folder_path, unique_name):
+        for label, use_forkserver in [("cold", False), ("warm", True)]:
+            settings.JUDGE_PYTHON_FORKSERVER = use_forkserver
+            results[label] = measure(args.runs, folder_path, unique_name)
+            report(label, results[label])
+
+    speedup = statistics.median(results["cold"]) / statistics.median(results["warm"])
+    print(f"warm start is {speedup:.1f}x faster (median)")
+
+
+if __name__ == "__main__":
+    main()
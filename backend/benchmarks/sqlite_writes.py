@@ -0,0 +1,173 @@
+"""Measure write throughput to SQLite from many processes and threads at once.
+
+Run from the backend directory with the usual environment (``.env``) in place:
+
+    python benchmarks/sqlite_writes.py [--processes 4] [--threads 8] [--seconds 5]
+
+Each mode runs against a fresh database in a temporary directory:
+
+    baseline      SQLITE_TUNED=False, DB_WRITE_BEHIND=False: the stock sqlite3 backend
+    tuned         WAL, synchronous=NORMAL, busy timeout and page cache, writes made directly
+    write-behind  tuned, with autosaves queued for the batching writer thread
+
+Every worker thread loops over the two writes the app makes most: an autosave through
+``save_code`` (four in five) and a ``SubmissionModel`` insert, as a judge verdict does,
+pointing at the code blob its queued job already stored.
+Autosaves go to a fixed set of editors, so some of them overwrite each other as they do
+in real use. A worker waits for its queued writes to be committed before it stops, and
+that time counts.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+import multiprocessing
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    "baseline": {"SQLITE_TUNED": "False", "DB_WRITE_BEHIND": "False"},
+    "tuned": {"SQLITE_TUNED": "True", "DB_WRITE_BEHIND": "False"},
+    "write-behind": {"SQLITE_TUNED": "True", "DB_WRITE_BEHIND": "True"},
+}
+USERS = 50
+PROBLEMS = 5
+SUBMITTED_CODE = "print(1)\n"
+
+
+def setup_django():
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    import django
+
+    django.setup()
+
+
+def run_worker(args, results):
+    import threading
+    from django.db import OperationalError, connection
+    from submission.models import CodeBlobModel, SubmissionModel
+    from submission.write_behind import save_code, writer
+
+    counts = {"autosaves": 0, "submissions": 0, "locked": 0, "latencies": []}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+    code_blob_id = CodeBlobModel.get_hash(SUBMITTED_CODE)
+
+    def loop():
+        rng = random.Random()
+        local = {"autosaves": 0, "submissions": 0, "locked": 0, "latencies": []}
+        while time.monotonic() < deadline:
+            user_id, problem_id = rng.randint(1, USERS), rng.randint(1, PROBLEMS)
+            start = time.perf_counter()
+            try:
+                if rng.random() < 0.8:
+                    save_code(user_id, problem_id, "py", "print(%d)\n" % rng.random())
+                    local["autosaves"] += 1
+                else:
+                    SubmissionModel.objects.create(
+                        user_id_id=user_id, problem_id_id=problem_id, language="py",
+                        code_blob_id=code_blob_id, verdict="Accepted", time_taken=10, memory_taken=1024,
+                    )
+                    local["submissions"] += 1
+            except OperationalError:
+                local["locked"] += 1
+            local["latencies"].append((time.perf_counter() - start) * 1000)
+        connection.close()
+        with lock:
+            for key in ["autosaves", "submissions", "locked"]:
+                counts[key] += local[key]
+            counts["latencies"].extend(local["latencies"])
+
+    threads = [threading.Thread(target=loop) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.flush()
+    counts["finished_at"] = time.monotonic()
+    results.put(counts)
+
+
+def measure_child(args):
+    setup_django()
+
+    from django.core.management import call_command
+    from django.db import connections
+    from accounts.models import CustomUser
+    from problems.models import Problem
+    from submission.models import CodeBlobModel
+
+    call_command("migrate", verbosity=0)
+    CodeBlobModel.store([SUBMITTED_CODE])
+    for index in range(1, USERS + 1):
+        CustomUser.objects.create(id=index, username=f"user{index}", email=f"user{index}@example.com")
+    for index in range(1, PROBLEMS + 1):
+        Problem.objects.create(
+            id=index, problem_name=f"Problem {index}", problem_statement="-", constraints="-", difficulty="Easy"
+        )
+    connections.close_all()
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    start = time.monotonic()
+    workers = [context.Process(target=run_worker, args=(args, results)) for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    counts = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    elapsed = max(count["finished_at"] for count in counts) - start
+    latencies = sorted(latency for count in counts for latency in count["latencies"])
+    writes = sum(count["autosaves"] + count["submissions"] for count in counts)
+    print(json.dumps({
+        "writes": writes,
+        "locked": sum(count["locked"] for count in counts),
+        "writes_per_second": writes / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] if latencies else None,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] if latencies else None,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_child(args)
+        return
+
+    print(f"{args.processes} processes x {args.threads} threads, {args.seconds:g}s per mode")
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory(prefix="codeastra-bench-") as temp_dir:
+            env = {**os.environ, **MODES[mode], "SQLITE_PATH": os.path.join(temp_dir, "db.sqlite3")}
+            child = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child",
+                 "--processes", str(args.processes), "--threads", str(args.threads), "--seconds", str(args.seconds)],
+                cwd=BACKEND_DIR,
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+        if child.returncode != 0:
+            sys.exit(child.stderr)
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        print(
+            f"{mode:>13}: {result['writes_per_second']:8.0f} writes/s  "
+            f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+            f"{result['locked']} 'database is locked' errors"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure how long the Django app takes to import and to answer its first request.
+
+Run from the backend directory with the usual environment (``.env``) in place:
+
+    python benchmarks/startup.py [--runs 10] [--max-first-request-ms 1500]
+
+Every run is a fresh interpreter. Timings are taken from the start of the run: after
+``django.setup()``, after importing the URLconf (which imports every view), and after a
+first request through the test client. The run fails when a module that should only be
+imported on demand, such as google-genai, was imported anyway, or when the median time to
+first request is above ``--max-first-request-ms``.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported lazily, on the first AI request only.
+LAZY_MODULES = ["google.genai", "httpx", "pydantic"]
+FIRST_REQUEST_PATH = "/api/v1/judge/metrics/"
+
+
+def measure_child():
+    start = time.perf_counter()
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    import django
+
+    django.setup()
+    setup_done = time.perf_counter()
+
+    from importlib import import_module
+    from django.conf import settings
+
+    import_module(settings.ROOT_URLCONF)
+    urls_done = time.perf_counter()
+
+    from django.test import Client
+
+    # Unauthenticated, so it needs no database but still goes through middleware, DRF and a view.
+    Client().get(FIRST_REQUEST_PATH)
+    request_done = time.perf_counter()
+
+    print(json.dumps({
+        "setup_ms": (setup_done - start) * 1000,
+        "urls_ms": (urls_done - start) * 1000,
+        "first_request_ms": (request_done - start) * 1000,
+        "lazy_modules_imported": [name for name in LAZY_MODULES if name in sys.modules],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-first-request-ms", type=float, default=None)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_child()
+        return
+
+    samples = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if child.returncode != 0:
+            sys.exit(child.stderr)
+        sample = json.loads(child.stdout.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - start) * 1000
+        samples.append(sample)
+
+    for name in ["setup_ms", "urls_ms", "first_request_ms", "process_ms"]:
+        values = [sample[name] for sample in samples]
+        print(f"{name:<18} median {statistics.median(values):8.1f} ms   min {min(values):8.1f} ms   max {max(values):8.1f} ms")
+
+    failed = False
+    lazy_imported = sorted({name for sample in samples for name in sample["lazy_modules_imported"]})
+    if lazy_imported:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(lazy_imported)}")
+        failed = True
+    first_request_ms = statistics.median(sample["first_request_ms"] for sample in samples)
+    if args.max_first_request_ms is not None and first_request_ms > args.max_first_request_ms:
+        print(f"FAIL: median time to first request {first_request_ms:.1f} ms is above {args.max_first_request_ms:g} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
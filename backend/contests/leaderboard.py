@@ -0,0 +1,270 @@
+import os
+import json
+import time
+import atexit
+import tempfile
+import threading
+from django.conf import settings
+from django.db.models.functions import Coalesce
+from submission.models import SubmissionModel
+from .ranking import RankIndex
+
+ACCEPTED = "Accepted"
+COMPILATION_ERROR = "Compilation Error"
+REFRESH_BATCH_SIZE = 5000
+
+
+class ContestLeaderboard:
+    """ICPC-style standings, kept sorted as verdicts arrive.
+
+    Participants are ordered by problems solved, then penalty, then the time of their last
+    accepted submission. The penalty is the minute of each first accepted submission plus
+    ``penalty_minutes`` for every rejected attempt before it. Verdicts may arrive in any
+    order, as each is placed by its submission time. Applying one costs O(problems + log n);
+    a participant's rank and a page of the standings cost O(log n) and O(log n + page size).
+    """
+
+    def __init__(self, penalty_minutes=20, penalize_compilation_errors=False):
+        self.penalty_minutes = penalty_minutes
+        self.penalize_compilation_errors = penalize_compilation_errors
+        # user_id -> {problem_id: [first accepted second or None, [rejected seconds]]}
+        self.results = {}
+        self.keys = {}
+        self.index = RankIndex()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def get_key(self, user_id):
+        solved = penalty = last_accepted = 0
+        for accepted_at, rejected in self.results[user_id].values():
+            if accepted_at is None:
+                continue
+            solved += 1
+            penalty += accepted_at // 60 + self.penalty_minutes * sum(1 for at in rejected if at < accepted_at)
+            last_accepted = max(last_accepted, accepted_at)
+        return (-solved, penalty, last_accepted, user_id)
+
+    def apply(self, user_id, problem_id, verdict, elapsed_seconds):
+        """Add a verdict for a submission made ``elapsed_seconds`` after the start."""
+        problems = self.results.setdefault(user_id, {})
+        if verdict != COMPILATION_ERROR or self.penalize_compilation_errors:
+            result = problems.setdefault(problem_id, [None, []])
+            if verdict == ACCEPTED:
+                if result[0] is not None and result[0] <= elapsed_seconds:
+                    return
+                result[0] = elapsed_seconds
+            else:
+                # Attempts after the first accepted one never count.
+                if result[0] is not None and elapsed_seconds > result[0]:
+                    return
+                result[1].append(elapsed_seconds)
+
+        old_key, new_key = self.keys.get(user_id), self.get_key(user_id)
+        if old_key != new_key:
+            if old_key is not None:
+                self.index.remove(old_key)
+            self.index.insert(new_key)
+            self.keys[user_id] = new_key
+
+    def get_rank(self, key):
+        # Participants tied on everything but their user id share a rank.
+        return self.index.rank(key[:3]) + 1
+
+    def get_row(self, key):
+        user_id = key[3]
+        problems = {}
+        for problem_id, (accepted_at, rejected) in self.results[user_id].items():
+            counted = [at for at in rejected if accepted_at is None or at < accepted_at]
+            problems[problem_id] = {"accepted_at": accepted_at, "rejected": len(counted)}
+        return {
+            "rank": self.get_rank(key),
+            "user_id": user_id,
+            "solved": -key[0],
+            "penalty": key[1],
+            "problems": problems,
+        }
+
+    def get_user_row(self, user_id):
+        key = self.keys.get(user_id)
+        return None if key is None else self.get_row(key)
+
+    def get_page(self, offset, limit):
+        return [self.get_row(key) for key in self.index.slice(offset, offset + limit)]
+
+    def to_dict(self):
+        return {
+            "penalty_minutes": self.penalty_minutes,
+            "penalize_compilation_errors": self.penalize_compilation_errors,
+            "results": [
+                [user_id, [[problem_id, accepted_at, rejected] for problem_id, (accepted_at, rejected) in problems.items()]]
+                for user_id, problems in self.results.items()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        leaderboard = cls(data["penalty_minutes"], data["penalize_compilation_errors"])
+        for user_id, problems in data["results"]:
+            leaderboard.results[user_id] = {
+                problem_id: [accepted_at, rejected] for problem_id, accepted_at, rejected in problems
+            }
+            leaderboard.keys[user_id] = leaderboard.get_key(user_id)
+        leaderboard.index = RankIndex(leaderboard.keys.values())
+        return leaderboard
+
+
+def get_contest_config(contest):
+    # A snapshot only applies to the contest settings it was built with.
+    return {
+        "start_time": contest.start_time.isoformat(),
+        "end_time": contest.end_time.isoformat(),
+        "freeze_minutes": contest.freeze_minutes,
+        "penalty_minutes": contest.penalty_minutes,
+        "penalize_compilation_errors": contest.penalize_compilation_errors,
+        "standings_version": contest.standings_version,
+    }
+
+
+def get_snapshot_path(contest_id):
+    return os.path.join(str(settings.CONTEST_SNAPSHOT_DIR), f"contest-{contest_id}.json")
+
+
+class ContestStandings:
+    """The live and the public leaderboard of one contest, fed from stored verdicts.
+
+    Judge workers store verdicts in other processes, so every server process tails the
+    contest's ``SubmissionModel`` rows past the last one it applied. During the freeze
+    window the public leaderboard only takes submissions made before the freeze. The
+    state is saved every ``CONTEST_SNAPSHOT_EVERY`` verdicts and at exit, and a restarted
+    process resumes from it instead of replaying the whole contest.
+    """
+
+    def __init__(self, contest):
+        self.contest_id = contest.id
+        self.config = get_contest_config(contest)
+        self.start_time = contest.start_time
+        self.end_time = contest.end_time
+        self.freeze_time = contest.freeze_time
+        self.live = ContestLeaderboard(contest.penalty_minutes, contest.penalize_compilation_errors)
+        self.public = self.live if self.freeze_time is None else ContestLeaderboard(
+            contest.penalty_minutes, contest.penalize_compilation_errors
+        )
+        self.last_submission_id = 0
+        self.unsaved = 0
+        self.refreshed_at = None
+        self.lock = threading.Lock()
+
+    def apply(self, user_id, problem_id, verdict, submitted_at):
+        if not self.start_time <= submitted_at < self.end_time:
+            return
+        elapsed_seconds = int((submitted_at - self.start_time).total_seconds())
+        self.live.apply(user_id, problem_id, verdict, elapsed_seconds)
+        if self.public is not self.live and submitted_at < self.freeze_time:
+            self.public.apply(user_id, problem_id, verdict, elapsed_seconds)
+
+    def refresh(self, force=False):
+        """Apply the verdicts stored since the last refresh, at most every ``CONTEST_REFRESH_INTERVAL``."""
+        now = time.monotonic()
+        if not force and self.refreshed_at is not None and now - self.refreshed_at < settings.CONTEST_REFRESH_INTERVAL:
+            return 0
+        self.refreshed_at = now
+
+        applied = 0
+        while True:
+            # Ids grow in commit order because SQLite has a single writer.
+            rows = list(
+                SubmissionModel.objects.filter(contest_id=self.contest_id, id__gt=self.last_submission_id)
+                .annotate(submitted_at=Coalesce("queue_entry__created_at", "timestamp"))
+                .order_by("id")
+                .values_list("id", "user_id", "problem_id", "verdict", "submitted_at")[:REFRESH_BATCH_SIZE]
+            )
+            for submission_id, user_id, problem_id, verdict, submitted_at in rows:
+                self.apply(user_id, problem_id, verdict, submitted_at)
+                self.last_submission_id = submission_id
+            applied += len(rows)
+            if len(rows) < REFRESH_BATCH_SIZE:
+                break
+
+        self.unsaved += applied
+        if self.unsaved >= settings.CONTEST_SNAPSHOT_EVERY:
+            self.save()
+        return applied
+
+    def get_leaderboard(self, public):
+        return self.public if public else self.live
+
+    def save(self):
+        """Write the state to the contest's snapshot file, replacing it atomically."""
+        snapshot = {
+            "contest_id": self.contest_id,
+            "config": self.config,
+            "last_submission_id": self.last_submission_id,
+            "live": self.live.to_dict(),
+            "public": None if self.public is self.live else self.public.to_dict(),
+        }
+        path = get_snapshot_path(self.contest_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.unsaved = 0
+
+    @classmethod
+    def load(cls, contest):
+        """Restore the standings from the contest's snapshot, or return None if there is no usable one."""
+        try:
+            with open(get_snapshot_path(contest.id)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if snapshot.get("config") != get_contest_config(contest):
+            return None
+
+        standings = cls(contest)
+        standings.live = ContestLeaderboard.from_dict(snapshot["live"])
+        standings.public = standings.live if snapshot["public"] is None else ContestLeaderboard.from_dict(snapshot["public"])
+        standings.last_submission_id = snapshot["last_submission_id"]
+        return standings
+
+
+_standings = {}
+_standings_lock = threading.Lock()
+_owner_pid = None
+
+
+def get_standings(contest):
+    """Return the contest's standings with every stored verdict applied, loading them on first use."""
+    global _owner_pid
+    with _standings_lock:
+        if _owner_pid != os.getpid():
+            # Standings inherited across fork() are tailed by the parent process.
+            _standings.clear()
+            _owner_pid = os.getpid()
+        standings = _standings.get(contest.id)
+        if standings is None or standings.config != get_contest_config(contest):
+            standings = ContestStandings.load(contest) or ContestStandings(contest)
+            _standings[contest.id] = standings
+
+    with standings.lock:
+        standings.refresh()
+    return standings
+
+
+def save_all_standings():
+    with _standings_lock:
+        if _owner_pid != os.getpid():
+            return
+        standings_list = list(_standings.values())
+    for standings in standings_list:
+        with standings.lock:
+            if standings.unsaved:
+                standings.save()
+
+
+atexit.register(save_all_standings)
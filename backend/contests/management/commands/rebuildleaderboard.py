@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from contests.models import Contest
+from contests.leaderboard import ContestStandings
+
+
+class Command(BaseCommand):
+    help = "Replay every verdict of a contest and save its standings snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("contest_id", type=int)
+
+    def handle(self, *args, **options):
+        contest = Contest.objects.filter(id=options["contest_id"]).first()
+        if contest is None:
+            raise CommandError(f"Contest {options['contest_id']} not found.")
+
+        start = time.monotonic()
+        standings = ContestStandings(contest)
+        applied = standings.refresh(force=True)
+        standings.save()
+        self.stdout.write(
+            f"Applied {applied} verdicts for {len(standings.live)} participants "
+            f"in {time.monotonic() - start:.1f}s and saved the snapshot."
+        )
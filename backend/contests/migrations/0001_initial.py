@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('problems', '0009_problem_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('penalty_minutes', models.PositiveIntegerField(default=20, help_text='Penalty for each rejected attempt on a problem that is solved later.')),
+                ('penalize_compilation_errors', models.BooleanField(default=False)),
+                ('freeze_minutes', models.PositiveIntegerField(default=0, help_text='The public leaderboard stops changing this many minutes before the end.')),
+                ('unfrozen', models.BooleanField(default=False, help_text='Show the final standings to everyone.')),
+                ('problems', models.ManyToManyField(related_name='contests', to='problems.problem')),
+            ],
+        ),
+    ]
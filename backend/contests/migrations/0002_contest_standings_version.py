@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contests', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contest',
+            name='standings_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from datetime import timedelta
+from django.db import models
+
+
+# Create your models here.
+class Contest(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    description = models.TextField(blank=True, null=True)
+    problems = models.ManyToManyField('problems.Problem', related_name='contests')
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField()
+    penalty_minutes = models.PositiveIntegerField(default=20, help_text="Penalty for each rejected attempt on a problem that is solved later.")
+    penalize_compilation_errors = models.BooleanField(default=False)
+    freeze_minutes = models.PositiveIntegerField(default=0, help_text="The public leaderboard stops changing this many minutes before the end.")
+    unfrozen = models.BooleanField(default=False, help_text="Show the final standings to everyone.")
+    # Bumped when stored verdicts of its submissions change, so standings built from them are rebuilt.
+    standings_version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def freeze_time(self):
+        if not self.freeze_minutes:
+            return None
+        return self.end_time - timedelta(minutes=self.freeze_minutes)
+
+    def is_running(self, now):
+        return self.start_time <= now < self.end_time
+
+    def is_frozen(self, now):
+        """Whether the public leaderboard hides verdicts submitted after the freeze time."""
+        return self.freeze_time is not None and now >= self.freeze_time and not self.unfrozen
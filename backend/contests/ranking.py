@@ -0,0 +1,118 @@
+from bisect import bisect_left, insort
+
+BUCKET_SIZE = 512
+
+
+class RankIndex:
+    """A sorted set of keys with O(log n) insert, remove, rank and position lookups.
+
+    Keys are kept in sorted buckets of up to ``2 * BUCKET_SIZE``. The largest key of each
+    bucket finds the bucket a key belongs in, and a Fenwick tree over the bucket lengths
+    turns a bucket into the number of keys before it, and a position into a bucket. Both
+    take O(log n) steps; inserting into a bucket is a memmove of at most a bucket.
+    """
+
+    def __init__(self, keys=()):
+        self.load(sorted(keys))
+
+    def load(self, sorted_keys):
+        self.buckets = [sorted_keys[start:start + BUCKET_SIZE] for start in range(0, len(sorted_keys), BUCKET_SIZE)]
+        self.maxes = [bucket[-1] for bucket in self.buckets]
+        self.size = len(sorted_keys)
+        self.rebuild_tree()
+
+    def rebuild_tree(self):
+        self.tree = [0] * (len(self.buckets) + 1)
+        for index, bucket in enumerate(self.buckets, 1):
+            self.tree[index] += len(bucket)
+            parent = index + (index & -index)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[index]
+
+    def add_to_tree(self, bucket_index, delta):
+        index = bucket_index + 1
+        while index < len(self.tree):
+            self.tree[index] += delta
+            index += index & -index
+
+    def count_before_bucket(self, bucket_index):
+        total, index = 0, bucket_index
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def locate(self, position):
+        # The bucket holding the key at ``position``, and the key's offset inside it.
+        bucket_index, remaining = 0, position
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            if bucket_index + step < len(self.tree) and self.tree[bucket_index + step] <= remaining:
+                bucket_index += step
+                remaining -= self.tree[bucket_index]
+            step >>= 1
+        return bucket_index, remaining
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, key):
+        if not self.buckets:
+            self.load([key])
+            return
+        bucket_index = min(bisect_left(self.maxes, key), len(self.buckets) - 1)
+        bucket = self.buckets[bucket_index]
+        insort(bucket, key)
+        self.maxes[bucket_index] = bucket[-1]
+        self.size += 1
+        if len(bucket) > 2 * BUCKET_SIZE:
+            self.buckets[bucket_index:bucket_index + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            self.maxes[bucket_index:bucket_index + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+            self.rebuild_tree()
+        else:
+            self.add_to_tree(bucket_index, 1)
+
+    def remove(self, key):
+        bucket_index = bisect_left(self.maxes, key)
+        bucket = self.buckets[bucket_index] if bucket_index < len(self.buckets) else []
+        position = bisect_left(bucket, key)
+        if position == len(bucket) or bucket[position] != key:
+            raise KeyError(key)
+        del bucket[position]
+        self.size -= 1
+        if bucket:
+            self.maxes[bucket_index] = bucket[-1]
+            self.add_to_tree(bucket_index, -1)
+        else:
+            del self.buckets[bucket_index]
+            del self.maxes[bucket_index]
+            self.rebuild_tree()
+
+    def rank(self, key):
+        """Return how many keys are smaller than ``key``."""
+        bucket_index = bisect_left(self.maxes, key)
+        if bucket_index == len(self.buckets):
+            return self.size
+        return self.count_before_bucket(bucket_index) + bisect_left(self.buckets[bucket_index], key)
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.size:
+            raise IndexError(position)
+        bucket_index, offset = self.locate(position)
+        return self.buckets[bucket_index][offset]
+
+    def slice(self, start, stop):
+        """Return the keys at positions ``start`` to ``stop``, in O(log n + stop - start)."""
+        start, stop = max(start, 0), min(stop, self.size)
+        if start >= stop:
+            return []
+        bucket_index, offset = self.locate(start)
+        keys = []
+        while len(keys) < stop - start:
+            keys.extend(self.buckets[bucket_index][offset:offset + stop - start - len(keys)])
+            bucket_index, offset = bucket_index + 1, 0
+        return keys
+
+    def __iter__(self):
+        for bucket in self.buckets:
+            yield from bucket
@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from problems.serializers import ProblemSerializer
+from .models import *
+
+class ContestSerializer(serializers.ModelSerializer):
+    problems = ProblemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Contest
+        fields = '__all__'
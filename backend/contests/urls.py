@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import *
+
+urlpatterns = [
+    path('contests/', ContestListApiView.as_view(), name='contest-list'),
+    path('contests/<int:pk>/', ContestDetailApiView.as_view(), name='contest-detail'),
+    path('contests/<int:pk>/leaderboard/', ContestLeaderboardView.as_view(), name='contest-leaderboard'),
+    path('contests/<int:pk>/leaderboard/<int:user_id>/', ContestRankView.as_view(), name='contest-rank'),
+]
\ No newline at end of file
@@ -0,0 +1,101 @@
+from django.utils import timezone
+from rest_framework import generics, status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.models import CustomUser
+from .models import *
+from .serializers import ContestSerializer
+from .leaderboard import get_standings
+
+LEADERBOARD_PAGE_SIZE = 50
+MAX_LEADERBOARD_PAGE_SIZE = 200
+
+# Create your views here.
+
+class ContestListApiView(generics.ListAPIView):
+    queryset = Contest.objects.prefetch_related('problems__tags').order_by('-start_time')
+    serializer_class = ContestSerializer
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = (IsAuthenticated,)
+
+
+class ContestDetailApiView(generics.RetrieveAPIView):
+    queryset = Contest.objects.prefetch_related('problems__tags')
+    serializer_class = ContestSerializer
+    lookup_field = 'pk'
+
+    authentication_classes = [JWTAuthentication]
+    permission_classes = (IsAuthenticated,)
+
+
+def get_leaderboard(request, pk):
+    """Return ``(contest, standings, leaderboard, frozen)`` for the requesting user, or None."""
+    contest = Contest.objects.filter(id=pk).first()
+    if contest is None:
+        return None
+    # Staff always see the live standings; everyone else sees them frozen during the freeze window.
+    frozen = contest.is_frozen(timezone.now()) and not request.user.is_staff
+    standings = get_standings(contest)
+    return contest, standings, standings.get_leaderboard(public=frozen), frozen
+
+
+def add_usernames(rows):
+    usernames = dict(CustomUser.objects.filter(id__in=[row["user_id"] for row in rows]).values_list("id", "username"))
+    for row in rows:
+        row["username"] = usernames.get(row["user_id"])
+    return rows
+
+
+class ContestLeaderboardView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk: int):
+        try:
+            offset = max(int(request.query_params.get("offset", 0)), 0)
+            limit = min(max(int(request.query_params.get("limit", LEADERBOARD_PAGE_SIZE)), 1), MAX_LEADERBOARD_PAGE_SIZE)
+        except ValueError:
+            return Response({"error": "offset and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        found = get_leaderboard(request, pk)
+        if found is None:
+            return Response({"error": "Contest not found"}, status=status.HTTP_404_NOT_FOUND)
+        contest, standings, leaderboard, frozen = found
+        with standings.lock:
+            participants = len(leaderboard)
+            rows = leaderboard.get_page(offset, limit)
+
+        return Response({
+            "contest_id": contest.id,
+            "frozen": frozen,
+            "participants": participants,
+            "offset": offset,
+            "limit": limit,
+            "rows": add_usernames(rows),
+        }, status=status.HTTP_200_OK)
+
+
+class ContestRankView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk: int, user_id: int):
+        found = get_leaderboard(request, pk)
+        if found is None:
+            return Response({"error": "Contest not found"}, status=status.HTTP_404_NOT_FOUND)
+        contest, standings, leaderboard, frozen = found
+        with standings.lock:
+            participants = len(leaderboard)
+            row = leaderboard.get_user_row(user_id)
+        if row is None:
+            return Response({"error": "User has no submissions in this contest"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "contest_id": contest.id,
+            "frozen": frozen,
+            "participants": participants,
+            **add_usernames([row])[0],
+        }, status=status.HTTP_200_OK)
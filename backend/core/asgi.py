@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once the apps are loaded by get_asgi_application().
+from submission.websocket import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Django serves HTTP; WebSockets (judge events of a submission) are handled alongside it.
+    if scope["type"] == "websocket":
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -14,6 +14,7 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
     'problems',
     'django_filters',
     'submission',
+    'contests',
 ]
 
 MIDDLEWARE = [
@@ -87,10 +89,29 @@ WSGI_APPLICATION = 'core.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv("SQLITE_PATH", str(BASE_DIR / 'db.sqlite3')),
     }
 }
 
+# WAL lets readers run alongside the writer, writers wait up to SQLITE_BUSY_TIMEOUT seconds for
+# the lock instead of failing with "database is locked", and atomic blocks take the write lock
+# up front so they never deadlock trying to upgrade a read lock.
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "True") == "True"
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "20"))
+# Page cache per connection, in KiB.
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+if SQLITE_TUNED:
+    DATABASES['default']['OPTIONS'] = {
+        "init_command": (
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB};"
+            "PRAGMA temp_store=MEMORY;"
+        ),
+        "transaction_mode": "IMMEDIATE",
+        "timeout": SQLITE_BUSY_TIMEOUT,
+    }
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.postgresql',
@@ -195,4 +216,106 @@ SIMPLE_JWT = {
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
-CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
\ No newline at end of file
+CSRF_TRUSTED_ORIGINS = os.getenv("CSRF_TRUSTED_ORIGINS", "").split(",")
+
+# Judge
+# Submissions are queued in the database and judged by `python manage.py runjudge`.
+
+JUDGE_WORKERS = int(os.getenv("JUDGE_WORKERS", "2"))
+JUDGE_POLL_INTERVAL = float(os.getenv("JUDGE_POLL_INTERVAL", "0.5"))
+JUDGE_SHUTDOWN_TIMEOUT = float(os.getenv("JUDGE_SHUTDOWN_TIMEOUT", "15"))
+# A claimed job not updated for this long is taken to be abandoned by a worker on another host.
+JUDGE_STALE_JOB_SECONDS = float(os.getenv("JUDGE_STALE_JOB_SECONDS", "600"))
+
+# Compiled C/C++ binaries and compilation errors are cached by hash(source, compiler, flags, compiler version).
+JUDGE_COMPILE_FLAGS = {
+    "gcc": [],
+    "g++": [],
+}
+# Seconds a submission may take to compile before it is rejected as a compilation error.
+JUDGE_COMPILE_TIMEOUT = float(os.getenv("JUDGE_COMPILE_TIMEOUT", "30"))
+COMPILE_CACHE_DIR = os.getenv("COMPILE_CACHE_DIR", str(BASE_DIR / ".compile_cache"))
+COMPILE_CACHE_MAX_BYTES = int(os.getenv("COMPILE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Headers precompiled with JUDGE_COMPILE_FLAGS and used by submissions that include them.
+JUDGE_PCH_HEADERS = {
+    "g++": ["bits/stdc++.h"],
+}
+JUDGE_PCH_DIR = os.getenv("JUDGE_PCH_DIR", str(BASE_DIR / ".judge_bin" / "pch"))
+
+# Every job gets a private scratch directory under this root, on tmpfs where available.
+JUDGE_WORKSPACE_ROOT = os.getenv(
+    "JUDGE_WORKSPACE_ROOT",
+    "/dev/shm/codeastra-jobs" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "codeastra-jobs"),
+)
+# Idle workspaces each process keeps ready for its next jobs.
+JUDGE_WORKSPACE_POOL_SIZE = int(os.getenv("JUDGE_WORKSPACE_POOL_SIZE", "4"))
+
+# Upper bound on the test data each judge worker keeps in memory.
+JUDGE_TEST_DATA_CACHE_BYTES = int(os.getenv("JUDGE_TEST_DATA_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Maximum number of test cases of one submission that run at the same time.
+JUDGE_TEST_PARALLELISM = int(os.getenv("JUDGE_TEST_PARALLELISM", str(os.cpu_count() or 1)))
+
+# Limits for custom runs; submissions use the problem's own time_limit, memory_limit and output_limit.
+JUDGE_DEFAULT_TIME_LIMIT_MS = int(os.getenv("JUDGE_DEFAULT_TIME_LIMIT_MS", "2000"))
+JUDGE_MEMORY_LIMIT_MB = int(os.getenv("JUDGE_MEMORY_LIMIT_MB", "256"))
+JUDGE_OUTPUT_LIMIT_KB = int(os.getenv("JUDGE_OUTPUT_LIMIT_KB", "65536"))
+# Time and memory limits are multiplied per language, e.g. Python gets 3.5x the C/C++ time.
+JUDGE_LANGUAGE_LIMIT_MULTIPLIERS = {
+    "c": {"time": 1.0, "memory": 1.0},
+    "cpp": {"time": 1.0, "memory": 1.0},
+    "py": {"time": 3.5, "memory": 1.0},
+}
+# Programs are killed once wall-clock time reaches this multiple of the CPU time limit.
+JUDGE_WALL_TIME_FACTOR = float(os.getenv("JUDGE_WALL_TIME_FACTOR", "2"))
+# The launcher that applies these limits is built here with gcc on first use.
+JUDGE_LAUNCHER_DIR = os.getenv("JUDGE_LAUNCHER_DIR", str(BASE_DIR / ".judge_bin"))
+# Python submissions are forked from a pre-started interpreter that has already imported these modules.
+JUDGE_PYTHON_FORKSERVER = os.getenv("JUDGE_PYTHON_FORKSERVER", "True") == "True"
+JUDGE_PYTHON_PRELOAD = [
+    "bisect", "collections", "functools", "heapq", "itertools", "math", "re", "string", "typing",
+]
+# Judge workers publish compile, test and verdict events to every server process with a socket here.
+JUDGE_EVENTS_DIR = os.getenv("JUDGE_EVENTS_DIR", os.path.join(tempfile.gettempdir(), "codeastra-judge-events"))
+# Event streams re-read the submission's status after this many seconds without an event.
+JUDGE_EVENTS_RECHECK_INTERVAL = float(os.getenv("JUDGE_EVENTS_RECHECK_INTERVAL", "5"))
+
+# AI responses are cached in the database for this long; the least recently used are evicted past the limit.
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "5000"))
+# Languages that `python manage.py warmaicache` generates boilerplate for.
+AI_CACHE_WARM_LANGUAGES = ["cpp", "py", "c"]
+# "gemini", or "stub" for a local model that streams a canned response, e.g. for load tests.
+AI_BACKEND = os.getenv("AI_BACKEND", "gemini")
+AI_STUB_FIRST_TOKEN_DELAY = float(os.getenv("AI_STUB_FIRST_TOKEN_DELAY", "0.2"))
+AI_STUB_TOKEN_DELAY = float(os.getenv("AI_STUB_TOKEN_DELAY", "0.02"))
+AI_STUB_RESPONSE_WORDS = int(os.getenv("AI_STUB_RESPONSE_WORDS", "200"))
+# Streaming requests wait this long for one of the AI_MAX_CONCURRENT_REQUESTS model calls to finish.
+AI_MAX_CONCURRENT_REQUESTS = int(os.getenv("AI_MAX_CONCURRENT_REQUESTS", "8"))
+AI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AI_QUEUE_TIMEOUT_SECONDS", "30"))
+
+# The default cache is per process; with several server processes point these at a shared cache.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "codeastra"),
+    }
+}
+# Cached problem list and detail responses are dropped on any catalog change, and after this long regardless.
+PROBLEM_CACHE_TTL_SECONDS = int(os.getenv("PROBLEM_CACHE_TTL_SECONDS", "300"))
+
+# Autosaves are queued and committed in batches by one background thread per process.
+DB_WRITE_BEHIND = os.getenv("DB_WRITE_BEHIND", "True") == "True"
+# The writer waits this long for more writes before committing, and commits at most this many at once.
+DB_WRITE_BEHIND_INTERVAL = float(os.getenv("DB_WRITE_BEHIND_INTERVAL", "0.05"))
+DB_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("DB_WRITE_BEHIND_BATCH_SIZE", "200"))
+# Autosaves of one editor are kept in memory until it has been idle this long (seconds), or at most
+# AUTOSAVE_MAX_DELAY_SECONDS after the first unwritten one, and on Submit.
+AUTOSAVE_DEBOUNCE_SECONDS = float(os.getenv("AUTOSAVE_DEBOUNCE_SECONDS", "2"))
+AUTOSAVE_MAX_DELAY_SECONDS = float(os.getenv("AUTOSAVE_MAX_DELAY_SECONDS", "10"))
+
+# Contest standings are saved here so a restarted server does not replay every contest submission.
+CONTEST_SNAPSHOT_DIR = os.getenv("CONTEST_SNAPSHOT_DIR", str(BASE_DIR / ".contest_snapshots"))
+# Standings are saved after this many new verdicts, and pick up new verdicts at most this often (seconds).
+CONTEST_SNAPSHOT_EVERY = int(os.getenv("CONTEST_SNAPSHOT_EVERY", "500"))
+CONTEST_REFRESH_INTERVAL = float(os.getenv("CONTEST_REFRESH_INTERVAL", "1"))
@@ -15,11 +15,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 
 urlpatterns = [
     path('api/v1/', include('accounts.urls')),
     path('api/v1/', include('problems.urls')),
     path('api/v1/', include('submission.urls')),
+    path('api/v1/', include('contests.urls')),
     path('admin/', admin.site.urls),
 ]
+
+# runserver serves the admin's static files by itself, uvicorn does not (only while DEBUG).
+urlpatterns += staticfiles_urlpatterns()
@@ -0,0 +1,21 @@
+#!/bin/bash
+# Runs the web server and the judge workers that produce the verdicts in one container.
+# When either of them exits, or the container is stopped, both are stopped.
+
+# The number of workers comes from JUDGE_WORKERS.
+python manage.py runjudge &
+judge_pid=$!
+# Served over ASGI, so AI reviews stream without holding a thread and judge events reach the editor over a WebSocket.
+uvicorn core.asgi:application --host 0.0.0.0 --port 8000 &
+web_pid=$!
+
+stop() {
+    kill -TERM "$judge_pid" "$web_pid" 2>/dev/null
+}
+trap stop TERM INT
+
+wait -n
+status=$?
+stop
+wait
+exit $status
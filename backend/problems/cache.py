@@ -0,0 +1,67 @@
+import json
+import time
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+VERSION_KEY = "problems:catalog-version"
+
+
+def get_catalog_version():
+    # Seeded from the clock, so a version lost to eviction or a restart never reuses an old number.
+    cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+    return cache.get(VERSION_KEY)
+
+
+def invalidate_catalog(**kwargs):
+    """Signal receiver: make every cached list and detail response stale at once."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def get_etag(data):
+    content = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return '"%s"' % hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+class CachedCatalogMixin:
+    """Serve GET responses from a cache keyed by the catalog version, with ETag/If-None-Match.
+
+    Views name what their response depends on with ``get_catalog_cache_parts``. A hit
+    costs no database queries, and a matching If-None-Match gets an empty 304.
+    """
+
+    catalog_cache_name = None
+
+    def get_catalog_cache_parts(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        parts = json.dumps(self.get_catalog_cache_parts(request, *args, **kwargs), sort_keys=True)
+        cache_key = "problems:%s:%s:%s" % (
+            self.catalog_cache_name,
+            get_catalog_version(),
+            hashlib.sha256(parts.encode("utf-8")).hexdigest(),
+        )
+
+        entry = cache.get(cache_key)
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = json.loads(json.dumps(response.data, default=str))
+            entry = {"data": data, "etag": get_etag(data)}
+            cache.set(cache_key, entry, settings.PROBLEM_CACHE_TTL_SECONDS)
+
+        headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            if "*" in etags or entry["etag"] in etags:
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry["data"], headers=headers)
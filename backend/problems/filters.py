@@ -1,5 +1,6 @@
 import django_filters
 from .models import Problem, Tag
+from .search import search_problems
 
 class ProblemFilter(django_filters.FilterSet):
 
@@ -13,6 +14,12 @@ class ProblemFilter(django_filters.FilterSet):
         conjoined=False          # Use OR logic: problems matching TagA OR TagB
     )
 
+    # Full-text search over the name, statement and constraints, best match first.
+    search = django_filters.CharFilter(method='filter_search')
+
     class Meta:
         model = Problem
-        fields = ['difficulty', 'tags']
\ No newline at end of file
+        fields = ['difficulty', 'tags', 'search']
+
+    def filter_search(self, queryset, name, value):
+        return search_problems(queryset, value)
\ No newline at end of file
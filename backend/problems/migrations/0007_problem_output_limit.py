@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_alter_testcase_input_data_file_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='output_limit',
+            field=models.PositiveIntegerField(default=65536, help_text='Maximum output size in KB.'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0007_problem_output_limit'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='memory_limit',
+            field=models.PositiveIntegerField(default=256, help_text='Memory limit in MB, before the language multiplier.'),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='time_limit',
+            field=models.PositiveIntegerField(default=2000, help_text='CPU time limit in ms, before the language multiplier.'),
+        ),
+    ]
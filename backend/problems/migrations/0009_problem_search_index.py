@@ -0,0 +1,67 @@
+from django.db import migrations
+
+# An external-content FTS5 index over problems_problem, kept in sync by triggers so that
+# every write path (ORM, admin, raw SQL, loaddata) updates it.
+#
+# WARNING: SQLite drops these triggers whenever a later migration makes Django rebuild
+# problems_problem (altering or removing a column, changing constraints). They are
+# recreated after every migrate by problems.search.restore_search_triggers, which keeps
+# its own copy of the trigger SQL; change both together.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE problems_problem_fts USING fts5(
+        problem_name, problem_statement, constraints,
+        content='problems_problem', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER problems_problem_fts_insert AFTER INSERT ON problems_problem BEGIN
+        INSERT INTO problems_problem_fts (rowid, problem_name, problem_statement, constraints)
+        VALUES (new.id, new.problem_name, new.problem_statement, new.constraints);
+    END
+    """,
+    """
+    CREATE TRIGGER problems_problem_fts_delete AFTER DELETE ON problems_problem BEGIN
+        INSERT INTO problems_problem_fts (problems_problem_fts, rowid, problem_name, problem_statement, constraints)
+        VALUES ('delete', old.id, old.problem_name, old.problem_statement, old.constraints);
+    END
+    """,
+    """
+    CREATE TRIGGER problems_problem_fts_update
+    AFTER UPDATE OF problem_name, problem_statement, constraints ON problems_problem BEGIN
+        INSERT INTO problems_problem_fts (problems_problem_fts, rowid, problem_name, problem_statement, constraints)
+        VALUES ('delete', old.id, old.problem_name, old.problem_statement, old.constraints);
+        INSERT INTO problems_problem_fts (rowid, problem_name, problem_statement, constraints)
+        VALUES (new.id, new.problem_name, new.problem_statement, new.constraints);
+    END
+    """,
+    "INSERT INTO problems_problem_fts (problems_problem_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS problems_problem_fts_update",
+    "DROP TRIGGER IF EXISTS problems_problem_fts_delete",
+    "DROP TRIGGER IF EXISTS problems_problem_fts_insert",
+    "DROP TABLE IF EXISTS problems_problem_fts",
+]
+
+
+def run_on_sqlite(statements):
+    # Other databases fall back to substring search in ProblemFilter.
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0008_problem_time_limit_memory_limit'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)),
+    ]
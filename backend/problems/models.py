@@ -24,6 +24,9 @@ class Problem(models.Model):
     output_format = models.TextField(blank=True, null=True)
     difficulty = models.CharField(max_length=6, choices=DIFFICULTY_CHOICES)
     tags = models.ManyToManyField(Tag)
+    time_limit = models.PositiveIntegerField(default=2000, help_text="CPU time limit in ms, before the language multiplier.")
+    memory_limit = models.PositiveIntegerField(default=256, help_text="Memory limit in MB, before the language multiplier.")
+    output_limit = models.PositiveIntegerField(default=65536, help_text="Maximum output size in KB.")
 
     def __str__(self):
         return self.problem_name
@@ -0,0 +1,110 @@
+import re
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+SEARCH_TABLE = "problems_problem_fts"
+# bm25 weights for problem_name, problem_statement and constraints: a hit in the name counts most.
+SEARCH_WEIGHTS = (10.0, 1.0, 0.5)
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+# The triggers that keep the index in sync, as created by migration 0009_problem_search_index.
+SEARCH_TRIGGERS = {
+    "problems_problem_fts_insert": """
+        CREATE TRIGGER problems_problem_fts_insert AFTER INSERT ON problems_problem BEGIN
+            INSERT INTO problems_problem_fts (rowid, problem_name, problem_statement, constraints)
+            VALUES (new.id, new.problem_name, new.problem_statement, new.constraints);
+        END
+    """,
+    "problems_problem_fts_delete": """
+        CREATE TRIGGER problems_problem_fts_delete AFTER DELETE ON problems_problem BEGIN
+            INSERT INTO problems_problem_fts (problems_problem_fts, rowid, problem_name, problem_statement, constraints)
+            VALUES ('delete', old.id, old.problem_name, old.problem_statement, old.constraints);
+        END
+    """,
+    "problems_problem_fts_update": """
+        CREATE TRIGGER problems_problem_fts_update
+        AFTER UPDATE OF problem_name, problem_statement, constraints ON problems_problem BEGIN
+            INSERT INTO problems_problem_fts (problems_problem_fts, rowid, problem_name, problem_statement, constraints)
+            VALUES ('delete', old.id, old.problem_name, old.problem_statement, old.constraints);
+            INSERT INTO problems_problem_fts (rowid, problem_name, problem_statement, constraints)
+            VALUES (new.id, new.problem_name, new.problem_statement, new.constraints);
+        END
+    """,
+}
+
+
+def get_match_query(text):
+    """Turn free text into an FTS5 query that matches all of its words.
+
+    Each word is quoted so that FTS5 syntax in the input is taken literally, and the
+    last one also matches as a prefix, so results show up while a word is being typed.
+    """
+    terms = TERM_RE.findall(text)
+    if not terms:
+        return None
+    quoted = ['"%s"' % term for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search_problem_ids(text):
+    """Return the ids of the problems matching ``text``, best match first."""
+    match_query = get_match_query(text)
+    if match_query is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+            f"ORDER BY bm25({SEARCH_TABLE}, %s, %s, %s)",
+            [match_query, *SEARCH_WEIGHTS],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_problems(queryset, text):
+    """Filter ``queryset`` to the problems matching ``text``, ordered by relevance."""
+    terms = TERM_RE.findall(text)
+    if not terms:
+        return queryset.none()
+    if connection.vendor != "sqlite":
+        query = Q()
+        for term in terms:
+            query &= (
+                Q(problem_name__icontains=term)
+                | Q(problem_statement__icontains=term)
+                | Q(constraints__icontains=term)
+            )
+        return queryset.filter(query)
+
+    ids = search_problem_ids(text)
+    if not ids:
+        return queryset.none()
+    rank = Case(
+        *[When(id=problem_id, then=Value(position)) for position, problem_id in enumerate(ids)],
+        output_field=IntegerField(),
+    )
+    return queryset.filter(id__in=ids).order_by(rank)
+
+
+def restore_search_triggers(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Recreate the index triggers that a migration dropped, then rebuild the index.
+
+    SQLite alters most columns by copying the table into a new one, which drops the
+    table's triggers, so any later migration on ``Problem`` would silently stop the index
+    from following changes. Connected to ``post_migrate``.
+    """
+    search_connection = connections[using]
+    if search_connection.vendor != "sqlite":
+        return
+    with search_connection.cursor() as cursor:
+        cursor.execute("SELECT type, name FROM sqlite_master WHERE name LIKE %s", [f"{SEARCH_TABLE}%"])
+        existing = {name for _, name in cursor.fetchall()}
+        if SEARCH_TABLE not in existing:
+            # The index migration is not applied (yet).
+            return
+        missing = [name for name in SEARCH_TRIGGERS if name not in existing]
+        if not missing:
+            return
+        print(f"Warning: recreating the problem search triggers {', '.join(missing)} and rebuilding the index.")
+        for name in missing:
+            cursor.execute(SEARCH_TRIGGERS[name])
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
@@ -0,0 +1,8 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from .models import Problem, Tag, TestExample
+from .cache import invalidate_catalog
+
+for model in [Problem, Tag, TestExample]:
+    post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f"invalidate_catalog_save_{model.__name__}")
+    post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f"invalidate_catalog_delete_{model.__name__}")
+m2m_changed.connect(invalidate_catalog, sender=Problem.tags.through, dispatch_uid="invalidate_catalog_tags")
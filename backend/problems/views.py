@@ -2,28 +2,38 @@ from .models import *
 from rest_framework import generics
 from .serializers import *
 from .filters import ProblemFilter
+from .cache import CachedCatalogMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 # Create your views here.
 
-class ProblemListApiView(generics.ListCreateAPIView):
-    queryset = Problem.objects.all()
+class ProblemListApiView(CachedCatalogMixin, generics.ListCreateAPIView):
+    queryset = Problem.objects.prefetch_related('tags')
     serializer_class = ProblemSerializer
     # filterset_fields = ['difficulty', 'tags__tag']
     filterset_class = ProblemFilter
+    catalog_cache_name = 'list'
 
     authentication_classes = [JWTAuthentication]
     permission_classes = (IsAuthenticated,)
 
+    def get_catalog_cache_parts(self, request, *args, **kwargs):
+        # One entry per filter combination, whatever order the parameters come in.
+        return sorted((key, sorted(values)) for key, values in request.query_params.lists())
 
-class ProblemDetailApiView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Problem.objects.all()
+
+class ProblemDetailApiView(CachedCatalogMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Problem.objects.prefetch_related('tags', 'test_examples')
     serializer_class = ProblemDetialSerializer
     lookup_field = 'pk'
+    catalog_cache_name = 'detail'
 
     authentication_classes = [JWTAuthentication]
     permission_classes = (IsAuthenticated,)
 
+    def get_catalog_cache_parts(self, request, *args, **kwargs):
+        return kwargs[self.lookup_field]
+
 class TagListApiView(generics.ListCreateAPIView):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
@@ -2,5 +2,16 @@ from django.contrib import admin
 from .models import *
 
 # Register your models here.
-admin.site.register(SubmissionModel)
-admin.site.register(CodeSaveModel)
\ No newline at end of file
+class StoredCodeAdmin(admin.ModelAdmin):
+    # The blob is entered by hash instead of offering every stored blob in a dropdown.
+    raw_id_fields = ['code_blob']
+
+admin.site.register(SubmissionModel, StoredCodeAdmin)
+admin.site.register(CodeSaveModel, StoredCodeAdmin)
+admin.site.register(SubmissionQueueModel, StoredCodeAdmin)
+admin.site.register(CodeBlobModel)
+admin.site.register(AiResponseCacheModel)
+admin.site.register(UserProblemStatsModel)
+admin.site.register(UserStatsModel)
+admin.site.register(RejudgeModel)
+admin.site.register(RejudgeItemModel)
\ No newline at end of file
@@ -0,0 +1,115 @@
+import os
+import asyncio
+import threading
+from collections import deque
+from django.conf import settings
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class UpstreamBusyError(Exception):
+    pass
+
+def get_client():
+    """Return the Gemini client, creating it on first use.
+
+    google-genai pulls in pydantic and httpx, which take most of a second to import, so
+    it is only imported once a request actually needs the model and never by management
+    commands, migrations, tests or judge workers.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+
+                _client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+    return _client
+
+
+def stub_response(prompt):
+    # Long enough to stream for a while, and different per prompt so caching can be observed.
+    words = f"Stub review for a prompt of {len(prompt)} characters.".split()
+    return " ".join(words[index % len(words)] for index in range(settings.AI_STUB_RESPONSE_WORDS))
+
+
+def complete(prompt):
+    """Return the whole model response for ``prompt``."""
+    if settings.AI_BACKEND == "stub":
+        return stub_response(prompt)
+    response = get_client().models.generate_content(
+        model=GEMINI_MODEL,
+        contents={prompt},
+    )
+    return response.text
+
+
+async def stream(prompt):
+    """Yield the model response for ``prompt`` in chunks of text as they are generated."""
+    if settings.AI_BACKEND == "stub":
+        await asyncio.sleep(settings.AI_STUB_FIRST_TOKEN_DELAY)
+        for index, word in enumerate(stub_response(prompt).split(" ")):
+            await asyncio.sleep(settings.AI_STUB_TOKEN_DELAY)
+            yield f" {word}" if index else word
+        return
+
+    response = await get_client().aio.models.generate_content_stream(model=GEMINI_MODEL, contents=prompt)
+    async for chunk in response:
+        if chunk.text:
+            yield chunk.text
+
+
+class ConcurrencyLimiter:
+    """A process-wide cap on concurrent upstream calls that works across event loops.
+
+    Under ASGI all requests share one loop, but under WSGI every async view runs in a
+    loop of its own, where an ``asyncio.Semaphore`` would not be shared.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.waiters = deque()
+        self.lock = threading.Lock()
+
+    async def acquire(self, timeout=None):
+        """Wait for a free slot. Returns False when none became free within ``timeout`` seconds."""
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            waiter = loop.create_future()
+            self.waiters.append((loop, waiter))
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def grant(self, waiter):
+        # The slot passes straight to the waiter, or back to the pool if it gave up meanwhile.
+        if waiter.cancelled():
+            self.release()
+        else:
+            waiter.set_result(True)
+
+    def release(self):
+        with self.lock:
+            while self.waiters:
+                loop, waiter = self.waiters.popleft()
+                if waiter.done():
+                    continue
+                try:
+                    loop.call_soon_threadsafe(self.grant, waiter)
+                    return
+                except RuntimeError:
+                    # The waiter's loop has already been closed.
+                    continue
+            self.active -= 1
+
+
+upstream_limiter = ConcurrencyLimiter(settings.AI_MAX_CONCURRENT_REQUESTS)
@@ -0,0 +1,125 @@
+import hashlib
+import threading
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+from .models import AiResponseCacheModel
+
+# These prompts are built from the problem alone; boilerplate also depends on the language.
+PROBLEM_ONLY_REVIEW_TYPES = ["provideHints", "getBoilerPateCode"]
+LANGUAGE_REVIEW_TYPES = ["getBoilerPateCode"]
+
+
+def normalize_code(code):
+    # Whitespace at line ends or around the code does not change what a review says.
+    return "\n".join(line.rstrip() for line in (code or "").strip().splitlines())
+
+
+def get_cache_key(reviewType, problem_name, problem_statement, problem_constraints, language, code):
+    """Hash everything the prompt for this request depends on, and nothing else."""
+    parts = [reviewType, problem_name, problem_statement, problem_constraints]
+    if reviewType in LANGUAGE_REVIEW_TYPES:
+        parts.append(language)
+    if reviewType not in PROBLEM_ONLY_REVIEW_TYPES:
+        parts.append(hashlib.sha256(normalize_code(code).encode("utf-8")).hexdigest())
+
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """Let concurrent callers with the same key share one call instead of each making it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self.calls[key] = call
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call["done"].set()
+
+
+single_flight = SingleFlight()
+
+
+def get_cached(cache_key):
+    expires_before = timezone.now() - timedelta(seconds=settings.AI_CACHE_TTL_SECONDS)
+    entry = AiResponseCacheModel.objects.filter(cache_key=cache_key, created_at__gte=expires_before).first()
+    if entry is None:
+        return None
+    AiResponseCacheModel.objects.filter(id=entry.id).update(hits=F("hits") + 1, last_used_at=timezone.now())
+    return entry.response
+
+
+def store(cache_key, reviewType, response):
+    # Single statements rather than update_or_create's read-then-write transaction, which
+    # SQLite fails outright instead of waiting when another worker is writing.
+    now = timezone.now()
+    fields = {"review_type": reviewType, "response": response, "hits": 0, "created_at": now, "last_used_at": now}
+    if not AiResponseCacheModel.objects.filter(cache_key=cache_key).update(**fields):
+        try:
+            AiResponseCacheModel.objects.create(cache_key=cache_key, **fields)
+        except IntegrityError:
+            AiResponseCacheModel.objects.filter(cache_key=cache_key).update(**fields)
+    evict()
+
+
+def evict():
+    """Drop expired entries and the least recently used ones beyond ``AI_CACHE_MAX_ENTRIES``."""
+    expires_before = timezone.now() - timedelta(seconds=settings.AI_CACHE_TTL_SECONDS)
+    AiResponseCacheModel.objects.filter(created_at__lt=expires_before).delete()
+    stale_ids = list(
+        AiResponseCacheModel.objects.order_by("-last_used_at").values_list("id", flat=True)[settings.AI_CACHE_MAX_ENTRIES:]
+    )
+    if stale_ids:
+        AiResponseCacheModel.objects.filter(id__in=stale_ids).delete()
+
+
+def get_or_generate(cache_key, reviewType, generate, refresh=False):
+    """Return the cached response for ``cache_key``, calling ``generate`` at most once on a miss.
+
+    Failed calls are not cached. With ``refresh`` the cached response is ignored and replaced.
+    """
+    if not refresh:
+        response = get_cached(cache_key)
+        if response is not None:
+            return response
+
+    def generate_and_store():
+        # A call that finished after the lookup above may have filled the cache already.
+        if not refresh:
+            response = get_cached(cache_key)
+            if response is not None:
+                return response
+        response = generate()
+        if response is not None:
+            store(cache_key, reviewType, response)
+        return response
+
+    return single_flight.do(cache_key, generate_and_store)
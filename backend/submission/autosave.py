@@ -0,0 +1,81 @@
+import threading
+from django.conf import settings
+from .models import CodeSaveModel
+from .write_behind import get_saved_draft, save_code
+
+LOCK_STRIPES = 64
+
+
+class InvalidPatch(ValueError):
+    pass
+
+
+class StaleVersion(Exception):
+    """The save was made against an older version than the one saved."""
+
+    def __init__(self, code, version):
+        super().__init__(f"Code was saved at version {version} since.")
+        self.code = code
+        self.version = version
+
+
+def apply_patch(code, patch):
+    """Apply ``[[start, end, text], ...]`` edits to ``code``, each replacing ``code[start:end]`` with ``text``.
+
+    Edits apply in order, each to the result of the previous ones. Offsets count UTF-16
+    code units, as the indexes of JavaScript strings do.
+    """
+    if not isinstance(patch, list):
+        raise InvalidPatch("Patch must be a list of [start, end, text] edits.")
+    units = (code or "").encode("utf-16-le", "surrogatepass")
+    for edit in patch:
+        if (
+            not isinstance(edit, list) or len(edit) != 3
+            or not all(isinstance(offset, int) and not isinstance(offset, bool) for offset in edit[:2])
+            or not isinstance(edit[2], str)
+        ):
+            raise InvalidPatch("Each edit must be [start, end, text].")
+        start, end, text = edit
+        if not 0 <= start <= end <= len(units) // 2:
+            raise InvalidPatch(f"Edit [{start}, {end}] is outside the code.")
+        units = units[:2 * start] + text.encode("utf-16-le", "surrogatepass") + units[2 * end:]
+    return units.decode("utf-16-le", "surrogatepass")
+
+
+# Saves of one code are applied one at a time, as each builds on the version before it.
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def save_draft(user_id, problem_id, language, code=None, patch=None, base_version=None):
+    """Save the editor's code, given in full or as a ``patch`` to ``base_version``, and return the new version.
+
+    A patch, or full code sent with a ``base_version``, raises ``StaleVersion`` unless it
+    was made against the latest saved version. Saves are coalesced in memory and written
+    once the code has not changed for ``AUTOSAVE_DEBOUNCE_SECONDS``, or at the latest
+    ``AUTOSAVE_MAX_DELAY_SECONDS`` after the first unwritten one.
+    """
+    key = (int(user_id), int(problem_id), language)
+    with _locks[hash(key) % LOCK_STRIPES]:
+        try:
+            saved_code, version, written_version = get_saved_draft(*key)
+        except CodeSaveModel.DoesNotExist:
+            saved_code, version, written_version = None, 0, 0
+
+        if patch is not None or base_version is not None:
+            if base_version != version:
+                raise StaleVersion(saved_code, version)
+            # Another process may hold newer saves of this code that this one cannot see, so
+            # the save is only written over the version it was built on and is dropped if
+            # that version was replaced meanwhile.
+            written_over = written_version
+        else:
+            # Full code is what the editor shows, so it replaces whatever was saved.
+            written_over = None
+        if patch is not None:
+            code = apply_patch(saved_code, patch)
+        save_code(
+            *key, code, version + 1,
+            delay=settings.AUTOSAVE_DEBOUNCE_SECONDS, max_delay=settings.AUTOSAVE_MAX_DELAY_SECONDS,
+            base_version=written_over,
+        )
+        return version + 1
@@ -0,0 +1,121 @@
+class LineNormalizer:
+    """Apply the judge's whitespace rules to a stream of lines.
+
+    Trailing whitespace is removed from every line, and leading/trailing blank lines
+    and the leading whitespace of the first non-blank line are dropped, which matches
+    ``"\\n".join(line.rstrip() for line in text.split("\\n")).strip()``. Blank lines are
+    only counted until a non-blank line proves they are not trailing.
+    """
+
+    def __init__(self):
+        self.line_number = 0
+        self.started = False
+        self.blank_start = 0
+        self.blank_count = 0
+
+    def push(self, raw_line):
+        """Yield ``(line_number, column_offset, line)`` for every line that is now known to count."""
+        self.line_number += 1
+        line = raw_line.rstrip()
+        if not self.started:
+            stripped = line.lstrip()
+            if stripped:
+                self.started = True
+                yield self.line_number, len(line) - len(stripped), stripped
+            return
+        if not line:
+            if not self.blank_count:
+                self.blank_start = self.line_number
+            self.blank_count += 1
+            return
+        for offset in range(self.blank_count):
+            yield self.blank_start + offset, 0, b""
+        self.blank_count = 0
+        yield self.line_number, 0, line
+
+
+def iter_lines(data):
+    start = 0
+    size = len(data)
+    while start < size:
+        end = data.find(b"\n", start)
+        if end == -1:
+            end = size
+        yield data[start:end]
+        start = end + 1
+
+
+def normalized_lines(data):
+    normalizer = LineNormalizer()
+    for raw_line in iter_lines(data):
+        yield from normalizer.push(raw_line)
+
+
+class OutputComparator:
+    """Compare program output, fed in chunks of bytes, against the expected output.
+
+    Comparison stops at the first difference, which is reported as a dict with the
+    1-based ``line`` and ``column`` of the program output where it occurs.
+    """
+
+    def __init__(self, expected_output):
+        self.expected_lines = normalized_lines(expected_output)
+        self.normalizer = LineNormalizer()
+        self.partial_line = b""
+        self.mismatch = None
+
+    def compare_line(self, line_number, column_offset, line):
+        expected = next(self.expected_lines, None)
+        if expected is None:
+            self.mismatch = {
+                "line": line_number,
+                "column": column_offset + 1,
+                "reason": "Output has more lines than expected.",
+            }
+            return
+        expected_line = expected[2]
+        if line == expected_line:
+            return
+        column = next(
+            (index for index, (got, want) in enumerate(zip(line, expected_line)) if got != want),
+            min(len(line), len(expected_line)),
+        )
+        self.mismatch = {
+            "line": line_number,
+            "column": column_offset + column + 1,
+            "reason": "Output differs from the expected output.",
+        }
+
+    def push_line(self, raw_line):
+        for line_number, column_offset, line in self.normalizer.push(raw_line):
+            self.compare_line(line_number, column_offset, line)
+            if self.mismatch:
+                return
+
+    def feed(self, chunk):
+        """Consume the next chunk of output. Returns False once the outputs are known to differ."""
+        if self.mismatch:
+            return False
+        start = 0
+        while not self.mismatch:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                self.partial_line += chunk[start:]
+                break
+            self.push_line(self.partial_line + chunk[start:end])
+            self.partial_line = b""
+            start = end + 1
+        return self.mismatch is None
+
+    def finish(self):
+        """Return None when the outputs match, otherwise the mismatch dict."""
+        if self.mismatch is None and self.partial_line:
+            self.push_line(self.partial_line)
+            self.partial_line = b""
+        if self.mismatch is None and next(self.expected_lines, None) is not None:
+            self.mismatch = {
+                "line": self.normalizer.line_number + 1,
+                "column": 1,
+                "reason": "Output has fewer lines than expected.",
+            }
+        return self.mismatch
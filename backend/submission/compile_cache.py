@@ -0,0 +1,367 @@
+import os
+import re
+import json
+import time
+import uuid
+import fcntl
+import shutil
+import signal
+import hashlib
+import tempfile
+import functools
+import subprocess
+from django.conf import settings
+
+STATS_FILE_NAME = "stats.json"
+ERROR_SUFFIX = ".err"
+TEMP_SUFFIX = ".tmp"
+SOURCE_EXTENSIONS = {"gcc": "c", "g++": "cpp"}
+HEADER_LANGUAGES = {"gcc": "c-header", "g++": "c++-header"}
+PCH_INFO_FILE_NAME = "info.json"
+PCH_LOCK_FILE_NAME = ".lock"
+
+# Precompiled header directories that could not be built, so each is only attempted once per process.
+_failed_pch_dirs = set()
+
+
+def get_cache_dir():
+    cache_dir = str(settings.COMPILE_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+@functools.lru_cache(maxsize=None)
+def _compiler_version(compiler_path, modified_time):
+    version_res = subprocess.run([compiler_path, "--version"], capture_output=True, text=True)
+    return version_res.stdout.splitlines()[0] if version_res.stdout else ""
+
+
+def get_compiler_version(compiler):
+    # Keyed on the binary's mtime so that upgrading the compiler invalidates old artifacts.
+    compiler_path = shutil.which(compiler)
+    if compiler_path is None:
+        raise FileNotFoundError(compiler)
+    compiler_path = os.path.realpath(compiler_path)
+    return _compiler_version(compiler_path, os.stat(compiler_path).st_mtime_ns)
+
+
+def get_cache_key(source, compiler, flags):
+    digest = hashlib.sha256()
+    for part in [compiler, get_compiler_version(compiler), *flags]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(source)
+    return digest.hexdigest()
+
+
+def update_stats(**increments):
+    stats_path = os.path.join(get_cache_dir(), STATS_FILE_NAME)
+    with open(stats_path, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        content = f.read()
+        stats = json.loads(content) if content else {}
+        for name, value in increments.items():
+            stats[name] = stats.get(name, 0) + value
+        f.seek(0)
+        f.truncate()
+        json.dump(stats, f)
+    return stats
+
+
+def read_stats():
+    stats_path = os.path.join(get_cache_dir(), STATS_FILE_NAME)
+    try:
+        with open(stats_path, "r") as f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            content = f.read()
+    except FileNotFoundError:
+        content = ""
+    return json.loads(content) if content else {}
+
+
+def list_entries():
+    entries = []
+    for entry in os.scandir(get_cache_dir()):
+        if entry.name == STATS_FILE_NAME or entry.name.endswith(TEMP_SUFFIX) or not entry.is_file():
+            continue
+        entry_stat = entry.stat()
+        entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+    return entries
+
+
+def evict(max_bytes=None):
+    """Remove least recently used artifacts until the cache fits in ``max_bytes``."""
+    max_bytes = settings.COMPILE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = list_entries()
+    total_bytes = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        evicted += 1
+    if evicted:
+        update_stats(evictions=evicted)
+    return evicted
+
+
+def clear():
+    for _, _, path in list_entries():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    stats_path = os.path.join(get_cache_dir(), STATS_FILE_NAME)
+    if os.path.exists(stats_path):
+        os.remove(stats_path)
+
+
+def get_stats():
+    stats = read_stats()
+    entries = list_entries()
+    hits = stats.get("hits", 0)
+    misses = stats.get("misses", 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        "evictions": stats.get("evictions", 0),
+        "entries": len(entries),
+        "size_bytes": sum(size for _, size, _ in entries),
+        "max_bytes": settings.COMPILE_CACHE_MAX_BYTES,
+    }
+
+
+def get_pch_dir(compiler, flags):
+    # Named after everything the PCH depends on, so a new compiler version or new flags get a fresh build.
+    digest = hashlib.sha256()
+    for part in [compiler, get_compiler_version(compiler), *flags, *settings.JUDGE_PCH_HEADERS.get(compiler, [])]:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return os.path.join(str(settings.JUDGE_PCH_DIR), digest.hexdigest()[:16])
+
+
+def read_pch_info(pch_dir):
+    try:
+        with open(os.path.join(pch_dir, PCH_INFO_FILE_NAME), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def time_compilation(compiler, source_path, flags):
+    output_path = f"{source_path}.out"
+    start_time = time.monotonic()
+    compilation_res = subprocess.run([compiler, source_path, *flags, "-o", output_path], capture_output=True, text=True)
+    elapsed_ms = int((time.monotonic() - start_time) * 1000)
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    if compilation_res.returncode != 0:
+        raise RuntimeError(compilation_res.stderr)
+    return elapsed_ms
+
+
+def build_pch(compiler, build_dir, flags, header):
+    """Precompile ``header`` into ``build_dir`` and return how many ms it saves a compilation."""
+    stub_path = os.path.join(build_dir, "stub.h")
+    with open(stub_path, "w") as f:
+        f.write(f"#include <{header}>\n")
+    gch_path = os.path.join(build_dir, f"{header}.gch")
+    os.makedirs(os.path.dirname(gch_path), exist_ok=True)
+    compilation_res = subprocess.run(
+        [compiler, *flags, "-x", HEADER_LANGUAGES[compiler], stub_path, "-o", gch_path],
+        capture_output=True,
+        text=True,
+    )
+    os.remove(stub_path)
+    if compilation_res.returncode != 0:
+        raise RuntimeError(compilation_res.stderr)
+
+    probe_path = os.path.join(build_dir, f"probe.{SOURCE_EXTENSIONS[compiler]}")
+    with open(probe_path, "w") as f:
+        f.write(f"#include <{header}>\nint main() {{ return 0; }}\n")
+    try:
+        without_pch_ms = time_compilation(compiler, probe_path, flags)
+        with_pch_ms = time_compilation(compiler, probe_path, [*flags, "-I", build_dir])
+    finally:
+        os.remove(probe_path)
+    return max(0, without_pch_ms - with_pch_ms)
+
+
+def build_precompiled_headers(compiler="g++", flags=None):
+    """Build the precompiled headers of ``JUDGE_PCH_HEADERS`` for ``compiler`` unless they exist.
+
+    Returns ``(pch_dir, info)``, or None when the compiler has no headers to precompile or
+    building them failed. ``info["saving_ms"]`` maps each header to the compile time its
+    PCH saves, measured once when it is built.
+    """
+    if flags is None:
+        flags = settings.JUDGE_COMPILE_FLAGS.get(compiler, [])
+    headers = settings.JUDGE_PCH_HEADERS.get(compiler, [])
+    if not headers:
+        return None
+
+    pch_dir = get_pch_dir(compiler, flags)
+    info = read_pch_info(pch_dir)
+    if info is not None:
+        return pch_dir, info
+    if pch_dir in _failed_pch_dirs:
+        return None
+
+    pch_root = str(settings.JUDGE_PCH_DIR)
+    os.makedirs(pch_root, exist_ok=True)
+    # Judge workers start together; only one of them should spend the time building.
+    with open(os.path.join(pch_root, PCH_LOCK_FILE_NAME), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        info = read_pch_info(pch_dir)
+        if info is not None:
+            return pch_dir, info
+
+        build_dir = tempfile.mkdtemp(dir=pch_root, suffix=TEMP_SUFFIX)
+        try:
+            start_time = time.monotonic()
+            saving_ms = {header: build_pch(compiler, build_dir, flags, header) for header in headers}
+            info = {
+                "compiler": compiler,
+                "compiler_version": get_compiler_version(compiler),
+                "flags": flags,
+                "saving_ms": saving_ms,
+                "build_ms": int((time.monotonic() - start_time) * 1000),
+            }
+            with open(os.path.join(build_dir, PCH_INFO_FILE_NAME), "w") as f:
+                json.dump(info, f)
+            os.rename(build_dir, pch_dir)
+        except (OSError, RuntimeError) as e:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            _failed_pch_dirs.add(pch_dir)
+            print(f"Warning: Could not build precompiled headers for {compiler}: {e}")
+            return None
+
+        # Headers built for an older version of this compiler or other flags can never be used again.
+        for entry in os.scandir(pch_root):
+            if entry.is_dir() and entry.path != pch_dir and (read_pch_info(entry.path) or {}).get("compiler") == compiler:
+                shutil.rmtree(entry.path, ignore_errors=True)
+    return pch_dir, info
+
+
+def get_pch_flags(compiler, flags, source):
+    """Return ``(extra_flags, saving_ms)`` that let ``source`` use a precompiled header.
+
+    GCC only uses a PCH for the first include of a translation unit, so the estimate is
+    the saving of the earliest covered header the source includes.
+    """
+    included = []
+    for header in settings.JUDGE_PCH_HEADERS.get(compiler, []):
+        match = re.search(rb"#\s*include\s*<" + re.escape(header.encode("utf-8")) + rb">", source)
+        if match:
+            included.append((match.start(), header))
+    if not included:
+        return [], 0
+
+    built = build_precompiled_headers(compiler, flags)
+    if built is None:
+        return [], 0
+    pch_dir, info = built
+    return ["-I", pch_dir], info["saving_ms"].get(min(included)[1], 0)
+
+
+def get_pch_stats():
+    stats = read_stats()
+    pch_compiles = stats.get("pch_compiles", 0)
+    saved_ms = stats.get("pch_saved_ms", 0)
+    built = {}
+    for compiler in settings.JUDGE_PCH_HEADERS:
+        try:
+            pch_dir = get_pch_dir(compiler, settings.JUDGE_COMPILE_FLAGS.get(compiler, []))
+        except FileNotFoundError:
+            continue
+        built[compiler] = read_pch_info(pch_dir)
+    return {
+        "headers": settings.JUDGE_PCH_HEADERS,
+        "built": built,
+        "compiles_with_pch": pch_compiles,
+        "total_saved_ms": saved_ms,
+        "average_saved_ms_per_submission": round(saved_ms / pch_compiles, 1) if pch_compiles else 0.0,
+        "average_compile_ms": round(stats.get("compile_ms", 0) / stats["misses"], 1) if stats.get("misses") else 0.0,
+    }
+
+
+def run_compiler(args):
+    """Run a compiler like ``subprocess.run``, giving up after ``JUDGE_COMPILE_TIMEOUT`` seconds.
+
+    The compiler gets its own process group, so that on timeout the processes it started
+    (``cc1plus``, ``as``, ...) are killed with it instead of being left running.
+    """
+    with subprocess.Popen(
+        args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True
+    ) as process:
+        try:
+            stdout, stderr = process.communicate(timeout=settings.JUDGE_COMPILE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+            raise
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
+
+
+def compile_source(compiler, code_file_path, flags=None):
+    """Compile ``code_file_path`` unless an identical compilation is already cached.
+
+    Returns ``(executable_path, None)`` on success and ``(None, compiler_stderr)`` when
+    the source does not compile. Both outcomes are cached. Raises ``subprocess.TimeoutExpired``
+    when compiling takes longer than ``JUDGE_COMPILE_TIMEOUT``, which is not cached.
+    """
+    if flags is None:
+        flags = settings.JUDGE_COMPILE_FLAGS.get(compiler, [])
+
+    with open(code_file_path, "rb") as f:
+        source = f.read()
+
+    cache_dir = get_cache_dir()
+    cache_key = get_cache_key(source, compiler, flags)
+    executable_path = os.path.join(cache_dir, cache_key)
+    error_path = executable_path + ERROR_SUFFIX
+
+    for cached_path in [executable_path, error_path]:
+        try:
+            os.utime(cached_path)
+        except FileNotFoundError:
+            continue
+        update_stats(hits=1)
+        if cached_path == error_path:
+            with open(error_path, "r", encoding="utf-8") as f:
+                return None, f.read()
+        return executable_path, None
+
+    update_stats(misses=1)
+    # The PCH only speeds compilation up, so its flags stay out of the cache key.
+    pch_flags, pch_saving_ms = get_pch_flags(compiler, flags, source)
+    temp_path = os.path.join(cache_dir, f"{cache_key}.{uuid.uuid4().hex}{TEMP_SUFFIX}")
+    try:
+        start_time = time.monotonic()
+        compilation_res = run_compiler([compiler, code_file_path, *flags, *pch_flags, "-o", temp_path])
+        compile_ms = int((time.monotonic() - start_time) * 1000)
+        if pch_flags:
+            update_stats(compile_ms=compile_ms, pch_compiles=1, pch_saved_ms=pch_saving_ms)
+        else:
+            update_stats(compile_ms=compile_ms)
+        if compilation_res.returncode != 0:
+            # The per-job source path means nothing to the user and would differ between jobs.
+            details = compilation_res.stderr.replace(code_file_path, f"solution.{SOURCE_EXTENSIONS.get(compiler, 'src')}")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(details)
+            os.replace(temp_path, error_path)
+            evict()
+            return None, details
+
+        os.replace(temp_path, executable_path)
+        evict()
+        return executable_path, None
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
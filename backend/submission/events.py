@@ -0,0 +1,220 @@
+import os
+import json
+import uuid
+import errno
+import atexit
+import socket
+import asyncio
+import weakref
+import threading
+from django.conf import settings
+from asgiref.sync import sync_to_async
+from .models import SubmissionQueueModel
+
+FINISHED_STATUSES = ["done", "failed"]
+# Status events are only passed on when they move a submission forward.
+STATUS_ORDER = {"queued": 0, "compiling": 1, "running": 2, "done": 3, "failed": 3}
+RECEIVE_BUFFER_BYTES = 1024 * 1024
+
+
+def get_status_data(job):
+    """Return what ``execute/status/<id>`` reports for a ``SubmissionQueueModel`` row."""
+    data = {
+        "submission_id": job.id,
+        "status": job.status,
+    }
+    if job.status in FINISHED_STATUSES:
+        data["verdict"] = job.verdict
+        data["details"] = job.details
+        data["failed_test"] = job.failed_test
+        data["max_time"] = job.max_time
+        data["total_time"] = job.total_time
+        data["max_memory"] = job.max_memory
+    return data
+
+
+class EventPublisher:
+    """Sends judge events to every server process that listens in ``JUDGE_EVENTS_DIR``.
+
+    Each listening process binds a Unix datagram socket in the directory, so publishing is
+    one non-blocking ``sendto`` per process and costs nothing when nobody listens. Events
+    are best effort: streams re-read the database now and then, so a dropped one only
+    arrives late.
+    """
+
+    def __init__(self):
+        self.sock = None
+        self.owner_pid = None
+        self.lock = threading.Lock()
+
+    def get_socket(self):
+        if self.owner_pid != os.getpid():
+            # A socket inherited across fork() is shared with the parent process.
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.setblocking(False)
+            self.owner_pid = os.getpid()
+        return self.sock
+
+    def publish(self, submission_id, event, data):
+        try:
+            paths = [entry.path for entry in os.scandir(settings.JUDGE_EVENTS_DIR) if entry.name.endswith(".sock")]
+        except FileNotFoundError:
+            return
+        if not paths:
+            return
+
+        message = json.dumps({"submission_id": submission_id, "event": event, "data": data}).encode()
+        with self.lock:
+            sock = self.get_socket()
+            for path in paths:
+                try:
+                    sock.sendto(message, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The process that bound it is gone.
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                except OSError as e:
+                    if e.errno == errno.EMSGSIZE:
+                        # Too large for one datagram; listeners read this one from the database.
+                        sock.sendto(json.dumps({"submission_id": submission_id, "event": event, "data": None}).encode(), path)
+                    elif e.errno not in (errno.EAGAIN, errno.ENOBUFS):
+                        print(f"Warning: could not publish judge event to {path}: {e}")
+
+
+publisher = EventPublisher()
+
+
+def publish(submission_id, event, data):
+    """Publish a ``status``, ``test`` or ``verdict`` event of a queued submission."""
+    publisher.publish(submission_id, event, data)
+
+
+class EventBroker:
+    """Receives judge events in a server process and fans them out to its subscribers.
+
+    One broker runs per event loop: it binds its socket in ``JUDGE_EVENTS_DIR`` when the
+    first stream subscribes and reads it from the loop, so waiting streams hold no thread.
+    """
+
+    def __init__(self, loop):
+        # The loop owns its broker, not the other way round.
+        self.loop = weakref.ref(loop)
+        self.subscribers = {}
+        os.makedirs(settings.JUDGE_EVENTS_DIR, exist_ok=True)
+        self.path = os.path.join(settings.JUDGE_EVENTS_DIR, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_BYTES)
+        self.sock.bind(self.path)
+        self.sock.setblocking(False)
+        loop.add_reader(self.sock.fileno(), self.receive)
+
+    def receive(self):
+        while True:
+            try:
+                message = self.sock.recv(65536 * 4)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                event = json.loads(message)
+            except ValueError:
+                continue
+            for queue in self.subscribers.get(event.get("submission_id"), ()):
+                queue.put_nowait(event)
+
+    def subscribe(self, submission_id):
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(submission_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, submission_id, queue):
+        queues = self.subscribers.get(submission_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[submission_id]
+
+    def close(self):
+        if self.sock.fileno() != -1:
+            loop = self.loop()
+            if loop is not None and not loop.is_closed():
+                loop.remove_reader(self.sock.fileno())
+            self.sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+_brokers = weakref.WeakKeyDictionary()
+_brokers_pid = None
+
+
+def get_broker():
+    """Return the broker of the running event loop, starting it on first use."""
+    global _brokers_pid
+    if _brokers_pid != os.getpid():
+        # Brokers inherited across fork() belong to the parent process.
+        _brokers.clear()
+        _brokers_pid = os.getpid()
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        broker = _brokers[loop] = EventBroker(loop)
+        weakref.finalize(loop, broker.close)
+    return broker
+
+
+def close_brokers():
+    if _brokers_pid == os.getpid():
+        for broker in list(_brokers.values()):
+            broker.close()
+
+
+atexit.register(close_brokers)
+
+
+def get_job(submission_id, user):
+    job = SubmissionQueueModel.objects.filter(id=submission_id).first()
+    # Other users' submissions are reported as missing rather than forbidden.
+    if job is None or (job.user_id_id != user.id and not user.is_staff):
+        return None
+    return job
+
+
+async def submission_events(submission_id):
+    """Yield ``(event, data)`` pairs for a queued submission until its verdict is in.
+
+    Starts with its current ``status``, then passes on ``status``, ``test`` and ``verdict``
+    events as the judge publishes them. Every ``JUDGE_EVENTS_RECHECK_INTERVAL`` seconds
+    without an event the status is read again, and ``(None, None)`` is yielded so that
+    callers can keep the connection alive.
+    """
+    broker = get_broker()
+    # Subscribe before reading the status, so no event falls in between.
+    queue = broker.subscribe(submission_id)
+    get_status = sync_to_async(lambda: get_status_data(SubmissionQueueModel.objects.get(id=submission_id)))
+    try:
+        data = await get_status()
+        reached = STATUS_ORDER.get(data["status"], 0)
+        yield ("verdict" if data["status"] in FINISHED_STATUSES else "status"), data
+        while data["status"] not in FINISHED_STATUSES:
+            try:
+                message = await asyncio.wait_for(queue.get(), settings.JUDGE_EVENTS_RECHECK_INTERVAL)
+            except asyncio.TimeoutError:
+                message = {"event": None, "data": None}
+
+            event = message["event"]
+            if event == "test":
+                if message["data"] is not None:
+                    yield event, message["data"]
+                continue
+            data = message["data"] or await get_status()
+            if STATUS_ORDER.get(data["status"], 0) > reached:
+                reached = STATUS_ORDER.get(data["status"], 0)
+                yield ("verdict" if data["status"] in FINISHED_STATUSES else "status"), data
+            elif event is None:
+                yield None, None
+    finally:
+        broker.unsubscribe(submission_id, queue)
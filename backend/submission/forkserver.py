@@ -0,0 +1,156 @@
+"""Fork server for Python submissions.
+
+Started by ``submission.python_pool`` as ``python forkserver.py SOCKET_PATH [MODULE ...]``.
+It imports the given modules once and then waits for jobs on a unix socket. Every job
+forks a monitor, which forks the program and later reports the program's ``wait4``
+usage in the same format as ``launcher.c``. Each program therefore starts from an
+interpreter that is already initialised but has never run user code.
+
+This file is run as a plain script and must not import Django or the rest of the app.
+"""
+import os
+import sys
+import json
+import types
+import builtins
+import signal
+import socket
+import resource
+import importlib
+import traceback
+
+MAX_MESSAGE_SIZE = 64 * 1024
+
+
+def exit_code_for(exit_request):
+    # Mirrors how the interpreter turns SystemExit into a process exit code.
+    code = exit_request.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run_program(request, stdin_fd, stdout_fd, stderr_fd):
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    for target_fd, source_fd in enumerate([stdin_fd, stdout_fd, stderr_fd]):
+        os.dup2(source_fd, target_fd)
+    os.closerange(3, os.sysconf("SC_OPEN_MAX"))
+
+    time_limit_ms = request["time_limit_ms"]
+    cpu_seconds = time_limit_ms // 1000 + 1
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (request["memory_limit"], request["memory_limit"]))
+    signal.setitimer(signal.ITIMER_PROF, time_limit_ms / 1000)
+
+    code_file_path = request["code_file_path"]
+    os.chdir(request["cwd"])
+    sys.argv = [code_file_path]
+    sys.path[0] = os.path.dirname(code_file_path)
+
+    exit_code = 0
+    try:
+        with open(code_file_path, "rb") as f:
+            code = compile(f.read(), code_file_path, "exec")
+        # A fresh __main__ module, as for `python solution.py`, so that code looking itself up
+        # there (pickle, dataclasses, typing) finds the program and not this server.
+        main_module = types.ModuleType("__main__")
+        main_module.__file__ = code_file_path
+        main_module.__builtins__ = builtins
+        sys.modules["__main__"] = main_module
+        exec(code, main_module.__dict__)
+    except SystemExit as exit_request:
+        exit_code = exit_code_for(exit_request)
+    except BaseException:
+        exception_type, exception, exception_traceback = sys.exc_info()
+        # Drop this frame so the traceback looks like one from `python solution.py`.
+        traceback.print_exception(exception_type, exception, exception_traceback.tb_next)
+        exit_code = 1
+
+    for stream in [sys.stdout, sys.stderr]:
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    os._exit(exit_code)
+
+
+def monitor(request, fds):
+    stdin_fd, stdout_fd, stderr_fd, report_fd = fds
+    os.setsid()
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    program_pid = os.fork()
+    if program_pid == 0:
+        os.close(report_fd)
+        run_program(request, stdin_fd, stdout_fd, stderr_fd)
+
+    for fd in [stdin_fd, stdout_fd, stderr_fd]:
+        os.close(fd)
+
+    def kill_program(signum, frame):
+        try:
+            os.kill(program_pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # Already reaped; the report is about to be written.
+            pass
+
+    signal.signal(signal.SIGTERM, kill_program)
+
+    _, wait_status, usage = os.wait4(program_pid, 0)
+    user_usec = int(usage.ru_utime * 1_000_000)
+    system_usec = int(usage.ru_stime * 1_000_000)
+    os.write(report_fd, f"{wait_status} {user_usec} {system_usec} {usage.ru_maxrss}\n".encode("ascii"))
+    os._exit(0)
+
+
+def serve(socket_path, preload_modules):
+    for module_name in preload_modules:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            pass
+
+    # Monitors are never waited for; let the kernel reap them.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    parent_pid = os.getppid()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    server.settimeout(1)
+
+    while os.getppid() == parent_pid:
+        try:
+            connection, _ = server.accept()
+        except socket.timeout:
+            continue
+
+        with connection:
+            connection.settimeout(5)
+            try:
+                message, fds, _, _ = socket.recv_fds(connection, MAX_MESSAGE_SIZE, 4)
+            except OSError:
+                continue
+            if len(fds) != 4:
+                for fd in fds:
+                    os.close(fd)
+                continue
+
+            monitor_pid = os.fork()
+            if monitor_pid == 0:
+                server.close()
+                connection.close()
+                monitor(json.loads(message), fds)
+
+            for fd in fds:
+                os.close(fd)
+            connection.sendall(str(monitor_pid).encode("ascii"))
+
+    server.close()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1], sys.argv[2:])
@@ -0,0 +1,341 @@
+import os
+import time
+import signal
+import socket
+import multiprocessing
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from problems.models import TestCase
+from .models import RejudgeItemModel, SubmissionModel, SubmissionQueueModel
+from .comparator import OutputComparator
+from .utils import code_workspace, get_limits, prepare_program, run_program
+from .workspace import workspace_pool
+from .test_data import test_data_cache
+from .stats import record_verdict
+from .events import get_status_data, publish
+
+ACTIVE_STATUSES = ["compiling", "running"]
+
+
+def set_job_status(job, status):
+    SubmissionQueueModel.objects.filter(id=job.id).update(status=status, updated_at=timezone.now())
+    job.status = status
+    publish(job.id, "status", get_status_data(job))
+
+
+def run_test_case(command, test_case, limits, cwd=None):
+    # Test data comes from the worker's cache; stdin is fed from memory through a pipe, and
+    # the program's stdout goes straight into the comparator and is never held in memory.
+    input_data = test_data_cache.get(test_case.input_data_file)
+    comparator = OutputComparator(test_data_cache.get(test_case.output_data_file))
+    result = run_program(command, input_data, "bytes", output_consumer=comparator.feed, cwd=cwd, **limits)
+    # The program is stopped at the first difference, which finish() then reports.
+    if result["status"] in ("success", "output_mismatch"):
+        result["mismatch"] = comparator.finish()
+        result["passed"] = result["mismatch"] is None
+    else:
+        result["passed"] = False
+        if result["status"] == "timeout_error":
+            result["execution_time"] = int(limits["timeout_seconds"] * 1000)
+    return result
+
+
+def run_test_cases(command, test_cases, limits, cwd=None, on_result=None):
+    """Run the test cases concurrently and stop starting new ones after the first failure.
+
+    ``on_result(index, result)`` is called as each test case finishes, in finishing order.
+    Returns ``(failed_index, failed_result, usages)`` where ``failed_index`` is the 1-based
+    index of the earliest failing test case, or ``None`` when every test passed, and
+    ``usages`` maps each judged test index to its ``(execution_time, memory_used)``.
+    """
+    state = {"failed_index": None, "failed_result": None}
+    usages = {}
+    lock = threading.Lock()
+
+    def judge_test_case(index, test_case):
+        with lock:
+            if state["failed_index"] is not None and index > state["failed_index"]:
+                return
+        result = run_test_case(command, test_case, limits, cwd)
+        with lock:
+            usages[index] = (result.get("execution_time", 0), result.get("memory_used") or 0)
+            if not result["passed"] and (state["failed_index"] is None or index < state["failed_index"]):
+                state["failed_index"], state["failed_result"] = index, result
+        if on_result is not None:
+            on_result(index, result)
+
+    max_workers = max(1, min(settings.JUDGE_TEST_PARALLELISM, len(test_cases)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(judge_test_case, range(1, len(test_cases) + 1), test_cases))
+
+    failed_index = state["failed_index"]
+    if failed_index is not None:
+        usages = {index: usage for index, usage in usages.items() if index <= failed_index}
+    return failed_index, state["failed_result"], usages
+
+
+def evaluate_submission(code, language, problem, test_cases, on_running=None, on_result=None):
+    """Compile ``code`` and run it against ``test_cases`` under the problem's current limits.
+
+    Returns a result dict with ``status``, ``verdict`` and ``details`` keys, plus the
+    failing test index and timings when the program was run. ``on_running()`` is called
+    once the program compiled, and ``on_result`` is passed on to ``run_test_cases``.
+    Compiled programs come from the compile cache when the same source was built before.
+    """
+    limits = get_limits(language, problem)
+    with code_workspace() as (folder_path, unique_name):
+        command, result = prepare_program(code, language, folder_path, unique_name)
+        if command is None:
+            if result["status"] != "compilation_error":
+                result["verdict"] = "Internal Server Error"
+                return result
+            result["verdict"] = "Compilation Error"
+            result["max_time"] = result["total_time"] = result["max_memory"] = 0
+            return result
+
+        if on_running is not None:
+            on_running()
+        failed_index, failed_result, usages = run_test_cases(command, test_cases, limits, folder_path, on_result=on_result)
+    result = {
+        "status": "success" if failed_index is None else failed_result["status"],
+        "failed_test": failed_index,
+        "max_time": max((time_taken for time_taken, _ in usages.values()), default=0),
+        "total_time": sum(time_taken for time_taken, _ in usages.values()),
+        "max_memory": max((memory_used for _, memory_used in usages.values()), default=0),
+    }
+    if failed_index is None:
+        result["verdict"] = "Accepted"
+        result["details"] = f"All {len(test_cases)} test cases passed."
+    elif failed_result["status"] in ("success", "output_mismatch"):
+        result["verdict"] = "Wrong Answer"
+        mismatch = failed_result["mismatch"]
+        result["details"] = (
+            f"Wrong answer on test {failed_index}: {mismatch['reason']} "
+            f"First difference at line {mismatch['line']}, column {mismatch['column']}."
+        )
+    elif failed_result["status"] == "runtime_error":
+        result["verdict"] = "Runtime Error"
+        result["details"] = f"Runtime error on test {failed_index}.\n{failed_result['details']}"
+    elif failed_result["status"] == "output_limit_error":
+        result["verdict"] = "Output Limit Exceeded"
+        result["details"] = f"Output limit exceeded on test {failed_index}. {failed_result['details']}"
+    elif failed_result["status"] == "memory_limit_error":
+        result["verdict"] = "Memory Limit Exceeded"
+        result["details"] = f"Memory limit exceeded on test {failed_index}. {failed_result['details']}"
+    elif failed_result["status"] == "timeout_error":
+        result["verdict"] = "Time Limit Exceeded"
+        result["details"] = f"Time limit exceeded on test {failed_index}. {failed_result['details']}"
+    else:
+        result["verdict"] = "Internal Server Error"
+        result["details"] = failed_result["details"]
+    return result
+
+
+def judge_submission(job):
+    """Judge a queued submission against every test case of its problem and store the verdict.
+
+    Returns the result dict of ``evaluate_submission``, with the stored ``submission``
+    added unless judging failed.
+    """
+    test_cases = list(TestCase.objects.filter(problem_id=job.problem_id_id).order_by("id"))
+    if not test_cases:
+        return {
+            "status": "internal_error",
+            "verdict": "Internal Server Error",
+            "details": "No test cases found for this problem.",
+        }
+
+    def publish_test_result(index, test_result):
+        publish(job.id, "test", {
+            "submission_id": job.id,
+            "test": index,
+            "total": len(test_cases),
+            "passed": test_result["passed"],
+            "execution_time": test_result.get("execution_time", 0),
+            "memory_used": test_result.get("memory_used") or 0,
+        })
+
+    result = evaluate_submission(
+        job.code, job.language, job.problem_id, test_cases,
+        on_running=lambda: set_job_status(job, "running"), on_result=publish_test_result,
+    )
+    if result["verdict"] == "Internal Server Error":
+        return result
+
+    with transaction.atomic():
+        result["submission"] = SubmissionModel.objects.create(
+            language=job.language,
+            # The queued submission's blob is shared, not stored again.
+            code_blob_id=job.code_blob_id,
+            user_id_id=job.user_id_id,
+            problem_id_id=job.problem_id_id,
+            verdict=result["verdict"],
+            time_taken=result["max_time"],
+            memory_taken=result["max_memory"],
+            contest_id=job.contest_id,
+        )
+        record_verdict(result["submission"], job.problem_id.difficulty)
+    return result
+
+
+def process_job(job):
+    try:
+        result = judge_submission(job)
+    except Exception as e:
+        result = {
+            "status": "internal_error",
+            "verdict": "Internal Server Error",
+            "details": f"{str(e)} - exception",
+        }
+
+    fields = {
+        "status": "failed" if result["status"] == "internal_error" else "done",
+        "verdict": result["verdict"],
+        "details": result.get("details"),
+        "failed_test": result.get("failed_test"),
+        "max_time": result.get("max_time"),
+        "total_time": result.get("total_time"),
+        "max_memory": result.get("max_memory"),
+        "submission": result.get("submission"),
+        "updated_at": timezone.now(),
+    }
+    SubmissionQueueModel.objects.filter(id=job.id).update(**fields)
+    for name, value in fields.items():
+        setattr(job, name, value)
+    # Published once stored, so a stream that reads the status back sees the same verdict.
+    publish(job.id, "verdict", get_status_data(job))
+    return result
+
+
+def claim_next_job(worker_name):
+    # The conditional UPDATE makes the claim atomic, so several workers can poll the same table.
+    while True:
+        job = SubmissionQueueModel.objects.filter(status="queued").select_related("code_blob").order_by("id").first()
+        if job is None:
+            return None
+        claimed = SubmissionQueueModel.objects.filter(id=job.id, status="queued").update(
+            status="compiling", worker=worker_name, updated_at=timezone.now()
+        )
+        if claimed:
+            job.status = "compiling"
+            job.worker = worker_name
+            publish(job.id, "status", get_status_data(job))
+            return job
+
+
+def get_worker_name(label):
+    # Named after the worker process itself, so that a later pool can tell whether it still runs.
+    return f"{socket.gethostname()}:{os.getpid()}:{label}"
+
+
+def is_worker_alive(worker_name):
+    """Whether the worker named by ``get_worker_name`` may still be running.
+
+    Only processes on this host can be checked; workers elsewhere are taken to be alive.
+    """
+    if not worker_name:
+        return False
+    host, _, rest = worker_name.partition(":")
+    pid = rest.partition(":")[0]
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def requeue_interrupted(claimed):
+    """Put the claimed rows of ``claimed`` back on the queue whose worker is gone.
+
+    A worker is gone when it ran on this host and its process has exited, or when its row
+    has not been updated for ``JUDGE_STALE_JOB_SECONDS``. Rows that live workers of other
+    pools are judging are left alone, so no submission is judged twice.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.JUDGE_STALE_JOB_SECONDS)
+    requeued = 0
+    for row_id, worker, updated_at in claimed.values_list("id", "worker", "updated_at"):
+        if updated_at < stale_before or not is_worker_alive(worker):
+            # Only while the same worker still holds it, in case it finished meanwhile.
+            requeued += claimed.filter(id=row_id, worker=worker).update(
+                status="queued", worker=None, updated_at=timezone.now()
+            )
+    return requeued
+
+
+def requeue_interrupted_jobs():
+    """Put jobs, and rejudged submissions, that were mid-judging when their worker stopped back on the queue."""
+    requeue_interrupted(RejudgeItemModel.objects.filter(status="running"))
+    return requeue_interrupted(SubmissionQueueModel.objects.filter(status__in=ACTIVE_STATUSES))
+
+
+def run_worker(index, stop_event, poll_interval):
+    # Ctrl-C reaches the whole process group; let the parent decide when workers stop
+    # so that a job is never abandoned halfway through.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_name = get_worker_name(index)
+    # Connections inherited from the parent process must not be shared with it.
+    connections.close_all()
+    workspace_pool.fill()
+    # Imported here as the rejudge module builds on this one.
+    from .rejudge import claim_next_item, process_item
+
+    while not stop_event.is_set():
+        job = claim_next_job(worker_name)
+        if job is not None:
+            process_job(job)
+            continue
+        # Rejudges only use workers that new submissions leave idle, one submission at a time.
+        item = claim_next_item(worker_name)
+        if item is not None:
+            process_item(item)
+            continue
+        # Not stop_event.wait(): setting the event waits for every waiter to wake, and hangs
+        # the pool for good if one of them was killed while waiting.
+        time.sleep(poll_interval)
+    connections.close_all()
+
+
+def run_worker_pool(num_workers=None, poll_interval=None):
+    num_workers = num_workers or settings.JUDGE_WORKERS
+    poll_interval = poll_interval or settings.JUDGE_POLL_INTERVAL
+
+    requeue_interrupted_jobs()
+    connections.close_all()
+
+    stop_event = multiprocessing.Event()
+
+    def start_worker(index):
+        process = multiprocessing.Process(
+            target=run_worker, args=(index, stop_event, poll_interval), name=f"judge-worker-{index}"
+        )
+        process.start()
+        return process
+
+    workers = [start_worker(index) for index in range(num_workers)]
+    try:
+        while True:
+            time.sleep(poll_interval)
+            for index, process in enumerate(workers):
+                if process.is_alive():
+                    continue
+                # Workers only return once stopped, so this one crashed; its job goes back on the queue.
+                print(f"Warning: judge worker {index} (pid {process.pid}) exited with code {process.exitcode}, restarting it.")
+                requeue_interrupted_jobs()
+                connections.close_all()
+                workers[index] = start_worker(index)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_event.set()
+        for process in workers:
+            process.join(timeout=settings.JUDGE_SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,91 @@
+/*
+ * Usage: launcher CPU_MILLISECONDS MEMORY_BYTES REPORT_FD PROGRAM [ARGS...]
+ *
+ * Runs PROGRAM with a CPU time limit and RLIMIT_AS applied and writes one line to REPORT_FD:
+ * "<wait status> <user usec> <system usec> <max rss>" once it has exited, or
+ * "exec_error <errno>" when it could not be started.
+ *
+ * The program is forked from this small process rather than from the Django worker,
+ * because Linux carries the parent's resident set size over into the child's
+ * ru_maxrss. SIGTERM is forwarded to the program as SIGKILL so that the usage of a
+ * killed program is still reported.
+ *
+ * The CPU limit is an ITIMER_PROF timer, which survives exec and has millisecond
+ * precision; the program dies of SIGPROF when it expires. RLIMIT_CPU, which only
+ * counts whole seconds, is set one second later as a backstop.
+ */
+#include <errno.h>
+#include <fcntl.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+static volatile pid_t child = 0;
+
+static void forward_kill(int signum) {
+    (void)signum;
+    if (child > 0) {
+        kill(child, SIGKILL);
+    }
+}
+
+static long microseconds(struct timeval value) {
+    return (long)value.tv_sec * 1000000L + (long)value.tv_usec;
+}
+
+int main(int argc, char **argv) {
+    if (argc < 5) {
+        fprintf(stderr, "usage: %s CPU_MILLISECONDS MEMORY_BYTES REPORT_FD PROGRAM [ARGS...]\n", argv[0]);
+        return 2;
+    }
+
+    long cpu_milliseconds = strtol(argv[1], NULL, 10);
+    rlim_t cpu_seconds = (rlim_t)(cpu_milliseconds / 1000 + 1);
+    rlim_t memory_bytes = (rlim_t)strtoull(argv[2], NULL, 10);
+    int report_fd = atoi(argv[3]);
+    fcntl(report_fd, F_SETFD, FD_CLOEXEC);
+
+    struct sigaction action;
+    memset(&action, 0, sizeof(action));
+    action.sa_handler = forward_kill;
+    sigaction(SIGTERM, &action, NULL);
+
+    child = fork();
+    if (child < 0) {
+        dprintf(report_fd, "exec_error %d\n", errno);
+        return 1;
+    }
+
+    if (child == 0) {
+        signal(SIGTERM, SIG_DFL);
+        struct itimerval cpu_timer;
+        memset(&cpu_timer, 0, sizeof(cpu_timer));
+        cpu_timer.it_value.tv_sec = cpu_milliseconds / 1000;
+        cpu_timer.it_value.tv_usec = (cpu_milliseconds % 1000) * 1000;
+        struct rlimit cpu_limit = {cpu_seconds, cpu_seconds + 1};
+        struct rlimit memory_limit = {memory_bytes, memory_bytes};
+        setrlimit(RLIMIT_CPU, &cpu_limit);
+        setrlimit(RLIMIT_AS, &memory_limit);
+        setitimer(ITIMER_PROF, &cpu_timer, NULL);
+        execvp(argv[4], argv + 4);
+        dprintf(report_fd, "exec_error %d\n", errno);
+        _exit(127);
+    }
+
+    int status;
+    struct rusage usage;
+    while (wait4(child, &status, 0, &usage) < 0) {
+        if (errno != EINTR) {
+            return 1;
+        }
+    }
+
+    dprintf(report_fd, "%d %ld %ld %ld\n", status, microseconds(usage.ru_utime), microseconds(usage.ru_stime), usage.ru_maxrss);
+    return 0;
+}
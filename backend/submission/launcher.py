@@ -0,0 +1,55 @@
+import os
+import sys
+import uuid
+import hashlib
+import subprocess
+from django.conf import settings
+from .compile_cache import get_compiler_version
+
+LAUNCHER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launcher.c")
+
+_launcher_path = None
+
+
+def get_launcher_path():
+    """Return the path of the compiled launcher, building it on first use.
+
+    The binary is named after its source and compiler so a changed launcher.c or an
+    upgraded gcc gets a fresh build. It is kept out of the compile cache so that LRU
+    eviction can never remove it.
+    """
+    global _launcher_path
+    if _launcher_path and os.path.exists(_launcher_path):
+        return _launcher_path
+
+    with open(LAUNCHER_SOURCE, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source + get_compiler_version("gcc").encode("utf-8")).hexdigest()[:16]
+
+    launcher_dir = str(settings.JUDGE_LAUNCHER_DIR)
+    os.makedirs(launcher_dir, exist_ok=True)
+    launcher_path = os.path.join(launcher_dir, f"launcher-{digest}")
+    if not os.path.exists(launcher_path):
+        temp_path = f"{launcher_path}.{uuid.uuid4().hex}.tmp"
+        subprocess.run(["gcc", "-O2", LAUNCHER_SOURCE, "-o", temp_path], check=True, capture_output=True)
+        os.replace(temp_path, launcher_path)
+
+    _launcher_path = launcher_path
+    return launcher_path
+
+
+def parse_report(report):
+    """Parse the launcher's report line into a dict, or None if the launcher never wrote one."""
+    lines = report.decode("ascii", errors="ignore").splitlines()
+    if not lines:
+        return None
+    fields = lines[0].split()
+    if fields[0] == "exec_error":
+        return {"exec_error": int(fields[1])}
+    wait_status, user_usec, system_usec, max_rss = (int(field) for field in fields)
+    return {
+        "returncode": os.waitstatus_to_exitcode(wait_status),
+        "cpu_time": (user_usec + system_usec) // 1000,
+        # ru_maxrss is in bytes on macOS and in KB elsewhere.
+        "max_rss": max_rss // 1024 if sys.platform == "darwin" else max_rss,
+    }
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+from submission.models import CodeBlobModel, CodeSaveModel, SubmissionModel, SubmissionQueueModel
+
+
+class Command(BaseCommand):
+    help = "Report how much space code takes in the deduplicated, compressed blob table, and prune unused blobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prune", action="store_true", help="First delete blobs that nothing uses any more.")
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            self.stdout.write(f"Pruned {CodeBlobModel.prune()} unused code blobs.")
+
+        raw_bytes = rows = 0
+        for name, model in [
+            ("submissions", SubmissionModel),
+            ("queued submissions", SubmissionQueueModel),
+            ("saved code", CodeSaveModel),
+        ]:
+            # What the rows held when each one stored its own text.
+            usage = model.objects.exclude(code_blob=None).aggregate(rows=Count("id"), size=Sum("code_blob__size"))
+            self.stdout.write(f"{name:>20}: {usage['rows']} rows, {usage['size'] or 0} bytes of code")
+            raw_bytes += usage["size"] or 0
+            rows += usage["rows"]
+
+        blobs = CodeBlobModel.objects.aggregate(blobs=Count("hash"), size=Sum("size"), stored=Sum(Length("data")))
+        unique_bytes, stored_bytes = blobs["size"] or 0, blobs["stored"] or 0
+        self.stdout.write(
+            f"{'blobs':>20}: {blobs['blobs']} distinct texts, {unique_bytes} bytes, {stored_bytes} bytes compressed"
+        )
+        if stored_bytes:
+            self.stdout.write(
+                f"{rows} rows of code take {stored_bytes} bytes instead of {raw_bytes}: "
+                f"{raw_bytes / max(unique_bytes, 1):.1f}x from deduplication, "
+                f"{unique_bytes / stored_bytes:.1f}x from compression, {raw_bytes / stored_bytes:.1f}x in all."
+            )
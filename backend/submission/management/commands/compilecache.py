@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from submission import compile_cache
+
+
+class Command(BaseCommand):
+    help = "Show compile cache statistics, or clear the cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="Remove every cached artifact and reset the counters.")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            compile_cache.clear()
+            self.stdout.write("Compile cache cleared.")
+        for name, value in compile_cache.get_stats().items():
+            self.stdout.write(f"{name}: {value}")
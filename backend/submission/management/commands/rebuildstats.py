@@ -0,0 +1,18 @@
+import time
+from django.core.management.base import BaseCommand
+from submission.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user and per-problem stats tables from the submission history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", nargs="+", type=int, help="Only rebuild these user ids.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        users, rows = rebuild_stats(options["users"], options["batch_size"])
+        self.stdout.write(
+            f"Rebuilt stats for {users} users and {rows} user/problem pairs in {time.monotonic() - start:.1f}s."
+        )
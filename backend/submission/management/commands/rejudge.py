@@ -0,0 +1,69 @@
+import time
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from submission.models import RejudgeModel
+from submission.rejudge import create_rejudge, get_filters, get_rejudge_progress, get_rejudge_report, run_rejudge
+
+
+def raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class Command(BaseCommand):
+    help = "Judge stored submissions again, selected by problem, verdict or submission time, and report which verdicts changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--problem", type=int, help="Only submissions to this problem id.")
+        parser.add_argument("--verdicts", nargs="+", help='Only submissions with these verdicts, e.g. "Wrong Answer".')
+        parser.add_argument("--after", help="Only submissions made at or after this ISO date or datetime.")
+        parser.add_argument("--before", help="Only submissions made before this ISO date or datetime.")
+        parser.add_argument("--resume", type=int, metavar="REJUDGE_ID", help="Carry on with an interrupted rejudge instead of starting one.")
+        parser.add_argument("--workers", type=int, default=settings.JUDGE_WORKERS, help="Number of worker processes judging at once.")
+        parser.add_argument("--queue-only", action="store_true", help="Only queue the submissions, for the runjudge workers to judge when idle.")
+
+    def handle(self, *args, **options):
+        if options["resume"] is not None:
+            rejudge = RejudgeModel.objects.filter(id=options["resume"]).first()
+            if rejudge is None:
+                raise CommandError(f"Rejudge {options['resume']} not found.")
+        else:
+            try:
+                filters = get_filters(options["problem"], options["verdicts"], options["after"], options["before"])
+                rejudge = create_rejudge(**filters)
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"Rejudge {rejudge.id}: queued {rejudge.total} submissions.")
+            if options["queue_only"]:
+                return
+
+        if rejudge.status == "running":
+            signal.signal(signal.SIGTERM, raise_keyboard_interrupt)
+            progress = get_rejudge_progress(rejudge)
+            # Throughput counts this run only, not what an interrupted run judged before.
+            judged_before = progress["done"] + progress["failed"]
+            start = time.monotonic()
+
+            def report_progress(progress):
+                judged = progress["done"] + progress["failed"]
+                rate = (judged - judged_before) / (time.monotonic() - start)
+                self.stdout.write(
+                    f"{judged}/{progress['total']} judged, {progress['failed']} failed, "
+                    f"{progress['changed']} changed, {rate:.1f} submissions/s"
+                )
+
+            if not run_rejudge(rejudge.id, options["workers"], report_progress):
+                self.stdout.write(f"Interrupted. Resume with: python manage.py rejudge --resume {rejudge.id}")
+                return
+            rejudge.refresh_from_db()
+
+        report = get_rejudge_report(rejudge, changes_limit=0)
+        if report["status"] != "done":
+            self.stdout.write(f"Rejudge {rejudge.id}: {report['running']} submissions are still being judged by other workers.")
+            return
+        self.stdout.write(
+            f"Rejudge {rejudge.id} done: {report['done'] + report['failed']} judged, {report['failed']} failed, "
+            f"{report['changed']} changed, {report['submissions_per_second'] or 0:.1f} submissions/s."
+        )
+        for change in report["verdict_changes"]:
+            self.stdout.write(f"  {change['from']} -> {change['to']}: {change['count']}")
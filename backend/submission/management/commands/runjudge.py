@@ -0,0 +1,30 @@
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from submission.judge import run_worker_pool
+from submission.compile_cache import build_precompiled_headers
+
+
+def raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class Command(BaseCommand):
+    help = "Start the judge worker pool that drains the submission queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.JUDGE_WORKERS, help="Number of judge worker processes.")
+        parser.add_argument("--poll-interval", type=float, default=settings.JUDGE_POLL_INTERVAL, help="Seconds an idle worker waits before polling the queue again.")
+
+    def handle(self, *args, **options):
+        signal.signal(signal.SIGTERM, raise_keyboard_interrupt)
+        for compiler in settings.JUDGE_PCH_HEADERS:
+            try:
+                built = build_precompiled_headers(compiler)
+            except FileNotFoundError:
+                built = None
+            if built:
+                self.stdout.write(f"Precompiled headers for {compiler} ready in {built[0]}.")
+        self.stdout.write(f"Starting {options['workers']} judge worker(s).")
+        run_worker_pool(options["workers"], options["poll_interval"])
+        self.stdout.write("Judge workers stopped.")
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from problems.models import Problem
+from submission.utils import aiCodeReview
+
+
+class Command(BaseCommand):
+    help = "Generate and cache AI hints and boilerplate code for every problem and language."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--languages", nargs="+", default=settings.AI_CACHE_WARM_LANGUAGES, help="Languages to generate boilerplate code for.")
+        parser.add_argument("--workers", type=int, default=4, help="Number of AI requests made at the same time.")
+        parser.add_argument("--refresh", action="store_true", help="Replace responses that are already cached.")
+
+    def handle(self, *args, **options):
+        requests = []
+        for problem in Problem.objects.all():
+            # Hints do not depend on the language, so one request per problem is enough.
+            requests.append((problem, "provideHints", ""))
+            for language in options["languages"]:
+                requests.append((problem, "getBoilerPateCode", language))
+
+        def warm(problem, reviewType, language):
+            try:
+                aiCodeReview("", reviewType, problem.problem_statement, problem.problem_name, problem.constraints, language, refresh=options["refresh"])
+            finally:
+                connection.close()
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as executor:
+            futures = {executor.submit(warm, *request): request for request in requests}
+            for future in as_completed(futures):
+                problem, reviewType, language = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"{problem.problem_name} {reviewType} {language}: {e}")
+
+        self.stdout.write(f"Warmed {len(requests) - failed} of {len(requests)} AI responses.")
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_alter_testcase_input_data_file_and_more'),
+        ('submission', '0006_remove_codesavemodel_memory_taken_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmissionQueueModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('py', 'Python'), ('java', 'Java'), ('cpp', 'C++'), ('c', 'C')], max_length=4)),
+                ('code', models.TextField()),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('compiling', 'Compiling'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10)),
+                ('verdict', models.CharField(blank=True, max_length=100, null=True)),
+                ('details', models.TextField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('problem_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='problem_queued_submissions', to='problems.problem')),
+                ('submission', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='queue_entry', to='submission.submissionmodel')),
+                ('user_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_queued_submissions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
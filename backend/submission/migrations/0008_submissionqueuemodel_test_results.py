@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0007_submissionqueuemodel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionqueuemodel',
+            name='failed_test',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submissionqueuemodel',
+            name='max_time',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submissionqueuemodel',
+            name='total_time',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0008_submissionqueuemodel_test_results'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submissionmodel',
+            name='verdict',
+            field=models.CharField(blank=True, choices=[('Accepted', 'Accepted'), ('Wrong Answer', 'Wrong Answer'), ('Runtime Error', 'Runtime Error'), ('Compilation Error', 'Compilation Error'), ('Time Limit Exceeded', 'Time Limit Exceeded'), ('Memory Limit Exceeded', 'Memory Limit Exceeded'), ('Output Limit Exceeded', 'Output Limit Exceeded')], max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0009_alter_submissionmodel_verdict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionqueuemodel',
+            name='max_memory',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0010_submissionqueuemodel_max_memory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AiResponseCacheModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(max_length=64, unique=True)),
+                ('review_type', models.CharField(max_length=50)),
+                ('response', models.TextField()),
+                ('hits', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
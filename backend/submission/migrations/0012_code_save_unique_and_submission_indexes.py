@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:04
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_code_saves(apps, schema_editor):
+    # SaveCodeView always updated the first row of a (user, problem, language), so that is the one to keep.
+    CodeSaveModel = apps.get_model('submission', 'CodeSaveModel')
+    duplicates = (
+        CodeSaveModel.objects.values('user_id', 'problem_id', 'language')
+        .annotate(keep_id=Min('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates:
+        CodeSaveModel.objects.filter(
+            user_id=duplicate['user_id'], problem_id=duplicate['problem_id'], language=duplicate['language']
+        ).exclude(id=duplicate['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0008_problem_time_limit_memory_limit'),
+        ('submission', '0011_airesponsecachemodel'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_code_saves, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='submissionmodel',
+            index=models.Index(fields=['user_id', 'problem_id', '-timestamp', '-id'], name='submission_user_problem_time'),
+        ),
+        migrations.AddIndex(
+            model_name='submissionmodel',
+            index=models.Index(fields=['user_id', '-timestamp', '-id'], name='submission_user_time'),
+        ),
+        migrations.AddConstraint(
+            model_name='codesavemodel',
+            constraint=models.UniqueConstraint(fields=('user_id', 'problem_id', 'language'), name='unique_code_save'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('problems', '0009_problem_search_index'),
+        ('submission', '0012_code_save_unique_and_submission_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStatsModel',
+            fields=[
+                ('user_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('attempts', models.IntegerField(default=0)),
+                ('accepted_attempts', models.IntegerField(default=0)),
+                ('problems_attempted', models.IntegerField(default=0)),
+                ('problems_solved', models.IntegerField(default=0)),
+                ('easy_solved', models.IntegerField(default=0)),
+                ('medium_solved', models.IntegerField(default=0)),
+                ('hard_solved', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserProblemStatsModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.IntegerField(default=0)),
+                ('accepted_attempts', models.IntegerField(default=0)),
+                ('attempts_to_solve', models.IntegerField(blank=True, help_text='Attempts up to and including the first accepted one.', null=True)),
+                ('first_accepted_at', models.DateTimeField(blank=True, null=True)),
+                ('best_time', models.IntegerField(blank=True, help_text='Fastest accepted run in ms.', null=True)),
+                ('last_submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('problem_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='problem_user_stats', to='problems.problem')),
+                ('user_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_problem_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user_id', 'problem_id'), name='unique_user_problem_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contests', '0001_initial'),
+        ('submission', '0013_user_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submissionmodel',
+            name='contest',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='contest_submissions', to='contests.contest'),
+        ),
+        migrations.AddField(
+            model_name='submissionqueuemodel',
+            name='contest',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='contest_queued_submissions', to='contests.contest'),
+        ),
+    ]
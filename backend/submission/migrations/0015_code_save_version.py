@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0014_submission_contest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codesavemodel',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,124 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:24
+
+import zlib
+import hashlib
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+CODE_MODELS = ['SubmissionModel', 'SubmissionQueueModel', 'CodeSaveModel']
+
+
+def move_code_to_blobs(apps, schema_editor):
+    # Self-contained rather than using CodeBlobModel.store, so later model changes cannot break it.
+    CodeBlobModel = apps.get_model('submission', 'CodeBlobModel')
+    for model_name in CODE_MODELS:
+        Model = apps.get_model('submission', model_name)
+        rows = Model.objects.exclude(code=None).values_list('id', 'code').order_by('id')
+        last_id = 0
+        while True:
+            batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                break
+            hashes = {}
+            blobs = {}
+            for row_id, code in batch:
+                encoded = code.encode()
+                code_hash = hashes[row_id] = hashlib.sha256(encoded).hexdigest()
+                blobs.setdefault(code_hash, encoded)
+            stored = set(CodeBlobModel.objects.filter(hash__in=blobs).values_list('hash', flat=True))
+            CodeBlobModel.objects.bulk_create(
+                [
+                    CodeBlobModel(hash=code_hash, data=zlib.compress(encoded, 9), size=len(encoded))
+                    for code_hash, encoded in blobs.items() if code_hash not in stored
+                ],
+                ignore_conflicts=True,
+            )
+            Model.objects.bulk_update(
+                [Model(id=row_id, code_blob_id=code_hash) for row_id, code_hash in hashes.items()], ['code_blob']
+            )
+            last_id = batch[-1][0]
+
+
+def move_code_from_blobs(apps, schema_editor):
+    CodeBlobModel = apps.get_model('submission', 'CodeBlobModel')
+    for model_name in CODE_MODELS:
+        Model = apps.get_model('submission', model_name)
+        rows = Model.objects.exclude(code_blob=None).values_list('id', 'code_blob_id').order_by('id')
+        last_id = 0
+        while True:
+            batch = list(rows.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                break
+            blobs = dict(CodeBlobModel.objects.filter(hash__in={code_hash for _, code_hash in batch}).values_list('hash', 'data'))
+            Model.objects.bulk_update(
+                [Model(id=row_id, code=zlib.decompress(blobs[code_hash]).decode()) for row_id, code_hash in batch], ['code']
+            )
+            last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('submission', '0015_code_save_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeBlobModel',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('data', models.BinaryField()),
+                ('size', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='codesavemodel',
+            name='code_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='code_saves', to='submission.codeblobmodel'),
+        ),
+        migrations.AddField(
+            model_name='submissionmodel',
+            name='code_blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='submission.codeblobmodel'),
+        ),
+        migrations.AddField(
+            model_name='submissionqueuemodel',
+            name='code_blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='queued_submissions', to='submission.codeblobmodel'),
+        ),
+        # The old columns are made optional first, so that a reverse migration can fill them back in.
+        migrations.AlterField(
+            model_name='submissionmodel',
+            name='code',
+            field=models.TextField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='submissionqueuemodel',
+            name='code',
+            field=models.TextField(null=True),
+        ),
+        migrations.RunPython(move_code_to_blobs, move_code_from_blobs),
+        migrations.RemoveField(
+            model_name='codesavemodel',
+            name='code',
+        ),
+        migrations.RemoveField(
+            model_name='submissionmodel',
+            name='code',
+        ),
+        migrations.RemoveField(
+            model_name='submissionqueuemodel',
+            name='code',
+        ),
+        migrations.AlterField(
+            model_name='submissionmodel',
+            name='code_blob',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='submission.codeblobmodel'),
+        ),
+        migrations.AlterField(
+            model_name='submissionqueuemodel',
+            name='code_blob',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='queued_submissions', to='submission.codeblobmodel'),
+        ),
+    ]
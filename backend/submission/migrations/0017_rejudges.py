@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-18 20:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0009_problem_search_index'),
+        ('submission', '0016_code_blobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RejudgeModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('verdicts', models.JSONField(blank=True, default=list)),
+                ('submitted_after', models.DateTimeField(blank=True, null=True)),
+                ('submitted_before', models.DateTimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('done', 'Done')], db_index=True, default='running', max_length=10)),
+                ('total', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='user_rejudges', to=settings.AUTH_USER_MODEL)),
+                ('problem_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='problem_rejudges', to='problems.problem')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RejudgeItemModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('old_verdict', models.CharField(blank=True, max_length=100, null=True)),
+                ('new_verdict', models.CharField(blank=True, max_length=100, null=True)),
+                ('changed', models.BooleanField(default=False)),
+                ('details', models.TextField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, max_length=100, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rejudge_items', to='submission.submissionmodel')),
+                ('rejudge', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='submission.rejudgemodel')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'id'], name='rejudge_item_status'), models.Index(fields=['rejudge', 'status'], name='rejudge_item_rejudge_status')],
+                'constraints': [models.UniqueConstraint(fields=('rejudge', 'submission'), name='unique_rejudge_submission')],
+            },
+        ),
+    ]
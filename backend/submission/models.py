@@ -1,7 +1,102 @@
-from django.db import models
+import zlib
+import hashlib
+from django.db import connection, models, transaction
 
 # Create your models here.
-class SubmissionModel(models.Model):
+class CodeBlobModel(models.Model):
+    """Source code stored once per distinct text, compressed with zlib and keyed by its SHA-256."""
+
+    COMPRESSION_LEVEL = 9
+
+    hash = models.CharField(max_length=64, primary_key=True)
+    data = models.BinaryField()
+    # Length of the UTF-8 text before compression.
+    size = models.PositiveIntegerField()
+
+    @staticmethod
+    def get_hash(code):
+        return hashlib.sha256(code.encode()).hexdigest()
+
+    @classmethod
+    def store(cls, codes):
+        """Store every text in ``codes`` that is not stored yet.
+
+        A plain INSERT OR IGNORE rather than a lookup first: compressing a program takes
+        tens of microseconds, and on SQLite a transaction that writes first never has to
+        upgrade a read lock that another writer is waiting on.
+        """
+        codes = {cls.get_hash(code): code.encode() for code in codes if code is not None}
+        cls.objects.bulk_create(
+            [
+                cls(hash=code_hash, data=zlib.compress(encoded, cls.COMPRESSION_LEVEL), size=len(encoded))
+                for code_hash, encoded in codes.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def prune(cls, hashes=None):
+        """Delete the blobs, of ``hashes`` if given, that no submission or saved code uses any more.
+
+        Written as one DELETE ... WHERE NOT EXISTS in SQL: it runs in tens of microseconds,
+        where building it with the ORM takes milliseconds while the write lock is held, and
+        ``QuerySet.delete()`` would fetch every blob to check PROTECT first.
+        """
+        table = connection.ops.quote_name(cls._meta.db_table)
+        conditions, params = [], []
+        if hashes is not None:
+            hashes = list(hashes)
+            if not hashes:
+                return 0
+            conditions.append(f"hash IN ({', '.join(['%s'] * len(hashes))})")
+            params.extend(hashes)
+        for model in [SubmissionModel, SubmissionQueueModel, CodeSaveModel]:
+            conditions.append(
+                f"NOT EXISTS (SELECT 1 FROM {connection.ops.quote_name(model._meta.db_table)} "
+                f"WHERE code_blob_id = {table}.hash)"
+            )
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE {' AND '.join(conditions)}", params)
+            return cursor.rowcount
+
+    def get_code(self):
+        return zlib.decompress(self.data).decode()
+
+    def __str__(self):
+        return f"Code blob {self.hash[:12]} ({self.size} bytes)"
+
+class StoredCodeMixin:
+    """Gives a model with a ``code_blob`` foreign key a ``code`` attribute backed by ``CodeBlobModel``.
+
+    The blob is only loaded, and decompressed, when ``code`` is read. Assigning ``code``
+    points ``code_blob`` at the text's hash, and ``save()`` stores the blob if it is new;
+    ``bulk_create`` callers store theirs with ``CodeBlobModel.store``.
+    """
+
+    @property
+    def code(self):
+        if self.code_blob_id is None:
+            return None
+        cached = self.__dict__.get("_code")
+        if cached is None or cached[0] != self.code_blob_id:
+            cached = self._code = (self.code_blob_id, self.code_blob.get_code())
+        return cached[1]
+
+    @code.setter
+    def code(self, value):
+        self.code_blob_id = None if value is None else CodeBlobModel.get_hash(value)
+        self._code = None if value is None else (self.code_blob_id, value)
+        self._code_unstored = value is not None
+
+    def save(self, *args, **kwargs):
+        if not self.__dict__.pop("_code_unstored", False):
+            return super().save(*args, **kwargs)
+        # In one transaction, so the blob cannot be pruned before the row that uses it is saved.
+        with transaction.atomic():
+            CodeBlobModel.store([self._code[1]])
+            super().save(*args, **kwargs)
+
+class SubmissionModel(StoredCodeMixin, models.Model):
 
     LANGUAGE_CHOICES = [
         ('py', 'Python'),
@@ -17,27 +112,170 @@ class SubmissionModel(models.Model):
         ('Compilation Error', 'Compilation Error'),
         ('Time Limit Exceeded', 'Time Limit Exceeded'),
         ('Memory Limit Exceeded', 'Memory Limit Exceeded'),
+        ('Output Limit Exceeded', 'Output Limit Exceeded'),
     ]
 
     language = models.CharField(max_length=4, choices=LANGUAGE_CHOICES)
-    code = models.TextField()
+    code_blob = models.ForeignKey(CodeBlobModel, on_delete=models.PROTECT, related_name='submissions')
     user_id = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, related_name='user_submissions')
     problem_id = models.ForeignKey('problems.Problem', on_delete=models.CASCADE, related_name='problem_submissions')
     timestamp = models.DateTimeField(auto_now_add=True)
     verdict = models.CharField(max_length=100, blank=True, null=True, choices=VERDICT_CHOICES)
     time_taken = models.IntegerField(blank=True, null=True)
     memory_taken = models.IntegerField(blank=True, null=True)
+    contest = models.ForeignKey('contests.Contest', on_delete=models.SET_NULL, blank=True, null=True, related_name='contest_submissions')
+
+    class Meta:
+        # Match the history queries, which filter by user (and problem) and page by newest first.
+        indexes = [
+            models.Index(fields=['user_id', 'problem_id', '-timestamp', '-id'], name='submission_user_problem_time'),
+            models.Index(fields=['user_id', '-timestamp', '-id'], name='submission_user_time'),
+        ]
 
     def __str__(self):
         return f"Submission made by {self.user_id.username} for the problem - {self.problem_id.problem_name}"
     
 
-class CodeSaveModel(models.Model):
-    code = models.TextField(blank=True, null=True)
+class CodeSaveModel(StoredCodeMixin, models.Model):
+    code_blob = models.ForeignKey(CodeBlobModel, on_delete=models.PROTECT, blank=True, null=True, related_name='code_saves')
+    # Bumped on every save; patches from the editor name the version they were made against.
+    version = models.PositiveIntegerField(default=0)
     language = models.CharField(max_length=4, choices=SubmissionModel.LANGUAGE_CHOICES)
     user_id = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, related_name='user_code_saves')
     problem_id = models.ForeignKey('problems.Problem', on_delete=models.CASCADE, related_name='problem_code_saves')
     timestamp = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'problem_id', 'language'], name='unique_code_save'),
+        ]
+
+    def __str__(self):
+        return f"Code saved by {self.user_id.username} for the problem - {self.problem_id.problem_name} - language - {self.language}"
+
+class SubmissionQueueModel(StoredCodeMixin, models.Model):
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('compiling', 'Compiling'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    language = models.CharField(max_length=4, choices=SubmissionModel.LANGUAGE_CHOICES)
+    code_blob = models.ForeignKey(CodeBlobModel, on_delete=models.PROTECT, related_name='queued_submissions')
+    user_id = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, related_name='user_queued_submissions')
+    problem_id = models.ForeignKey('problems.Problem', on_delete=models.CASCADE, related_name='problem_queued_submissions')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued', db_index=True)
+    verdict = models.CharField(max_length=100, blank=True, null=True)
+    details = models.TextField(blank=True, null=True)
+    failed_test = models.IntegerField(blank=True, null=True)
+    max_time = models.IntegerField(blank=True, null=True)
+    total_time = models.IntegerField(blank=True, null=True)
+    max_memory = models.IntegerField(blank=True, null=True)
+    contest = models.ForeignKey('contests.Contest', on_delete=models.SET_NULL, blank=True, null=True, related_name='contest_queued_submissions')
+    submission = models.OneToOneField(SubmissionModel, on_delete=models.SET_NULL, blank=True, null=True, related_name='queue_entry')
+    worker = models.CharField(max_length=100, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Queued submission {self.id} by {self.user_id.username} for the problem - {self.problem_id.problem_name} - {self.status}"
+
+class AiResponseCacheModel(models.Model):
+    cache_key = models.CharField(max_length=64, unique=True)
+    review_type = models.CharField(max_length=50)
+    response = models.TextField()
+    hits = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Cached {self.review_type} response {self.cache_key[:12]}"
+
+class UserProblemStatsModel(models.Model):
+    user_id = models.ForeignKey('accounts.CustomUser', on_delete=models.CASCADE, related_name='user_problem_stats')
+    problem_id = models.ForeignKey('problems.Problem', on_delete=models.CASCADE, related_name='problem_user_stats')
+    attempts = models.IntegerField(default=0)
+    accepted_attempts = models.IntegerField(default=0)
+    attempts_to_solve = models.IntegerField(blank=True, null=True, help_text="Attempts up to and including the first accepted one.")
+    first_accepted_at = models.DateTimeField(blank=True, null=True)
+    best_time = models.IntegerField(blank=True, null=True, help_text="Fastest accepted run in ms.")
+    last_submitted_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'problem_id'], name='unique_user_problem_stats'),
+        ]
+
+    def __str__(self):
+        return f"Stats of {self.user_id.username} for the problem - {self.problem_id.problem_name}"
+
+class UserStatsModel(models.Model):
+    user_id = models.OneToOneField('accounts.CustomUser', on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    attempts = models.IntegerField(default=0)
+    accepted_attempts = models.IntegerField(default=0)
+    problems_attempted = models.IntegerField(default=0)
+    problems_solved = models.IntegerField(default=0)
+    easy_solved = models.IntegerField(default=0)
+    medium_solved = models.IntegerField(default=0)
+    hard_solved = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats of {self.user_id.username}"
+
+class RejudgeModel(models.Model):
+
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ]
+
+    # The filters the submissions were selected by; any of them may be empty.
+    problem_id = models.ForeignKey('problems.Problem', on_delete=models.SET_NULL, blank=True, null=True, related_name='problem_rejudges')
+    verdicts = models.JSONField(default=list, blank=True)
+    submitted_after = models.DateTimeField(blank=True, null=True)
+    submitted_before = models.DateTimeField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='running', db_index=True)
+    total = models.IntegerField(default=0)
+    created_by = models.ForeignKey('accounts.CustomUser', on_delete=models.SET_NULL, blank=True, null=True, related_name='user_rejudges')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Rejudge {self.id} of {self.total} submissions - {self.status}"
+
+class RejudgeItemModel(models.Model):
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    rejudge = models.ForeignKey(RejudgeModel, on_delete=models.CASCADE, related_name='items')
+    submission = models.ForeignKey(SubmissionModel, on_delete=models.CASCADE, related_name='rejudge_items')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    # The verdict when the submission was selected, so judging an item twice cannot lose it.
+    old_verdict = models.CharField(max_length=100, blank=True, null=True)
+    new_verdict = models.CharField(max_length=100, blank=True, null=True)
+    changed = models.BooleanField(default=False)
+    details = models.TextField(blank=True, null=True)
+    worker = models.CharField(max_length=100, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rejudge', 'submission'], name='unique_rejudge_submission'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id'], name='rejudge_item_status'),
+            models.Index(fields=['rejudge', 'status'], name='rejudge_item_rejudge_status'),
+        ]
+
     def __str__(self):
-        return f"Code saved by {self.user_id.username} for the problem - {self.problem_id.problem_name} - language - {self.language}"
\ No newline at end of file
+        return f"Rejudge {self.rejudge_id} of submission {self.submission_id} - {self.status}"
@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class SubmissionCursorPagination(CursorPagination):
+    """Keyset pagination over submissions, newest first.
+
+    The cursor encodes the last ``timestamp`` seen, so every page is an indexed range scan
+    no matter how deep it is, and new submissions never shift the pages after it.
+    """
+
+    ordering = ("-timestamp", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_paginated_response(self, data):
+        return Response({
+            "submissions": data,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        })
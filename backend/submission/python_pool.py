@@ -0,0 +1,145 @@
+import os
+import json
+import time
+import atexit
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import subprocess
+from django.conf import settings
+
+FORKSERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forkserver.py")
+STARTUP_TIMEOUT = 10
+
+
+class PooledProcess:
+    """The part of the ``Popen`` interface that ``run_program`` needs, for a forked program.
+
+    ``pid`` is the monitor's pid. The monitor leads its own session, forwards SIGTERM to
+    the program as SIGKILL, and is reaped by the fork server rather than by us, so it
+    is alive exactly as long as its pid exists.
+    """
+
+    def __init__(self, pid, stdin, stdout, stderr):
+        self.pid = pid
+        self.stdin = stdin
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = None
+
+    def poll(self):
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            self.returncode = 0
+        return self.returncode
+
+    def terminate(self):
+        try:
+            os.kill(self.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(["python"], timeout)
+            time.sleep(0.001)
+        return self.returncode
+
+
+class PythonForkServer:
+    """Client for one ``forkserver.py`` process, started lazily and restarted if it dies."""
+
+    def __init__(self):
+        self.process = None
+        self.socket_dir = None
+        self.owner_pid = None
+        self.lock = threading.Lock()
+
+    @property
+    def socket_path(self):
+        return os.path.join(self.socket_dir, "forkserver.sock")
+
+    def start(self):
+        self.stop()
+        self.socket_dir = tempfile.mkdtemp(prefix="codeastra-py-")
+        self.owner_pid = os.getpid()
+        self.process = subprocess.Popen(
+            ["python", FORKSERVER_SCRIPT, self.socket_path, *settings.JUDGE_PYTHON_PRELOAD],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+        )
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while not os.path.exists(self.socket_path):
+            if self.process.poll() is not None or time.monotonic() >= deadline:
+                self.stop()
+                raise RuntimeError("Python fork server failed to start.")
+            time.sleep(0.01)
+
+    def stop(self):
+        # A server inherited from a parent process belongs to the parent.
+        if self.process and self.owner_pid == os.getpid():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=STARTUP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            shutil.rmtree(self.socket_dir, ignore_errors=True)
+        self.process = None
+
+    def ensure_running(self):
+        with self.lock:
+            if self.process is None or self.owner_pid != os.getpid() or self.process.poll() is not None:
+                self.start()
+
+    def spawn(self, code_file_path, stdin, report_write_fd, time_limit_ms, memory_limit, cwd=None):
+        """Run a Python file in a fresh fork and return a ``PooledProcess`` for it.
+
+        ``stdin`` is ``subprocess.PIPE`` or a file object, as for ``Popen``.
+        """
+        self.ensure_running()
+
+        if stdin == subprocess.PIPE:
+            stdin_read_fd, stdin_write_fd = os.pipe()
+        else:
+            stdin_read_fd, stdin_write_fd = os.dup(stdin.fileno()), None
+        stdout_read_fd, stdout_write_fd = os.pipe()
+        stderr_read_fd, stderr_write_fd = os.pipe()
+
+        request = {
+            "code_file_path": code_file_path,
+            "cwd": cwd or os.getcwd(),
+            "time_limit_ms": time_limit_ms,
+            "memory_limit": memory_limit,
+        }
+        child_fds = [stdin_read_fd, stdout_write_fd, stderr_write_fd, report_write_fd]
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.settimeout(STARTUP_TIMEOUT)
+                client.connect(self.socket_path)
+                socket.send_fds(client, [json.dumps(request).encode("utf-8")], child_fds)
+                monitor_pid = int(client.recv(32))
+        except BaseException:
+            for fd in [stdin_write_fd, stdout_read_fd, stderr_read_fd]:
+                if fd is not None:
+                    os.close(fd)
+            raise
+        finally:
+            for fd in child_fds[:3]:
+                os.close(fd)
+
+        return PooledProcess(
+            monitor_pid,
+            open(stdin_write_fd, "wb", buffering=0) if stdin_write_fd is not None else None,
+            open(stdout_read_fd, "rb", buffering=0),
+            open(stderr_read_fd, "rb", buffering=0),
+        )
+
+
+fork_server = PythonForkServer()
+atexit.register(fork_server.stop)
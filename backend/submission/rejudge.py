@@ -0,0 +1,329 @@
+import time
+import signal
+import datetime
+import multiprocessing
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from problems.models import Problem, TestCase
+from contests.models import Contest
+from contests.leaderboard import ContestStandings
+from .models import RejudgeItemModel, RejudgeModel, SubmissionModel, SubmissionQueueModel
+from .judge import evaluate_submission, get_worker_name, requeue_interrupted
+from .stats import rebuild_stats
+from .workspace import workspace_pool
+
+BATCH_SIZE = 1000
+PENDING_STATUSES = ["queued", "running"]
+INTERNAL_ERROR = "Internal Server Error"
+# How many changed submissions a report lists; the verdict change counts always cover all of them.
+REPORT_CHANGES_LIMIT = 500
+
+
+def parse_moment(value, name):
+    """Parse an ISO date or datetime; a date means its midnight, and naive times are in the server's zone."""
+    if isinstance(value, datetime.datetime):
+        moment = value
+    else:
+        moment = parse_datetime(str(value))
+        if moment is None:
+            day = parse_date(str(value))
+            if day is None:
+                raise ValueError(f"{name} must be an ISO date or datetime.")
+            moment = datetime.datetime.combine(day, datetime.time())
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def get_filters(problem_id=None, verdicts=None, submitted_after=None, submitted_before=None):
+    """Check the filters of a rejudge and return them as ``create_rejudge`` takes them. Raises ``ValueError``."""
+    if problem_id is None and not verdicts and submitted_after is None and submitted_before is None:
+        raise ValueError("Give a problem, verdicts or a date range to select the submissions by.")
+    if problem_id is not None:
+        try:
+            problem_id = int(problem_id)
+        except (TypeError, ValueError):
+            raise ValueError("problem_id must be a number.")
+        if not Problem.objects.filter(id=problem_id).exists():
+            raise ValueError(f"Problem {problem_id} not found.")
+    if verdicts is not None and not isinstance(verdicts, (list, tuple)):
+        raise ValueError("verdicts must be a list.")
+    known_verdicts = {verdict for verdict, _ in SubmissionModel.VERDICT_CHOICES}
+    verdicts = list(verdicts or [])
+    unknown = [verdict for verdict in verdicts if verdict not in known_verdicts]
+    if unknown:
+        raise ValueError(f"Unknown verdicts: {', '.join(map(str, unknown))}.")
+    if submitted_after is not None:
+        submitted_after = parse_moment(submitted_after, "submitted_after")
+    if submitted_before is not None:
+        submitted_before = parse_moment(submitted_before, "submitted_before")
+    return {
+        "problem_id": problem_id,
+        "verdicts": verdicts,
+        "submitted_after": submitted_after,
+        "submitted_before": submitted_before,
+    }
+
+
+def create_rejudge(problem_id=None, verdicts=None, submitted_after=None, submitted_before=None, created_by=None):
+    """Queue every submission matching all of the given filters for rejudging.
+
+    ``submitted_after`` is inclusive and ``submitted_before`` exclusive. Each submission's
+    current verdict is kept with it, so the rejudge can report what changed however
+    often it is interrupted. Raises ``ValueError`` when nothing matches.
+    """
+    submissions = SubmissionModel.objects.all()
+    if problem_id is not None:
+        submissions = submissions.filter(problem_id=problem_id)
+    if verdicts:
+        submissions = submissions.filter(verdict__in=verdicts)
+    if submitted_after is not None:
+        submissions = submissions.filter(timestamp__gte=submitted_after)
+    if submitted_before is not None:
+        submissions = submissions.filter(timestamp__lt=submitted_before)
+    submissions = submissions.order_by("id").values_list("id", "verdict")
+
+    with transaction.atomic():
+        rejudge = RejudgeModel.objects.create(
+            problem_id_id=problem_id,
+            verdicts=verdicts or [],
+            submitted_after=submitted_after,
+            submitted_before=submitted_before,
+            created_by=created_by,
+        )
+        last_id = 0
+        while True:
+            batch = list(submissions.filter(id__gt=last_id)[:BATCH_SIZE])
+            if not batch:
+                break
+            RejudgeItemModel.objects.bulk_create([
+                RejudgeItemModel(rejudge=rejudge, submission_id=submission_id, old_verdict=verdict)
+                for submission_id, verdict in batch
+            ])
+            rejudge.total += len(batch)
+            last_id = batch[-1][0]
+        if not rejudge.total:
+            raise ValueError("No submissions match these filters.")
+        rejudge.save(update_fields=["total"])
+    return rejudge
+
+
+def claim_next_item(worker_name, rejudge_id=None):
+    """Claim the oldest queued submission of a running rejudge, of ``rejudge_id`` if given, or return None."""
+    items = RejudgeItemModel.objects.filter(status="queued", rejudge__status="running")
+    if rejudge_id is not None:
+        items = items.filter(rejudge_id=rejudge_id)
+    items = items.select_related("submission__code_blob", "submission__problem_id").order_by("id")
+    # Claimed with a conditional UPDATE, as queued submissions are, so any number of workers can share them.
+    while True:
+        item = items.first()
+        if item is None:
+            return None
+        claimed = RejudgeItemModel.objects.filter(id=item.id, status="queued").update(
+            status="running", worker=worker_name, updated_at=timezone.now()
+        )
+        if claimed:
+            RejudgeModel.objects.filter(id=item.rejudge_id, started_at=None).update(started_at=timezone.now())
+            item.status = "running"
+            item.worker = worker_name
+            return item
+
+
+def process_item(item):
+    """Judge a claimed submission again and store its new verdict in place.
+
+    A submission that cannot be judged keeps its verdict and its item is marked failed.
+    The worker that judges the last submission of a rejudge finishes it.
+    """
+    submission = item.submission
+    try:
+        test_cases = list(TestCase.objects.filter(problem_id=submission.problem_id_id).order_by("id"))
+        if not test_cases:
+            result = {
+                "status": "internal_error",
+                "verdict": INTERNAL_ERROR,
+                "details": "No test cases found for this problem.",
+            }
+        else:
+            result = evaluate_submission(submission.code, submission.language, submission.problem_id, test_cases)
+    except Exception as e:
+        result = {
+            "status": "internal_error",
+            "verdict": INTERNAL_ERROR,
+            "details": f"{str(e)} - exception",
+        }
+
+    failed = result["verdict"] == INTERNAL_ERROR
+    now = timezone.now()
+    with transaction.atomic():
+        if not failed:
+            SubmissionModel.objects.filter(id=submission.id).update(
+                verdict=result["verdict"], time_taken=result["max_time"], memory_taken=result["max_memory"]
+            )
+            # The judging status the user was shown follows the new verdict too.
+            SubmissionQueueModel.objects.filter(submission_id=submission.id).update(
+                verdict=result["verdict"],
+                details=result.get("details"),
+                failed_test=result.get("failed_test"),
+                max_time=result["max_time"],
+                total_time=result["total_time"],
+                max_memory=result["max_memory"],
+                updated_at=now,
+            )
+        RejudgeItemModel.objects.filter(id=item.id).update(
+            status="failed" if failed else "done",
+            new_verdict=None if failed else result["verdict"],
+            changed=not failed and result["verdict"] != item.old_verdict,
+            details=result.get("details"),
+            updated_at=now,
+        )
+
+    if not RejudgeItemModel.objects.filter(rejudge_id=item.rejudge_id, status__in=PENDING_STATUSES).exists():
+        finish_rejudge(item.rejudge_id)
+    return result
+
+
+def finish_rejudge(rejudge_id):
+    """Rebuild what is derived from the changed verdicts and mark the rejudge done.
+
+    The stats of every user with a changed verdict are rebuilt from their history, and
+    the standings of every contest with one are rebuilt and saved under a new
+    ``standings_version``, which makes server processes drop the standings they hold.
+    Running it twice does no harm, so a resumed rejudge may repeat it.
+    """
+    changed = RejudgeItemModel.objects.filter(rejudge_id=rejudge_id, changed=True)
+    user_ids = set(changed.values_list("submission__user_id", flat=True))
+    if user_ids:
+        rebuild_stats(user_ids)
+    contest_ids = set(changed.exclude(submission__contest=None).values_list("submission__contest", flat=True))
+    for contest in Contest.objects.filter(id__in=contest_ids):
+        Contest.objects.filter(id=contest.id).update(standings_version=F("standings_version") + 1)
+        contest.refresh_from_db(fields=["standings_version"])
+        # Saved here so that server processes load the snapshot instead of each replaying the contest.
+        standings = ContestStandings(contest)
+        standings.refresh(force=True)
+        standings.save()
+    RejudgeModel.objects.filter(id=rejudge_id, status="running").update(status="done", finished_at=timezone.now())
+
+
+def get_rejudge_progress(rejudge):
+    """Return the rejudge's filters, item counts by status and judging throughput, from one aggregate query."""
+    counts = rejudge.items.aggregate(
+        **{status: Count("id", filter=Q(status=status)) for status, _ in RejudgeItemModel.STATUS_CHOICES},
+        changed=Count("id", filter=Q(changed=True)),
+    )
+    judged = counts["done"] + counts["failed"]
+    elapsed = None
+    if rejudge.started_at is not None:
+        elapsed = ((rejudge.finished_at or timezone.now()) - rejudge.started_at).total_seconds()
+    return {
+        "id": rejudge.id,
+        "status": rejudge.status,
+        "problem_id": rejudge.problem_id_id,
+        "verdicts": rejudge.verdicts,
+        "submitted_after": rejudge.submitted_after,
+        "submitted_before": rejudge.submitted_before,
+        "total": rejudge.total,
+        **counts,
+        "submissions_per_second": round(judged / elapsed, 2) if elapsed else None,
+        "created_at": rejudge.created_at,
+        "started_at": rejudge.started_at,
+        "finished_at": rejudge.finished_at,
+    }
+
+
+def get_rejudge_report(rejudge, changes_limit=REPORT_CHANGES_LIMIT):
+    """Return ``get_rejudge_progress`` with the verdict changes and the changed submissions.
+
+    Changes are counted per old and new verdict over the whole rejudge, and the first
+    ``changes_limit`` changed submissions are listed by id.
+    """
+    changed = rejudge.items.filter(changed=True)
+    verdict_changes = (
+        changed.values("old_verdict", "new_verdict").annotate(count=Count("id")).order_by("-count", "old_verdict")
+    )
+    changed_submissions = (
+        changed.order_by("submission_id")
+        .values_list("submission_id", "submission__user_id", "old_verdict", "new_verdict")[:changes_limit]
+    )
+    return {
+        **get_rejudge_progress(rejudge),
+        "verdict_changes": [
+            {"from": change["old_verdict"], "to": change["new_verdict"], "count": change["count"]}
+            for change in verdict_changes
+        ],
+        "changed_submissions": [
+            {"submission_id": submission_id, "user_id": user_id, "from": old_verdict, "to": new_verdict}
+            for submission_id, user_id, old_verdict, new_verdict in changed_submissions
+        ],
+    }
+
+
+def run_item_worker(index, rejudge_id, stop_event):
+    # As judge workers do: the parent decides when to stop, so a submission is never left half judged.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker_name = get_worker_name(f"rejudge-{index}")
+    connections.close_all()
+    workspace_pool.fill()
+    while not stop_event.is_set():
+        item = claim_next_item(worker_name, rejudge_id)
+        if item is None:
+            break
+        process_item(item)
+    connections.close_all()
+
+
+def run_rejudge(rejudge_id, num_workers=None, on_progress=None, progress_interval=1.0):
+    """Judge the rejudge's queued submissions with ``num_workers`` processes until none are left.
+
+    Judge workers started by ``runjudge`` may take some of them as well. Submissions left
+    running by a worker that has since stopped are queued again first, as are those
+    of a worker that crashed, which is restarted. ``on_progress(progress)``
+    is called every ``progress_interval`` seconds with ``get_rejudge_progress``. Returns
+    False when interrupted with Ctrl-C; running it again resumes where it stopped.
+    """
+    num_workers = num_workers or settings.JUDGE_WORKERS
+    running = RejudgeItemModel.objects.filter(rejudge_id=rejudge_id, status="running")
+    requeue_interrupted(running)
+    connections.close_all()
+
+    stop_event = multiprocessing.Event()
+
+    def start_worker(index):
+        process = multiprocessing.Process(
+            target=run_item_worker, args=(index, rejudge_id, stop_event), name=f"rejudge-worker-{index}"
+        )
+        process.start()
+        return process
+
+    workers = [start_worker(index) for index in range(num_workers)]
+    interrupted = False
+    try:
+        while any(process.is_alive() for process in workers):
+            time.sleep(progress_interval)
+            for index, process in enumerate(workers):
+                if process.is_alive() or process.exitcode == 0:
+                    continue
+                print(f"Warning: rejudge worker {index} (pid {process.pid}) exited with code {process.exitcode}, restarting it.")
+                requeue_interrupted(running)
+                connections.close_all()
+                workers[index] = start_worker(index)
+            if on_progress is not None:
+                on_progress(get_rejudge_progress(RejudgeModel.objects.get(id=rejudge_id)))
+    except KeyboardInterrupt:
+        interrupted = True
+    finally:
+        stop_event.set()
+        for process in workers:
+            process.join(timeout=settings.JUDGE_SHUTDOWN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+
+    if interrupted:
+        return False
+    # A run interrupted after its last submission was judged has not been finished yet.
+    pending = RejudgeItemModel.objects.filter(rejudge_id=rejudge_id, status__in=PENDING_STATUSES).exists()
+    if not pending and RejudgeModel.objects.filter(id=rejudge_id, status="running").exists():
+        finish_rejudge(rejudge_id)
+    return True
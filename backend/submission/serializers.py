@@ -1,14 +1,14 @@
 from rest_framework import serializers
 from .models import SubmissionModel
 
-class SubmissionSerializer(serializers.ModelSerializer):
-    
-    problem_name = serializers.SlugRelatedField(
-        source='problem_id',
-        slug_field='problem_name',
-        read_only=True
-    )
-    
+class SubmissionListSerializer(serializers.ModelSerializer):
+    """Submission history rows without the code, which is fetched per submission."""
+
+    problem_name = serializers.CharField(source='problem_id.problem_name', read_only=True)
+
+    # Columns the list needs, for ``QuerySet.only`` together with ``select_related('problem_id')``.
+    QUERY_FIELDS = ['id', 'language', 'timestamp', 'verdict', 'time_taken', 'memory_taken', 'problem_id__problem_name']
+
     class Meta:
         model = SubmissionModel
-        fields = ['id', 'problem_name', 'language', 'code', 'timestamp', 'verdict', 'problem_id', 'time_taken', 'memory_taken']
\ No newline at end of file
+        fields = ['id', 'problem_name', 'language', 'timestamp', 'verdict', 'problem_id', 'time_taken', 'memory_taken']
@@ -0,0 +1,118 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F
+from problems.models import Problem
+from .models import SubmissionModel, UserProblemStatsModel, UserStatsModel
+
+ACCEPTED = "Accepted"
+SOLVED_FIELDS = {"Easy": "easy_solved", "Medium": "medium_solved", "Hard": "hard_solved"}
+
+
+def apply_verdict(row, verdict, time_taken, timestamp):
+    """Fold one submission into a ``UserProblemStatsModel`` row, in submission order.
+
+    Returns ``(newly_attempted, newly_solved)``, which is what the user's totals need.
+    """
+    newly_attempted = row.attempts == 0
+    newly_solved = False
+    row.attempts += 1
+    row.last_submitted_at = max(filter(None, [row.last_submitted_at, timestamp]), default=None)
+    if verdict == ACCEPTED:
+        row.accepted_attempts += 1
+        if time_taken is not None and (row.best_time is None or time_taken < row.best_time):
+            row.best_time = time_taken
+        if row.first_accepted_at is None:
+            row.first_accepted_at = timestamp
+            row.attempts_to_solve = row.attempts
+            newly_solved = True
+    return newly_attempted, newly_solved
+
+
+def record_verdict(submission, difficulty=None):
+    """Update the stats of the submission's user for a verdict that was just stored.
+
+    Call it inside the transaction that stored the submission, so the two never disagree.
+    Costs a handful of single-row statements, however many submissions the user has.
+    """
+    user_id, problem_id = submission.user_id_id, submission.problem_id_id
+    # Create the rows if missing without a read first, so concurrent workers cannot both insert.
+    UserProblemStatsModel.objects.bulk_create(
+        [UserProblemStatsModel(user_id_id=user_id, problem_id_id=problem_id)], ignore_conflicts=True
+    )
+    UserStatsModel.objects.bulk_create([UserStatsModel(user_id_id=user_id)], ignore_conflicts=True)
+
+    row = UserProblemStatsModel.objects.select_for_update().get(user_id=user_id, problem_id=problem_id)
+    newly_attempted, newly_solved = apply_verdict(row, submission.verdict, submission.time_taken, submission.timestamp)
+    row.save()
+
+    totals = {
+        "attempts": F("attempts") + 1,
+        "accepted_attempts": F("accepted_attempts") + int(submission.verdict == ACCEPTED),
+        "problems_attempted": F("problems_attempted") + int(newly_attempted),
+        "problems_solved": F("problems_solved") + int(newly_solved),
+    }
+    if newly_solved:
+        if difficulty is None:
+            difficulty = Problem.objects.values_list("difficulty", flat=True).get(id=problem_id)
+        if difficulty in SOLVED_FIELDS:
+            totals[SOLVED_FIELDS[difficulty]] = F(SOLVED_FIELDS[difficulty]) + 1
+    UserStatsModel.objects.filter(user_id=user_id).update(**totals)
+
+
+def rebuild_stats(user_ids=None, batch_size=1000):
+    """Recompute the stats tables from the full submission history.
+
+    With ``user_ids`` only those users are rebuilt. Runs in one transaction, so readers
+    see either the old numbers or the new ones.
+    """
+    difficulties = dict(Problem.objects.values_list("id", "difficulty"))
+    submissions = SubmissionModel.objects.order_by("timestamp", "id").values_list(
+        "user_id", "problem_id", "verdict", "time_taken", "timestamp"
+    )
+    if user_ids is not None:
+        submissions = submissions.filter(user_id__in=user_ids)
+
+    rows = {}
+    users = defaultdict(lambda: UserStatsModel())
+    for user_id, problem_id, verdict, time_taken, timestamp in submissions.iterator(chunk_size=batch_size):
+        row = rows.get((user_id, problem_id))
+        if row is None:
+            row = rows[(user_id, problem_id)] = UserProblemStatsModel(user_id_id=user_id, problem_id_id=problem_id)
+        newly_attempted, newly_solved = apply_verdict(row, verdict, time_taken, timestamp)
+
+        totals = users[user_id]
+        totals.user_id_id = user_id
+        totals.attempts += 1
+        totals.accepted_attempts += int(verdict == ACCEPTED)
+        totals.problems_attempted += int(newly_attempted)
+        if newly_solved:
+            totals.problems_solved += 1
+            field = SOLVED_FIELDS.get(difficulties.get(problem_id))
+            if field:
+                setattr(totals, field, getattr(totals, field) + 1)
+
+    with transaction.atomic():
+        problem_stats = UserProblemStatsModel.objects.all()
+        user_stats = UserStatsModel.objects.all()
+        if user_ids is not None:
+            problem_stats = problem_stats.filter(user_id__in=user_ids)
+            user_stats = user_stats.filter(user_id__in=user_ids)
+        problem_stats.delete()
+        user_stats.delete()
+        UserProblemStatsModel.objects.bulk_create(rows.values(), batch_size=batch_size)
+        UserStatsModel.objects.bulk_create(users.values(), batch_size=batch_size)
+    return len(users), len(rows)
+
+
+def get_user_stats(user_id):
+    """Return the user's totals as a dict, from one primary key lookup."""
+    stats = UserStatsModel.objects.filter(user_id=user_id).first() or UserStatsModel(user_id_id=user_id)
+    return {
+        "user_id": user_id,
+        "problems_solved": stats.problems_solved,
+        "problems_attempted": stats.problems_attempted,
+        "attempts": stats.attempts,
+        "accepted_attempts": stats.accepted_attempts,
+        "acceptance_rate": round(100 * stats.accepted_attempts / stats.attempts, 2) if stats.attempts else 0,
+        "solved_by_difficulty": {difficulty: getattr(stats, field) for difficulty, field in SOLVED_FIELDS.items()},
+    }
@@ -0,0 +1,62 @@
+import os
+import threading
+from collections import OrderedDict
+from django.conf import settings
+
+
+class TestDataCache:
+    """Least recently used cache of test case files, bounded by their total size in bytes.
+
+    An entry is checked against the file's mtime and size on every lookup and the file
+    is read again when they changed. Files larger than the whole cache are read every time.
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+
+    def get_max_bytes(self):
+        return settings.JUDGE_TEST_DATA_CACHE_BYTES if self.max_bytes is None else self.max_bytes
+
+    def get(self, file_path):
+        """Return the contents of ``file_path`` as bytes."""
+        file_stat = os.stat(file_path)
+        with self.lock:
+            entry = self.entries.get(file_path)
+            if entry and entry["mtime_ns"] == file_stat.st_mtime_ns and entry["size"] == file_stat.st_size:
+                self.entries.move_to_end(file_path)
+                return entry["data"]
+
+        with open(file_path, "rb") as f:
+            data = f.read()
+
+        with self.lock:
+            entry = self.entries.pop(file_path, None)
+            if entry:
+                self.size_bytes -= entry["size"]
+
+            if len(data) <= self.get_max_bytes():
+                self.entries[file_path] = {
+                    "mtime_ns": file_stat.st_mtime_ns,
+                    "size": len(data),
+                    "data": data,
+                }
+                self.size_bytes += len(data)
+                self.evict()
+        return data
+
+    def evict(self):
+        while self.size_bytes > self.get_max_bytes() and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.size_bytes -= entry["size"]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+
+# Each judge worker process fills its own copy lazily.
+test_data_cache = TestDataCache()
@@ -1,11 +1,22 @@
 from django.urls import path
+from django.views.decorators.csrf import csrf_exempt
 from .views import *
 
 urlpatterns = [
     path('execute/run/', RunCustomTestCaseView.as_view(), name='code-execution'),
     path('execute/submit/', SubmitCodeView.as_view(), name='code-judge'),
+    path('execute/status/<int:submission_id>', SubmissionStatusView.as_view(), name='code-judge-status'),
+    path('execute/events/<int:submission_id>', SubmissionEventsView.as_view(), name='code-judge-events'),
+    path('judge/metrics/', JudgeMetricsView.as_view(), name='judge-metrics'),
+    path('judge/rejudges/', RejudgeView.as_view(), name='rejudges'),
+    path('judge/rejudges/<int:rejudge_id>', RejudgeDetailView.as_view(), name='rejudge-detail'),
     path('save-code/', SaveCodeView.as_view(), name="save-code"),
     path('ai-review/', AiCodeReview.as_view(), name="ai-review"),
+    # Authenticated with JWT like the DRF views, which are CSRF exempt as well.
+    path('ai-review/stream/', csrf_exempt(AiCodeReviewStreamView.as_view()), name="ai-review-stream"),
     path('submissions/<int:user_id>', getUserSubmissions.as_view(), name="get-user-submissions"),
+    path('submissions/code/<int:submission_id>', SubmissionCodeView.as_view(), name="get-submission-code"),
+    path('stats/<int:user_id>', UserStatsView.as_view(), name="get-user-stats"),
+    path('stats/<int:user_id>/<int:problem_id>', UserProblemStatsView.as_view(), name="get-user-problem-stats"),
     path('submissions/<int:user_id>/<str:problem_name>', getUserSubmissionByProblemId.as_view(), name="get-user-submissions-by-problem-id"),
 ]
\ No newline at end of file
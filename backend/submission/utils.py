@@ -1,17 +1,18 @@
 import os
-import uuid
+import signal
 import subprocess
-from pathlib import Path
-from google import genai
-from dotenv import load_dotenv
 import time
 import re
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(os.path.join(BASE_DIR, ".env"))
-GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
-
-client = genai.Client(api_key=GEMINI_API_KEY)
+import selectors
+from contextlib import contextmanager
+from django.conf import settings
+from asgiref.sync import sync_to_async
+from .compile_cache import compile_source
+from .launcher import get_launcher_path, parse_report
+from .python_pool import fork_server
+from .workspace import job_workspace
+from . import ai_cache
+from .ai_backends import UpstreamBusyError, complete, stream, upstream_limiter
 
 def is_cin_used_as_input(filepath):
     try:
@@ -38,215 +39,352 @@ def is_cin_used_as_input(filepath):
         print(f"Error: The file '{filepath}' was not found.")
         return False
 
-def execute_code(code, language, user_input , input_type):
+COMPILERS = {"c": "gcc", "cpp": "g++"}
+PYTHON_COMMAND = "python"
+OUTPUT_CHUNK_SIZE = 64 * 1024
+# Allocation failures under RLIMIT_AS surface as these messages, or as a crash close to the limit.
+MEMORY_ERROR_MARKERS = ["MemoryError", "std::bad_alloc"]
+MEMORY_LIMIT_MARGIN = 0.9
+# The launcher's CPU timer kills with SIGPROF, and RLIMIT_CPU with SIGXCPU.
+CPU_LIMIT_RETURNCODES = [-signal.SIGPROF, -signal.SIGXCPU]
 
-    folder_name = "InputCodes"
-    curr_dir = os.getcwd()
-    folder_path = os.path.join(curr_dir, folder_name)
-    os.makedirs(folder_path, exist_ok=True)
+def get_limits(language, problem=None):
+    """Return the ``run_program`` limits for ``language``, scaled by its multipliers.
 
-    unique_name = uuid.uuid4().hex
-    code_file_name = f"{unique_name}.{language}"
-    code_file_path = os.path.join(folder_path, code_file_name)
-    executable_file_path = None 
-    
-    result = {
-        "status": "internal_error",
-        "details": "An unexpected server error occurred."
+    The problem's own limits are used when one is given, otherwise the judge defaults.
+    """
+    multipliers = settings.JUDGE_LANGUAGE_LIMIT_MULTIPLIERS.get(language, {})
+    if problem is not None:
+        time_limit, memory_limit, output_limit = problem.time_limit, problem.memory_limit, problem.output_limit
+    else:
+        time_limit = settings.JUDGE_DEFAULT_TIME_LIMIT_MS
+        memory_limit = settings.JUDGE_MEMORY_LIMIT_MB
+        output_limit = settings.JUDGE_OUTPUT_LIMIT_KB
+
+    return {
+        "timeout_seconds": time_limit * multipliers.get("time", 1) / 1000,
+        "memory_limit": int(memory_limit * multipliers.get("memory", 1) * 1024 * 1024),
+        "output_limit": output_limit * 1024,
     }
 
-    try:
-        with open(code_file_path, "w", encoding="utf-8") as f:
-            f.write(code)
-
-        if language == "c":
-            result = cAndCppCompilationAndExecution(folder_path, unique_name, code_file_path, user_input, 2, "gcc", input_type)
-            executable_file_path = os.path.join(folder_path, unique_name)
-
-        elif language == "cpp":
-            result = cAndCppCompilationAndExecution(folder_path, unique_name, code_file_path, user_input, 2, "g++", input_type)
-            executable_file_path = os.path.join(folder_path, unique_name)
-
-        elif language == "py":
-            try:
-                start_time = time.monotonic()
-                if (input_type == "bytes"):
-                    execution_result = subprocess.run(
-                        ["python", code_file_path],
-                        input=user_input,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        timeout=7
-                    )
-                else:
-                    with open(f"{user_input}", "r") as input_file:
-                        execution_result = subprocess.run(
-                            ["python", code_file_path],
-                            stdin=input_file,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            timeout=7
-                        )
-
-                end_time = time.monotonic()
-                execution_stdout = execution_result.stdout.decode("utf-8", errors='ignore')
-                execution_stderr = execution_result.stderr.decode("utf-8", errors='ignore')
-                
-                if execution_stderr:
-                    result = {
-                        "status": "runtime_error",
-                        "details": execution_stderr
-                    }
-                else:
-                    result = {
-                    "status": "success",
-                    "output": execution_stdout,
-                    "execution_time": int((end_time - start_time)*1000)
-                    }
-            except FileNotFoundError:
-                result = {
+@contextmanager
+def code_workspace():
+    """Yield ``(folder_path, unique_name)`` for a job's files.
+
+    The folder is the job's own directory from the workspace pool, so nothing in it is
+    shared with other jobs and it is emptied for reuse when the job ends.
+    """
+    with job_workspace() as folder_path:
+        yield folder_path, "solution"
+
+def prepare_program(code, language, folder_path, unique_name):
+    """Write the source into the workspace and compile it when the language needs it.
+
+    Returns ``(command, None)`` with the command that runs the program, or
+    ``(None, result)`` with the error result when it cannot be run.
+    """
+    code_file_path = os.path.join(folder_path, f"{unique_name}.{language}")
+    with open(code_file_path, "w", encoding="utf-8") as f:
+        f.write(code)
+
+    if language in COMPILERS:
+        compiler = COMPILERS[language]
+        try:
+            executable_file_path, compilation_error = compile_source(compiler, code_file_path)
+        except FileNotFoundError:
+            return None, {
                 "status": "internal_error",
-                "details": "Python interpreter not found. Is it installed and in PATH?"
-                }
-            except subprocess.TimeoutExpired:
-                result = {
-                "status": "timeout_error",
-                "details": f"Execution timed out after {1 if language in ['c', 'cpp'] else 7} seconds."
-                }
+                "details": f"{compiler} compiler not found. Is it installed and in PATH?"
+            }
+        except subprocess.TimeoutExpired:
+            return None, {
+                "status": "compilation_error",
+                "details": "Compilation timed out."
+            }
+
+        if compilation_error is not None:
+            return None, {
+                "status": "compilation_error",
+                "details": compilation_error
+            }
+        return [executable_file_path], None
+
+    elif language == "py":
+        return [PYTHON_COMMAND, code_file_path], None
+
+    return None, {
+        "status": "invalid_language",
+        "details": f"Language '{language}' is not supported."
+    }
+
+def capture_output(process, input_data, deadline, output_limit, output_consumer=None):
+    """Read stdout and stderr as they are produced, never holding more than ``output_limit`` bytes.
+
+    Stdout chunks are handed to ``output_consumer`` when one is given instead of being kept;
+    when it returns False the output is already known to be wrong and the program is stopped.
+    Returns ``(stdout, stderr, outcome)`` where ``outcome`` is ``"closed"``, ``"timeout"``,
+    ``"output_limit"`` or ``"mismatch"``; the program has been stopped in the latter three cases.
+    """
+    stdout_chunks = []
+    stderr_chunks = []
+    output_size = 0
+    input_offset = 0
 
+    with selectors.DefaultSelector() as selector:
+        if process.stdin:
+            if input_data:
+                os.set_blocking(process.stdin.fileno(), False)
+                selector.register(process.stdin, selectors.EVENT_WRITE)
+            else:
+                process.stdin.close()
+        selector.register(process.stdout, selectors.EVENT_READ)
+        selector.register(process.stderr, selectors.EVENT_READ)
+
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                process.terminate()
+                return None, b"".join(stderr_chunks), "timeout"
+
+            for key, _ in selector.select(remaining):
+                if key.fileobj is process.stdin:
+                    try:
+                        input_offset += os.write(key.fd, input_data[input_offset:input_offset + OUTPUT_CHUNK_SIZE])
+                    except BrokenPipeError:
+                        input_offset = len(input_data)
+                    if input_offset >= len(input_data):
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+                    continue
+
+                chunk = os.read(key.fd, OUTPUT_CHUNK_SIZE)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    continue
+                output_size += len(chunk)
+                if output_size > output_limit:
+                    process.terminate()
+                    return None, b"".join(stderr_chunks), "output_limit"
+                if key.fileobj is process.stderr:
+                    stderr_chunks.append(chunk)
+                elif output_consumer:
+                    if output_consumer(chunk) is False:
+                        process.terminate()
+                        return None, b"".join(stderr_chunks), "mismatch"
+                else:
+                    stdout_chunks.append(chunk)
+
+    return b"".join(stdout_chunks), b"".join(stderr_chunks), "closed"
+
+def wait_for_exit(process, deadline):
+    """Reap the launcher, stopping the program if it is still running at ``deadline``.
+
+    Returns True when the program had to be stopped.
+    """
+    timed_out = False
+    try:
+        process.wait(timeout=max(0, deadline - time.monotonic()))
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        # The launcher turns SIGTERM into SIGKILL for the program and still reports its usage.
+        process.terminate()
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+
+    # Take down the launcher if it is stuck, and anything the program left running.
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    process.wait()
+    return timed_out
+
+def start_program(command, stdin, report_write_fd, time_limit_ms, memory_limit, cwd=None):
+    """Start ``command`` under the launcher, or in the Python fork server when it runs a Python file.
+
+    Both report the program's exit status and usage on ``report_write_fd``.
+    """
+    if settings.JUDGE_PYTHON_FORKSERVER and command[0] == PYTHON_COMMAND:
+        try:
+            return fork_server.spawn(command[1], stdin, report_write_fd, time_limit_ms, memory_limit, cwd)
+        except (OSError, RuntimeError, ValueError) as e:
+            print(f"Warning: Python fork server unavailable, starting a fresh interpreter: {e}")
+
+    launcher_command = [
+        get_launcher_path(), str(time_limit_ms), str(memory_limit), str(report_write_fd), *command
+    ]
+    return subprocess.Popen(
+        launcher_command,
+        stdin=stdin,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        pass_fds=(report_write_fd,),
+        start_new_session=True,
+        cwd=cwd,
+    )
+
+def run_program(command, user_input, input_type, timeout_seconds, output_limit=None, output_consumer=None, memory_limit=None, cwd=None):
+    """Run ``command`` with the given stdin under CPU, memory and output limits.
 
+    ``output_limit`` and ``memory_limit`` are in bytes and default to ``JUDGE_OUTPUT_LIMIT_KB``
+    and ``JUDGE_MEMORY_LIMIT_MB``. When ``output_consumer`` is given, stdout is streamed to it
+    and the result has no output; the program is stopped with status ``output_mismatch`` as
+    soon as the consumer returns False. ``execution_time`` is the program's CPU time in ms and
+    ``memory_used`` its peak resident set size in KB, both measured by the launcher.
+    The program runs in ``cwd``, normally the job's workspace, when it is given.
+    """
+    if output_limit is None:
+        output_limit = settings.JUDGE_OUTPUT_LIMIT_KB * 1024
+    if memory_limit is None:
+        memory_limit = settings.JUDGE_MEMORY_LIMIT_MB * 1024 * 1024
+    time_limit_ms = int(timeout_seconds * 1000)
+
+    report_read_fd, report_write_fd = os.pipe()
+    input_file = None
+    try:
+        if (input_type == "bytes"):
+            stdin = subprocess.PIPE
         else:
-            result = {
-                "status": "invalid_language",
-                "details": f"Language '{language}' is not supported."
-            }
+            input_file = open(f"{user_input}", "rb")
+            stdin = input_file
+        start_time = time.monotonic()
+        process = start_program(command, stdin, report_write_fd, time_limit_ms, memory_limit, cwd)
+    except BaseException:
+        os.close(report_read_fd)
+        raise
+    finally:
+        os.close(report_write_fd)
+        if input_file:
+            input_file.close()
 
-    except Exception as e:
-        result = {
+    # The CPU limit stops busy programs; the wall-clock deadline catches ones that sleep or block.
+    deadline = start_time + timeout_seconds * settings.JUDGE_WALL_TIME_FACTOR
+    try:
+        execution_stdout, execution_stderr, outcome = capture_output(
+            process,
+            user_input if input_type == "bytes" else None,
+            deadline,
+            output_limit,
+            output_consumer,
+        )
+    except BaseException:
+        process.terminate()
+        raise
+    finally:
+        timed_out = wait_for_exit(process, deadline)
+        for pipe in [process.stdin, process.stdout, process.stderr]:
+            if pipe and not pipe.closed:
+                pipe.close()
+        with os.fdopen(report_read_fd, "rb") as report_file:
+            report = parse_report(report_file.read())
+    end_time = time.monotonic()
+
+    if report and "exec_error" in report:
+        return {
             "status": "internal_error",
-            "details": f"An unexpected error occurred during processing: {e}"
+            "details": f"Executable not found: {command[0]}"
         }
-    finally:
-        if os.path.exists(code_file_path):
-            try:
-                os.remove(code_file_path)
-            except OSError as e:
-                print(f"Warning: Could not remove source file {code_file_path}: {e}")
-
-        if executable_file_path and os.path.exists(executable_file_path):
-            try:
-                os.remove(executable_file_path)
-            except OSError as e:
-                print(f"Warning: Could not remove executable file {executable_file_path}: {e}")
-
-        if os.path.exists(folder_path):
-            try:
-                os.rmdir(folder_path)
-            except OSError as e:
-                print(f"Warning: Could not remove folder {folder_path}: {e}")
+    if report:
+        returncode = report["returncode"]
+        usage = {
+            "execution_time": report["cpu_time"],
+            "memory_used": report["max_rss"],
+        }
+    else:
+        returncode = process.returncode
+        usage = {
+            "execution_time": int((end_time - start_time) * 1000),
+            "memory_used": 0,
+        }
+
+    if outcome == "mismatch":
+        # Stopped on purpose, so neither the way it ended nor its stderr mean anything.
+        return {
+            "status": "output_mismatch",
+            "details": "Output differs from the expected output.",
+            **usage
+        }
+    if outcome == "timeout" or timed_out or usage["execution_time"] > time_limit_ms or returncode in CPU_LIMIT_RETURNCODES:
+        return {
+            "status": "timeout_error",
+            "details": f"Execution timed out after {timeout_seconds:g} seconds.",
+            **usage
+        }
+    elif outcome == "output_limit":
+        return {
+            "status": "output_limit_error",
+            "details": f"Output exceeded the limit of {output_limit // 1024} KB.",
+            **usage
+        }
+
+    execution_stderr = execution_stderr.decode("utf-8", errors='ignore')
 
+    if returncode != 0 and (
+        usage["memory_used"] * 1024 >= memory_limit * MEMORY_LIMIT_MARGIN
+        or any(marker in execution_stderr for marker in MEMORY_ERROR_MARKERS)
+    ):
+        return {
+            "status": "memory_limit_error",
+            "details": f"Memory limit of {memory_limit // (1024 * 1024)} MB exceeded.",
+            **usage
+        }
+    elif returncode != 0:
+        details = execution_stderr
+        if not details:
+            details = f"""Process exited with non-zero return code: {returncode}
+            Possible reasons:
+            1. If your program is reading input from standard input and you forgot to provide input via stdin.
+            2. Your program contains infinite recursive function calls.
+            3. May be your program is trying to process large data and it takes much time to process"""
+
+        return {
+            "status": "runtime_error",
+            "details": details,
+            **usage
+        }
+    elif execution_stderr:
+        return {
+            "status": "runtime_error",
+            "details": execution_stderr,
+            **usage
+        }
+    result = {
+        "status": "success",
+        **usage
+    }
+    if output_consumer is None:
+        result["output"] = execution_stdout.decode("utf-8", errors='ignore')
     return result
 
-def cAndCppCompilationAndExecution(folder_path, unique_name, code_file_path, user_input, timeout_seconds, compiler, input_type):
-    executable_file_path = os.path.join(folder_path, unique_name)
+def execute_code(code, language, user_input , input_type):
+    result = {
+        "status": "internal_error",
+        "details": "An unexpected server error occurred."
+    }
+
     try:
-        compilation_res = subprocess.run(
-            [compiler, code_file_path, "-o", executable_file_path],
-            capture_output=True,
-            text=True,
-        )
-    except FileNotFoundError:
+        with code_workspace() as (folder_path, unique_name):
+            command, result = prepare_program(code, language, folder_path, unique_name)
+            if command is None:
+                return result
+
+            code_file_path = os.path.join(folder_path, f"{unique_name}.{language}")
+            if (language in COMPILERS and is_cin_used_as_input(code_file_path) and input_type == "bytes" and user_input == b''):
+                return {
+                    "status": "runtime_error",
+                    "details": "Program is reading input from standard input and you forgot to provide input via stdin."
+                }
+
+            result = run_program(command, user_input, input_type, cwd=folder_path, **get_limits(language))
+
+    except Exception as e:
         result = {
             "status": "internal_error",
-            "details": f"{compiler} compiler not found. Is it installed and in PATH?"
-        }
-        return result
-    except subprocess.TimeoutExpired:
-        result = {
-            "status": "compilation_error",
-            "details": f"Compilation timed out after {timeout_seconds} seconds."
+            "details": f"An unexpected error occurred during processing: {e}"
         }
-        return result
-    
 
-    # Basedir = os.getcwd()
-    # os.chdir(os.path.join(Basedir, "InputCodes"))
-    
-    if compilation_res.returncode != 0:
-            result = {
-                "status": "compilation_error",
-                "details": compilation_res.stderr
-            }
-    else:
-        if (is_cin_used_as_input(code_file_path) and input_type == "bytes" and user_input == b''):
-            # os.chdir(Basedir)
-            return {
-                "status": "runtime_error",
-                "details": "Program is reading input from standard input and you forgot to provide input via stdin."
-            }
-        try:
-            start_time = time.monotonic()
-            if (input_type == "bytes"):
-                execution_result = subprocess.run(
-                    [f"{executable_file_path}"],
-                    input=user_input,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    timeout=timeout_seconds
-                )
-            else:
-                print(1, user_input)    
-                with open(f"{user_input}", "r") as input_file:
-                    print(1)
-                    print(input_file)
-                    execution_result = subprocess.run(
-                        [f"{executable_file_path}"],
-                        stdin=input_file,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        timeout=timeout_seconds
-                    )
-            end_time = time.monotonic()
-            
-            execution_stdout = execution_result.stdout.decode("utf-8", errors='ignore')
-            execution_stderr = execution_result.stderr.decode("utf-8", errors='ignore')
-            
-            if execution_result.returncode != 0:
-                details = execution_stderr
-                if not details:
-                    details = f"""Process exited with non-zero return code: {execution_result.returncode}
-                    Possible reasons:
-                    1. If your program is reading input from standard input and you forgot to provide input via stdin.
-                    2. Your program contains infinite recursive function calls.
-                    3. May be your program is trying to process large data and it takes much time to process"""
-                    
-                result = {
-                    "status": "runtime_error",
-                    "details": details
-                }
-            elif execution_stderr:
-                 result = {
-                    "status": "runtime_error",
-                    "details": execution_stderr
-                }
-            else:
-                result = {
-                    "status": "success",
-                    "output": execution_stdout,
-                    "execution_time": int((end_time - start_time)*1000)
-                }
-        except FileNotFoundError:
-            result = {
-                "status": "internal_error",
-                "details": f"Executable not found after compilation: {executable_file_path}"
-            }
-        except subprocess.TimeoutExpired:
-            result = {
-                "status": "timeout_error",
-                "details": f"Execution timed out after {timeout_seconds} seconds."
-            }
-    # os.chdir(Basedir)
-    
     return result
 
 def getPrompt(reviewType):
@@ -266,19 +404,42 @@ def getPrompt(reviewType):
     
     return
 
-def aiCodeReview(code, reviewType, problem_statement, problem_name, problem_constraints, language):
+def getAiPrompt(code, reviewType, problem_statement, problem_name, problem_constraints, language):
     basePrompt = getPrompt(reviewType=reviewType)
     codeLanguage = f"provide Boilerplate code in {language} language:"
     if reviewType == "provideHints":
-        prompt = basePrompt + problem_name + problem_statement + problem_constraints
+        return basePrompt + problem_name + problem_statement + problem_constraints
     elif reviewType == "getBoilerPateCode":
-        prompt = basePrompt + problem_name + problem_statement + problem_constraints + codeLanguage
-    else:
-        prompt = problem_name + problem_statement + problem_constraints + basePrompt + code
-    
-    
-    response = client.models.generate_content(
-        model="gemini-2.0-flash", 
-        contents={prompt},
-    )
-    return response.text
\ No newline at end of file
+        return basePrompt + problem_name + problem_statement + problem_constraints + codeLanguage
+    return problem_name + problem_statement + problem_constraints + basePrompt + code
+
+def aiCodeReview(code, reviewType, problem_statement, problem_name, problem_constraints, language, refresh=False):
+    prompt = getAiPrompt(code, reviewType, problem_statement, problem_name, problem_constraints, language)
+    cache_key = ai_cache.get_cache_key(reviewType, problem_name, problem_statement, problem_constraints, language, code)
+
+    return ai_cache.get_or_generate(cache_key, reviewType, lambda: complete(prompt), refresh=refresh)
+
+async def aiCodeReviewStream(code, reviewType, problem_statement, problem_name, problem_constraints, language):
+    """Yield the AI response in chunks as the model produces it.
+
+    A cached response is yielded whole. At most ``AI_MAX_CONCURRENT_REQUESTS`` model calls
+    run at once per process; ``UpstreamBusyError`` is raised when no slot frees up within
+    ``AI_QUEUE_TIMEOUT_SECONDS``. Only responses that streamed completely are cached.
+    """
+    prompt = getAiPrompt(code, reviewType, problem_statement, problem_name, problem_constraints, language)
+    cache_key = ai_cache.get_cache_key(reviewType, problem_name, problem_statement, problem_constraints, language, code)
+    cached = await sync_to_async(ai_cache.get_cached)(cache_key)
+    if cached is not None:
+        yield cached
+        return
+
+    if not await upstream_limiter.acquire(settings.AI_QUEUE_TIMEOUT_SECONDS):
+        raise UpstreamBusyError("The AI service is busy, please try again shortly.")
+    chunks = []
+    try:
+        async for chunk in stream(prompt):
+            chunks.append(chunk)
+            yield chunk
+    finally:
+        upstream_limiter.release()
+    await sync_to_async(ai_cache.store)(cache_key, reviewType, "".join(chunks))
\ No newline at end of file
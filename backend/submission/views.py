@@ -2,12 +2,26 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import AuthenticationFailed
+from django.views import View
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+import json
 from .models import *
 from problems.models import *
 from accounts.models import *
-from .utils import execute_code, aiCodeReview
-from .serializers import SubmissionSerializer
+from contests.models import Contest
+from .utils import execute_code, aiCodeReview, aiCodeReviewStream
+from .serializers import SubmissionListSerializer
+from .pagination import SubmissionCursorPagination
+from .stats import get_user_stats
+from .write_behind import get_saved_code, flush_saved_code, writer as write_behind_writer
+from .autosave import InvalidPatch, StaleVersion, save_draft
+from .events import get_job, get_status_data, submission_events
+from .rejudge import create_rejudge, get_filters, get_rejudge_progress, get_rejudge_report
+from . import compile_cache
 
 class SaveCodeView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -22,15 +36,10 @@ class SaveCodeView(APIView):
             return Response(status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            user_instance = CustomUser.objects.get(id=user_id)
-            problem_instance = Problem.objects.get(id=problem_id)
-
-            code_obj = CodeSaveModel.objects.get(
-                user_id=user_instance, problem_id=problem_instance,
-                language=language
-            )
+            code, version = get_saved_code(user_id, problem_id, language)
             data = {
-                "code": code_obj.code,
+                "code": code,
+                "version": version,
             }
             return Response(data, status=status.HTTP_200_OK)
         except CodeSaveModel.DoesNotExist:
@@ -38,26 +47,40 @@ class SaveCodeView(APIView):
         except Exception as e:
             return Response({"error":str(e)},status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def post(self, request):  # sourcery skip: use-named-expression
+    def post(self, request):
+        """Save the full ``code``, or a ``patch`` of edits to the code saved at ``base_version``.
+
+        Answers with the new ``version``, or with 409 and the saved ``code`` and ``version``
+        when the save was made against an older version.
+        """
         code = request.data.get("code")
+        patch = request.data.get("patch")
+        base_version = request.data.get("base_version")
         user_id = request.data.get("user_id")
         problem_id = request.data.get("problem_id")
         language = request.data.get("language")
 
+        if not user_id or not problem_id or not language:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        if patch is not None and base_version is None:
+            return Response({"error": "A patch needs the base_version it was made against."}, status=status.HTTP_400_BAD_REQUEST)
+        if base_version is not None and (not isinstance(base_version, int) or isinstance(base_version, bool)):
+            return Response({"error": "base_version must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
         try:
-            user_instance = CustomUser.objects.get(id=user_id)
-            problem_instance = Problem.objects.get(id=problem_id)
-            isPrevCodeExist = CodeSaveModel.objects.filter(
-                user_id=user_instance, problem_id=problem_instance, language=language
-            ).first()
-
-            if isPrevCodeExist:
-                isPrevCodeExist.code = code
-                isPrevCodeExist.save()
-            else:
-                CodeSaveModel.objects.create(user_id=user_instance, problem_id=problem_instance, code=code, language=language)
-
-            return Response(status=status.HTTP_200_OK)
+            # Checked here, as queued saves are written later where a missing row cannot be reported.
+            if not CustomUser.objects.filter(id=user_id).exists() or not Problem.objects.filter(id=problem_id).exists():
+                return Response({"error": "User or problem not found."}, status=status.HTTP_404_NOT_FOUND)
+            version = save_draft(user_id, problem_id, language, code, patch, base_version)
+            return Response({"version": version}, status=status.HTTP_200_OK)
+        except InvalidPatch as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except StaleVersion as e:
+            return Response({
+                "error": str(e),
+                "code": e.code,
+                "version": e.version,
+            }, status=status.HTTP_409_CONFLICT)
         except Exception as e:
             return Response({"error":str(e)},status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -75,7 +98,7 @@ class RunCustomTestCaseView(APIView):
 
         result = execute_code(code, language, user_input, "bytes")
 
-        if (result["status"] in ["compilation_error", "runtime_error", "invalid_language"]):
+        if (result["status"] in ["compilation_error", "runtime_error", "output_limit_error", "memory_limit_error", "invalid_language"]):
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
         elif (result["status"] == "internal_error"):
             return Response(result, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -93,6 +116,7 @@ class SubmitCodeView(APIView):
         problem_id = request.data.get("problem_id")
         code = request.data.get("code")
         language = request.data.get("language")
+        contest_id = request.data.get("contest_id")
 
         if(not user_id or not problem_id or not code or not language):
             return Response({
@@ -109,88 +133,36 @@ class SubmitCodeView(APIView):
         try:
             user_instance = CustomUser.objects.filter(id=user_id).first()
             problem_instance = Problem.objects.filter(id=problem_id).first()
-            test_cases_files = TestCase.objects.filter(problem=problem_instance).first()
-            input_file_path = test_cases_files.input_data_file
-            output_file_path = test_cases_files.output_data_file
-            
-            result = execute_code(code, language, input_file_path, "file")
-            
-            if result["status"] == "success":
-                output = (result["output"])
-
-                with open(output_file_path, "r") as f:
-                    expected_output = f.read()
-
-                normalized_output = output.replace('\r\n', '\n')
-                normalized_expected_output = expected_output.replace('\r\n', '\n')
-
-                def strip_trailing(ws_text: str) -> str:
-                    lines = ws_text.split('\n')
-                    return "\n".join(line.rstrip() for line in lines)
-
-                clean_output   = strip_trailing(normalized_output).strip()
-                clean_expected_output = strip_trailing(normalized_expected_output).strip()
+            if not user_instance or not problem_instance:
+                return Response({
+                    "verdict": "Invalid request.",
+                    "details": "User or problem not found."
+                }, status=status.HTTP_404_NOT_FOUND)
 
-                if clean_output == clean_expected_output:
-                    result["verdict"] = "Accepted"
-                else:
-                    result["verdict"] = "Wrong Answer"
+            contest = None
+            if contest_id:
+                contest = Contest.objects.filter(id=contest_id, problems=problem_instance).first()
+                if not contest or not contest.is_running(timezone.now()):
+                    return Response({
+                        "verdict": "Invalid request.",
+                        "details": "This problem is not part of a running contest."
+                    }, status=status.HTTP_400_BAD_REQUEST)
 
-                SubmissionModel.objects.create(
-                    language=language,
-                    code=code,
-                    user_id=user_instance,
-                    problem_id=problem_instance,
-                    verdict=result["verdict"],
-                    time_taken=result["execution_time"],
-                )
+            # The editor's last autosave is written now rather than after its debounce.
+            flush_saved_code(user_id, problem_id, language)
+            queued_submission = SubmissionQueueModel.objects.create(
+                language=language,
+                code=code,
+                user_id=user_instance,
+                problem_id=problem_instance,
+                contest=contest,
+            )
 
-                return Response({
-                    "verdict": result["verdict"],
-                    "details": "All test cases passed." if result["verdict"] == "Accepted" else "Test cases failed. Please check your code."
-                }, status=status.HTTP_200_OK)
-            
-            elif (result["status"] in ["compilation_error", "runtime_error", "invalid_language"]):
-                if result["status"] == "compilation_error":
-                    result["verdict"] = "Compilation Error"
-                elif result["status"] == "runtime_error":
-                    result["verdict"] = "Runtime Error"
-                elif result["status"] == "invalid_language":
-                    result["verdict"] = "Invalid Language"
-                if result["verdict"] == "Compilation Error" or result["verdict"] == "Runtime Error":
-                    SubmissionModel.objects.create(
-                        language=language,
-                        code=code,
-                        user_id=user_instance,
-                        problem_id=problem_instance,
-                        verdict=result["verdict"],
-                        time_taken=0,
-                    )
+            return Response({
+                "submission_id": queued_submission.id,
+                "status": queued_submission.status,
+            }, status=status.HTTP_202_ACCEPTED)
 
-                return Response({
-                    "verdict": result["verdict"],
-                    "details": result["details"]
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            elif (result["status"] == "timeout_error"):
-                SubmissionModel.objects.create(
-                    language=language,
-                    code=code,
-                    user_id=user_instance,
-                    problem_id=problem_instance,
-                    verdict="Time Limit Exceeded",
-                    time_taken=7000 if language == "py" else 2000,
-                )
-                return Response({
-                    "verdict": "Time Limit Exceeded",
-                    "details": result["details"]
-                }, status=status.HTTP_408_REQUEST_TIMEOUT)
-            else:
-                return Response({
-                    "verdict": result["status"],
-                    "details": result["details"]
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
         except Exception as e:
             return Response({
                 "verdict": "Internal Server Error",
@@ -198,6 +170,20 @@ class SubmitCodeView(APIView):
             },status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class SubmissionStatusView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, submission_id:int):
+        queued_submission = SubmissionQueueModel.objects.filter(id=submission_id, user_id=request.user).first()
+        if not queued_submission:
+            return Response({
+                "error": "Submission not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(get_status_data(queued_submission), status=status.HTTP_200_OK)
+
+
 class AiCodeReview(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -218,6 +204,96 @@ class AiCodeReview(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def server_sent_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def authenticate_stream(request):
+    """Authenticate a request to an async view with JWT, as the DRF views do.
+
+    Returns ``(user, None)``, or ``(None, response)`` with the 401 to send back.
+    """
+    try:
+        authenticated = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return None, JsonResponse({"detail": str(e.detail)}, status=status.HTTP_401_UNAUTHORIZED)
+    if authenticated is None:
+        return None, JsonResponse({"detail": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
+    return authenticated[0], None
+
+def stream_response(events):
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Keep proxies such as nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+class AiCodeReviewStreamView(View):
+    """Stream an AI response as server-sent events without holding a worker while the model runs.
+
+    Sends ``data: {"text": ...}`` events as text arrives, then a ``done`` event, or an
+    ``error`` event with ``{"error": ...}``. Fully asynchronous when served by ``core.asgi``.
+    """
+
+    async def post(self, request):
+        user, error_response = await authenticate_stream(request)
+        if error_response is not None:
+            return error_response
+
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"error": "Request body must be JSON."}, status=status.HTTP_400_BAD_REQUEST)
+
+        async def events():
+            try:
+                async for text in aiCodeReviewStream(
+                    data.get("code") or "",
+                    data.get("reviewType"),
+                    data.get("problem_statement"),
+                    data.get("problem_name"),
+                    data.get("problem_constraints"),
+                    data.get("language") or "",
+                ):
+                    yield server_sent_event({"text": text})
+                yield server_sent_event({}, "done")
+            except Exception as e:
+                yield server_sent_event({"error": str(e)}, "error")
+
+        return stream_response(events())
+
+class SubmissionEventsView(View):
+    """Stream the judging of a queued submission as server-sent events.
+
+    Sends ``status`` events as it is compiled and run, a ``test`` event per finished test
+    case and a ``verdict`` event with what ``execute/status/<id>`` reports, then ends. With
+    ``core.asgi`` the same events are pushed over a WebSocket on this path.
+    """
+
+    async def get(self, request, submission_id:int):
+        user, error_response = await authenticate_stream(request)
+        if error_response is not None:
+            return error_response
+
+        job = await sync_to_async(get_job)(submission_id, user)
+        if job is None:
+            return JsonResponse({"error": "Submission not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        async def events():
+            async for event, data in submission_events(submission_id):
+                # A comment line keeps idle connections from being dropped by proxies.
+                yield ": keepalive\n\n" if event is None else server_sent_event(data, event)
+
+        return stream_response(events())
+
+def paginate_submissions(submissions, request, view):
+    # One query per page: the problem name is joined in and the code is never loaded.
+    submissions = submissions.select_related('problem_id').only(*SubmissionListSerializer.QUERY_FIELDS)
+    paginator = SubmissionCursorPagination()
+    page = paginator.paginate_queryset(submissions, request, view=view)
+    serializer = SubmissionListSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
 class getUserSubmissions(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
@@ -230,9 +306,8 @@ class getUserSubmissions(APIView):
                 return Response({
                     "error": "User not found"
                 }, status=status.HTTP_404_NOT_FOUND)
-            submissions = SubmissionModel.objects.filter(user_id=user.id).order_by('-timestamp')
-            serializer = SubmissionSerializer(submissions, many=True)
-            return Response({"submissions": serializer.data}, status=status.HTTP_200_OK)
+            submissions = SubmissionModel.objects.filter(user_id=user.id)
+            return paginate_submissions(submissions, request, self)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
@@ -254,8 +329,111 @@ class getUserSubmissionByProblemId(APIView):
                     "error": "Problem not found"
                 }, status=status.HTTP_404_NOT_FOUND)
 
-            problemSubmission = SubmissionModel.objects.filter(user_id=user.id, problem_id=problem.id).order_by('-timestamp')
-            serializer = SubmissionSerializer(problemSubmission, many=True)
-            return Response({"submissions": serializer.data}, status=status.HTTP_200_OK)
+            problemSubmission = SubmissionModel.objects.filter(user_id=user.id, problem_id=problem.id)
+            return paginate_submissions(problemSubmission, request, self)
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class SubmissionCodeView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, submission_id:int):
+        submission = (
+            SubmissionModel.objects.filter(id=submission_id)
+            .select_related('code_blob').only('id', 'language', 'user_id', 'code_blob__data').first()
+        )
+        # Other users' code is reported as missing rather than forbidden.
+        if not submission or (submission.user_id_id != request.user.id and not request.user.is_staff):
+            return Response({
+                "error": "Submission not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "id": submission.id,
+            "code": submission.code,
+            "language": submission.language,
+        }, status=status.HTTP_200_OK)
+
+
+class JudgeMetricsView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            "compile_cache": compile_cache.get_stats(),
+            "precompiled_headers": compile_cache.get_pch_stats(),
+            "write_behind": write_behind_writer.get_stats(),
+        }, status=status.HTTP_200_OK)
+
+
+class RejudgeView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+    LIST_LIMIT = 50
+
+    def get(self, request):
+        rejudges = RejudgeModel.objects.order_by('-id')[:self.LIST_LIMIT]
+        return Response({
+            "rejudges": [get_rejudge_progress(rejudge) for rejudge in rejudges],
+        }, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        # Queued for the judge workers, which take these submissions whenever no new ones are waiting.
+        try:
+            filters = get_filters(
+                request.data.get("problem_id"),
+                request.data.get("verdicts"),
+                request.data.get("submitted_after"),
+                request.data.get("submitted_before"),
+            )
+            rejudge = create_rejudge(**filters, created_by=request.user)
+        except ValueError as e:
+            return Response({
+                "error": str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return Response(get_rejudge_progress(rejudge), status=status.HTTP_201_CREATED)
+
+
+class RejudgeDetailView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, rejudge_id: int):
+        rejudge = RejudgeModel.objects.filter(id=rejudge_id).first()
+        if not rejudge:
+            return Response({
+                "error": "Rejudge not found"
+            }, status=status.HTTP_404_NOT_FOUND)
+        return Response(get_rejudge_report(rejudge), status=status.HTTP_200_OK)
+
+
+class UserStatsView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, user_id: int):
+        # Read from the stats tables that judging keeps up to date, never from the submissions.
+        return Response(get_user_stats(user_id), status=status.HTTP_200_OK)
+
+
+class UserProblemStatsView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, user_id: int, problem_id: int):
+        stats = UserProblemStatsModel.objects.filter(user_id=user_id, problem_id=problem_id).first()
+        if stats is None:
+            stats = UserProblemStatsModel(user_id_id=user_id, problem_id_id=problem_id)
+        return Response({
+            "user_id": user_id,
+            "problem_id": problem_id,
+            "attempts": stats.attempts,
+            "accepted_attempts": stats.accepted_attempts,
+            "attempts_to_solve": stats.attempts_to_solve,
+            "first_accepted_at": stats.first_accepted_at,
+            "best_time": stats.best_time,
+            "last_submitted_at": stats.last_submitted_at,
+        }, status=status.HTTP_200_OK)
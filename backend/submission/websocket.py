@@ -0,0 +1,78 @@
+import re
+import json
+import asyncio
+from urllib.parse import parse_qs
+from django.db import close_old_connections
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from .events import get_job, submission_events
+
+SUBMISSION_EVENTS_PATH = re.compile(r"^/api/v1/execute/events/(\d+)/?$")
+# Close codes in the range reserved for applications, mirroring the HTTP statuses.
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+
+
+def authorize(raw_token, submission_id):
+    # Browsers cannot set headers on a WebSocket, so the access token comes in the query string.
+    try:
+        authentication = JWTAuthentication()
+        user = authentication.get_user(authentication.get_validated_token(raw_token))
+        return get_job(submission_id, user), None
+    except AuthenticationFailed:
+        return None, CLOSE_UNAUTHORIZED
+    finally:
+        close_old_connections()
+
+
+async def receive_until_disconnect(receive):
+    while (await receive())["type"] != "websocket.disconnect":
+        pass
+
+
+async def submission_events_socket(scope, receive, send, submission_id):
+    """Push the judging events of a queued submission, as ``{"event": ..., "data": ...}`` messages.
+
+    Connect to ``ws://<host>/api/v1/execute/events/<id>?token=<access token>``. The
+    messages are the events ``execute/events/<id>`` streams, and the socket is closed
+    after the ``verdict`` one.
+    """
+    raw_token = parse_qs(scope.get("query_string", b"").decode()).get("token", [""])[0]
+    if not raw_token:
+        await send({"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+        return
+    job, close_code = await sync_to_async(authorize)(raw_token, submission_id)
+    if job is None:
+        await send({"type": "websocket.close", "code": close_code or CLOSE_NOT_FOUND})
+        return
+    await send({"type": "websocket.accept"})
+
+    async def push():
+        async for event, data in submission_events(submission_id):
+            # The server pings idle sockets itself, so keep-alives are not passed on.
+            if event is not None:
+                await send({"type": "websocket.send", "text": json.dumps({"event": event, "data": data})})
+        await send({"type": "websocket.close", "code": 1000})
+
+    tasks = [asyncio.ensure_future(push()), asyncio.ensure_future(receive_until_disconnect(receive))]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for task in done:
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+
+
+async def websocket_application(scope, receive, send):
+    """Serve the WebSocket connections of ``core.asgi``, which Django does not handle itself."""
+    if (await receive())["type"] != "websocket.connect":
+        return
+    match = SUBMISSION_EVENTS_PATH.match(scope["path"])
+    if match is None:
+        await send({"type": "websocket.close", "code": CLOSE_NOT_FOUND})
+        return
+    await submission_events_socket(scope, receive, send, int(match.group(1)))
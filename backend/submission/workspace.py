@@ -0,0 +1,109 @@
+import os
+import atexit
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+
+WORKSPACE_PREFIX = "job-"
+
+
+def get_workspace_root():
+    workspace_root = str(settings.JUDGE_WORKSPACE_ROOT)
+    os.makedirs(workspace_root, exist_ok=True)
+    return workspace_root
+
+
+def empty_directory(path):
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+class WorkspacePool:
+    """Private scratch directories for jobs, recycled instead of created for every job.
+
+    Each directory is handed to one job at a time and emptied before it is reused. A
+    process only ever recycles directories it created itself, so judge workers forked
+    from one parent never share them.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.owner_pid = None
+        self.idle = []
+        self.created = set()
+
+    def reset_if_forked(self):
+        # Directories inherited across fork() belong to the parent process.
+        if self.owner_pid != os.getpid():
+            self.owner_pid = os.getpid()
+            self.idle = []
+            self.created = set()
+
+    def create(self):
+        path = tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=get_workspace_root())
+        self.created.add(path)
+        return path
+
+    def fill(self):
+        """Pre-create directories until ``JUDGE_WORKSPACE_POOL_SIZE`` are idle."""
+        with self.lock:
+            self.reset_if_forked()
+            while len(self.idle) < settings.JUDGE_WORKSPACE_POOL_SIZE:
+                self.idle.append(self.create())
+
+    def acquire(self):
+        with self.lock:
+            self.reset_if_forked()
+            if not self.created:
+                while len(self.idle) < settings.JUDGE_WORKSPACE_POOL_SIZE:
+                    self.idle.append(self.create())
+            while self.idle:
+                path = self.idle.pop()
+                if os.path.isdir(path):
+                    return path
+                self.created.discard(path)
+            return self.create()
+
+    def release(self, path):
+        try:
+            empty_directory(path)
+        except OSError:
+            shutil.rmtree(path, ignore_errors=True)
+        with self.lock:
+            if path not in self.created:
+                return
+            if os.path.isdir(path) and len(self.idle) < settings.JUDGE_WORKSPACE_POOL_SIZE:
+                self.idle.append(path)
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+                self.created.discard(path)
+
+    def close(self):
+        with self.lock:
+            if self.owner_pid == os.getpid():
+                for path in self.created:
+                    shutil.rmtree(path, ignore_errors=True)
+            self.idle = []
+            self.created = set()
+
+
+workspace_pool = WorkspacePool()
+atexit.register(workspace_pool.close)
+
+
+@contextmanager
+def job_workspace():
+    """Yield a directory that belongs to this job alone and is emptied when it ends."""
+    path = workspace_pool.acquire()
+    try:
+        yield path
+    finally:
+        workspace_pool.release(path)
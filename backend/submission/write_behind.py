@@ -0,0 +1,290 @@
+import os
+import time
+import atexit
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.utils import timezone
+from .models import CodeBlobModel, CodeSaveModel
+
+RETRIES = 3
+
+
+class WriteBehindWriter:
+    """Commit queued writes in batches from one background thread, instead of one by one.
+
+    Each write is a ``(handler, key, value)``. A write to a key that is still queued
+    replaces the queued value, so a burst of writes to one row costs one row write. The
+    thread waits ``DB_WRITE_BEHIND_INTERVAL`` for more writes to arrive, then calls each
+    handler once with its values, all in one transaction. SQLite allows one writer at a
+    time, so a batch takes the write lock once for many rows.
+
+    A write queued with a ``delay`` is held until its key has had no new write for that
+    long, or ``max_delay`` after it was first queued, whichever comes first.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.owner_pid = os.getpid()
+        self.condition = threading.Condition()
+        self.pending = OrderedDict()
+        self.writing = {}
+        self.thread = None
+        self.stopping = False
+        self.queued_seq = 0
+        self.stats = {"queued": 0, "coalesced": 0, "batches": 0, "written": 0, "failed": 0}
+
+    def reset_if_forked(self):
+        # The thread and anything still queued belong to the parent process.
+        if self.owner_pid != os.getpid():
+            self.reset()
+
+    def put(self, handler, key, value, delay=0, max_delay=None):
+        self.reset_if_forked()
+        with self.condition:
+            self.queued_seq += 1
+            self.stats["queued"] += 1
+            now = time.monotonic()
+            deadline = now + (delay if max_delay is None else max_delay)
+            if (handler, key) in self.pending:
+                self.stats["coalesced"] += 1
+                deadline = self.pending[(handler, key)][3]
+                self.pending.move_to_end((handler, key))
+            self.pending[(handler, key)] = (self.queued_seq, value, min(now + delay, deadline), deadline)
+            if self.thread is None:
+                self.stopping = False
+                self.thread = threading.Thread(target=self.run, name="write-behind", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def get_pending(self, handler, key):
+        """Return the value queued for ``key`` that is not committed yet, or None."""
+        self.reset_if_forked()
+        with self.condition:
+            item = self.pending.get((handler, key)) or self.writing.get((handler, key))
+            return item[1] if item else None
+
+    def is_written(self, target, keys=None):
+        # Whether every write queued up to ``target``, to one of ``keys`` if given, is committed.
+        if self.thread is None:
+            return True
+        for items in (self.pending, self.writing):
+            for item_key, (seq, *_) in items.items():
+                if seq <= target and (keys is None or item_key in keys):
+                    return False
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is written, delayed writes included. Returns False on timeout."""
+        self.reset_if_forked()
+        with self.condition:
+            target = self.queued_seq
+            self.make_due(self.pending)
+            return self.condition.wait_for(lambda: self.is_written(target), timeout)
+
+    def flush_key(self, handler, key, timeout=None):
+        """Write the value queued for ``key`` now, and wait until it is committed."""
+        self.reset_if_forked()
+        with self.condition:
+            target = self.queued_seq
+            self.make_due([(handler, key)])
+            return self.condition.wait_for(lambda: self.is_written(target, {(handler, key)}), timeout)
+
+    def make_due(self, keys):
+        for item_key in list(keys):
+            if item_key in self.pending:
+                seq, value, _, deadline = self.pending[item_key]
+                self.pending[item_key] = (seq, value, 0, deadline)
+        self.condition.notify_all()
+
+    def get_due(self, now):
+        return [item_key for item_key, (_, _, due, _) in self.pending.items() if due <= now or self.stopping]
+
+    def close(self, timeout=None):
+        self.flush(timeout)
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+            thread = self.thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+    def take_batch(self):
+        with self.condition:
+            while not self.get_due(time.monotonic()):
+                if self.stopping and not self.pending:
+                    return None
+                timeout = min((due for _, _, due, _ in self.pending.values()), default=None)
+                self.condition.wait(None if timeout is None else max(timeout - time.monotonic(), 0))
+        # Let more writes arrive, so that they share the commit.
+        time.sleep(settings.DB_WRITE_BEHIND_INTERVAL)
+        with self.condition:
+            batch = []
+            for handler, key in self.get_due(time.monotonic())[:settings.DB_WRITE_BEHIND_BATCH_SIZE]:
+                seq, value, _, _ = self.pending.pop((handler, key))
+                batch.append((handler, key, seq, value))
+                # Still visible to get_pending until it is committed.
+                self.writing[(handler, key)] = (seq, value)
+            return batch
+
+    def run(self):
+        try:
+            while True:
+                batch = self.take_batch()
+                if batch is None:
+                    return
+                self.write(batch)
+                with self.condition:
+                    self.writing.clear()
+                    self.condition.notify_all()
+        finally:
+            connections.close_all()
+            with self.condition:
+                self.thread = None
+                self.condition.notify_all()
+
+    def write(self, batch):
+        handlers = OrderedDict()
+        for handler, key, _, value in batch:
+            handlers.setdefault(handler, []).append((key, value))
+
+        for attempt in range(RETRIES):
+            try:
+                with transaction.atomic():
+                    for handler, items in handlers.items():
+                        handler(items)
+                self.stats["batches"] += 1
+                self.stats["written"] += len(batch)
+                return
+            except OperationalError as e:
+                if attempt == RETRIES - 1:
+                    print(f"Warning: dropping {len(batch)} queued writes: {e}")
+                    self.stats["failed"] += len(batch)
+                    return
+                time.sleep(0.1 * (attempt + 1))
+            except IntegrityError:
+                break
+
+        # Some write in the batch is invalid, e.g. names a deleted problem; keep the others.
+        for handler, items in handlers.items():
+            for item in items:
+                try:
+                    with transaction.atomic():
+                        handler([item])
+                    self.stats["written"] += 1
+                except Exception as e:
+                    print(f"Warning: dropping queued write {item[0]}: {e}")
+                    self.stats["failed"] += 1
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                **self.stats,
+                "pending": len(self.pending),
+                "delayed": sum(1 for _, _, due, _ in self.pending.values() if due > time.monotonic()),
+            }
+
+
+writer = WriteBehindWriter()
+atexit.register(writer.close, 10)
+
+
+def get_upsert_sql(conditional):
+    """Return the INSERT ... ON CONFLICT of one code save, which only replaces a row still at a given version if ``conditional``."""
+    quote_name = connection.ops.quote_name
+    table = quote_name(CodeSaveModel._meta.db_table)
+    columns = [
+        quote_name(CodeSaveModel._meta.get_field(name).column)
+        for name in ["user_id", "problem_id", "language", "code_blob", "version", "timestamp"]
+    ]
+    code_blob, version = columns[3], columns[4]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))}) "
+        f"ON CONFLICT ({', '.join(columns[:3])}) DO UPDATE SET {code_blob} = excluded.{code_blob}, "
+    )
+    if conditional:
+        return sql + f"{version} = excluded.{version} WHERE {table}.{version} = %s"
+    # The stored version still goes up, so that a save held elsewhere and made over the
+    # version it replaces can never match it again.
+    greatest = "MAX" if connection.vendor == "sqlite" else "GREATEST"
+    return sql + f"{version} = {greatest}(excluded.{version}, {table}.{version} + 1)"
+
+
+def upsert_code_saves(items):
+    """Write ``((user_id, problem_id, language), (code, version, base_version))`` items with INSERT ... ON CONFLICT.
+
+    A save replaces the row only while the row is still at ``base_version``, the version
+    it was made on top of. Otherwise another server process saved a newer version in the
+    meantime, and the save is dropped rather than overwrite it. A ``base_version`` of None
+    replaces the row whatever its version. Code blobs left unused are deleted.
+    """
+    keys = {key for key, _ in items}
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    rows = {True: [], False: []}
+    blobs = set()
+    for (user_id, problem_id, language), (code, version, base_version) in items:
+        code_blob = None if code is None else CodeBlobModel.get_hash(code)
+        blobs.add(code_blob)
+        row = [user_id, problem_id, language, code_blob, version, now]
+        rows[base_version is not None].append(row if base_version is None else row + [base_version])
+
+    with transaction.atomic():
+        CodeBlobModel.store(code for _, (code, *_) in items)
+        # Filtered by user only and matched here: a query with one condition per key takes longer to build than to run.
+        replaced = {
+            code_blob
+            for *key, code_blob in CodeSaveModel.objects.filter(user_id__in={key[0] for key in keys})
+            .exclude(code_blob=None).values_list("user_id", "problem_id", "language", "code_blob")
+            if tuple(key) in keys
+        }
+        with connection.cursor() as cursor:
+            for conditional, params in rows.items():
+                if params:
+                    cursor.executemany(get_upsert_sql(conditional), params)
+        # Blobs of dropped saves are unused as well; prune keeps any blob that is still used.
+        unused = (replaced | blobs) - {None}
+        if unused:
+            CodeBlobModel.prune(unused)
+
+
+def save_code(user_id, problem_id, language, code, version=0, delay=0, max_delay=None, base_version=None):
+    """Save the code, queued for the write-behind thread unless ``DB_WRITE_BEHIND`` is off.
+
+    With a ``delay``, saves to the same code are coalesced in memory as ``WriteBehindWriter.put``
+    describes. With a ``base_version``, the save is only written over that version.
+    """
+    key = (int(user_id), int(problem_id), language)
+    if settings.DB_WRITE_BEHIND:
+        writer.put(upsert_code_saves, key, (code, version, base_version), delay, max_delay)
+    else:
+        upsert_code_saves([(key, (code, version, base_version))])
+
+
+def flush_saved_code(user_id, problem_id, language, timeout=None):
+    """Commit a save of the code that is still queued, without waiting for its delay."""
+    writer.flush_key(upsert_code_saves, (int(user_id), int(problem_id), language), timeout)
+
+
+def get_saved_draft(user_id, problem_id, language):
+    """Return the saved ``(code, version, base_version)``, including a save that is still queued.
+
+    ``base_version`` is the committed version a queued save is written over, which is
+    ``version`` itself when nothing is queued. Raises ``DoesNotExist``.
+    """
+    key = (int(user_id), int(problem_id), language)
+    pending = writer.get_pending(upsert_code_saves, key)
+    if pending is not None:
+        return pending
+    code_save = CodeSaveModel.objects.select_related("code_blob").only("version", "code_blob__data").get(
+        user_id=user_id, problem_id=problem_id, language=language
+    )
+    return code_save.code, code_save.version, code_save.version
+
+
+def get_saved_code(user_id, problem_id, language):
+    """Return the saved ``(code, version)``, including a save that is still queued. Raises ``DoesNotExist``."""
+    code, version, _ = get_saved_draft(user_id, problem_id, language)
+    return code, version
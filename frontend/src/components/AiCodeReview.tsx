@@ -1,6 +1,6 @@
 "use client";
-import { useGetAiReviewMutation } from "@/redux/submission/submissionApi";
-import React, { useEffect } from "react";
+import { streamAiReview } from "@/redux/submission/streamAiReview";
+import React from "react";
 import {
   Select,
   SelectContent,
@@ -30,21 +30,13 @@ type Props = {
   problem_constraints: string;
 };
 
-type AIError = {
-  status: number;
-  data: {
-    error: string;
-  };
-}
-
 const AiCodeReview = ({ code, problem_name, problem_statement, problem_constraints }: Props) => {
   const [aiFeature, setAiFeature] = React.useState<string>("codeReview");
   const [aiReview, setAiReview] = React.useState<string>("");
-  const [
-    getAIReview,
-    { isLoading: isAILoading, isError: isAIError, data: aiData, error: aiError },
-  ] = useGetAiReviewMutation();
+  const [isAILoading, setIsAILoading] = React.useState<boolean>(false);
+  const [aiError, setAiError] = React.useState<string>("");
 
+  // The review is streamed, so it is shown while the model is still writing it.
   const handleAIReview = async () => {
     const aiRequest = {
       code,
@@ -54,14 +46,19 @@ const AiCodeReview = ({ code, problem_name, problem_statement, problem_constrain
       problem_constraints,
     };
 
-    await getAIReview(aiRequest);
-  };
-
-  useEffect(() => {
-    if (aiData) {
-      setAiReview(aiData.review);
+    setAiReview("");
+    setAiError("");
+    setIsAILoading(true);
+    try {
+      await streamAiReview(aiRequest, (text) =>
+        setAiReview((review) => review + text)
+      );
+    } catch (error) {
+      setAiError((error as Error).message);
+    } finally {
+      setIsAILoading(false);
     }
-  }, [aiData]);
+  };
 
   return (
     <>
@@ -171,7 +168,7 @@ const AiCodeReview = ({ code, problem_name, problem_statement, problem_constrain
             <hr />
           </CardHeader>
           <CardContent className="p-0">
-            {isAILoading ? (
+            {isAILoading && !aiReview ? (
               <div className="flex flex-col items-center gap-1  justify-center py-8">
                 <LoadingSpinner size={24} />
                 <p className="text-slate-400 text-sm">
@@ -184,11 +181,11 @@ const AiCodeReview = ({ code, problem_name, problem_statement, problem_constrain
                     <Markdown>{aiReview.trim()}</Markdown>
                 </div>
               </ScrollArea>
-            ) : isAIError ? (
+            ) : aiError ? (
               <div className="flex items-center justify-center py-8">
                 <div className="text-center space-y-3 overflow-auto">
                   <p className="text-slate-400 text-sm">
-                    {(aiError as AIError )?.data.error}
+                    {aiError}
                   </p>
                 </div>
               </div>
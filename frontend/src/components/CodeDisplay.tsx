@@ -1,4 +1,4 @@
-import React from "react";
+import React, { useState } from "react";
 import {
   Dialog,
   DialogContent,
@@ -10,17 +10,23 @@ import { Button } from "./ui/button";
 import { Eye } from "lucide-react";
 import { Badge } from "./ui/badge";
 import CodeEditorDisplay from "./CodeEditorDisplay";
+import { useGetSubmissionCodeQuery } from "@/redux/submission/submissionApi";
 
 type Props = {
-  code: string;
+  submission_id: number;
   problem_name: string;
   language: string;
 };
 
-const CodeDisplay = ({ code, problem_name, language }: Props) => {
-   
+const CodeDisplay = ({ submission_id, problem_name, language }: Props) => {
+  const [open, setOpen] = useState(false);
+  // Submission lists leave the code out, so it is only fetched once the dialog is opened.
+  const { data, isLoading, isError } = useGetSubmissionCodeQuery(submission_id, {
+    skip: !open,
+  });
+
   return (
-    <Dialog>
+    <Dialog open={open} onOpenChange={setOpen}>
       <DialogTrigger asChild>
         <Button
           size="sm"
@@ -49,7 +55,13 @@ const CodeDisplay = ({ code, problem_name, language }: Props) => {
           </div>
         </DialogHeader>
 
-        <CodeEditorDisplay code={code} language={language} />
+        {isLoading ? (
+          <p className="text-slate-400 text-sm">Loading code...</p>
+        ) : isError ? (
+          <p className="text-red-400 text-sm">Failed to load code.</p>
+        ) : (
+          <CodeEditorDisplay code={data?.code ?? ""} language={language} />
+        )}
         
       </DialogContent>
     </Dialog>
@@ -1,6 +1,6 @@
 "use client";
 
-import React, { useEffect, useState } from "react";
+import React, { useCallback, useEffect, useRef, useState } from "react";
 import {
   Select,
   SelectContent,
@@ -11,6 +11,7 @@ import {
 import { Button } from "./ui/button";
 
 import {
+  SavedCodeRequest,
   useGetSavedCodeQuery,
   useSaveCodeMutation,
 } from "@/redux/submission/submissionApi";
@@ -38,6 +39,26 @@ type EditorThemeConfig = {
   description: string;
   color: string;
 };
+// The code is saved this long after the last keystroke.
+const AUTOSAVE_DELAY_MS = 1000;
+
+// The single edit that turns `before` into `after`, as a [start, end, text] patch.
+const getPatch = (before: string, after: string): [number, number, string] => {
+  let prefix = 0;
+  const shorter = Math.min(before.length, after.length);
+  while (prefix < shorter && before[prefix] === after[prefix]) {
+    prefix++;
+  }
+  let suffix = 0;
+  while (
+    suffix < shorter - prefix &&
+    before[before.length - 1 - suffix] === after[after.length - 1 - suffix]
+  ) {
+    suffix++;
+  }
+  return [prefix, before.length - suffix, after.slice(prefix, after.length - suffix)];
+};
+
 // Editor themes
 const EDITOR_THEMES: Record<string, EditorThemeConfig> = {
   "vs-dark": {
@@ -90,8 +111,18 @@ const CodeEditer = ({
   const [saveCode, { isLoading: isSavingCode, isError }] =
     useSaveCodeMutation();
 
+  // What the server has saved, which patches are made against; undefined until it is loaded.
+  const savedRef = useRef<{ code: string | null; version: number } | undefined>(
+    undefined
+  );
+
+  useEffect(() => {
+    savedRef.current = undefined;
+  }, [queryParams]);
+
   useEffect(() => {
     if (data) {
+      savedRef.current = { code: data.code, version: data.version };
       if (!data.code) {
         setCode("");
       } else {
@@ -99,21 +130,45 @@ const CodeEditer = ({
       }
     }
     if (getSaveCodeError) {
+      savedRef.current = { code: null, version: 0 };
       setCode("");
     }
   }, [data, getSaveCodeError, setCode]);
 
-  const handleSaveCode = async () => {
+  const handleSaveCode = useCallback(async () => {
+    const saved = savedRef.current;
     const stringified_code = JSON.stringify(code);
-    const data = {
-      code: stringified_code,
+    if (!saved || code === undefined || saved.code === stringified_code) {
+      return;
+    }
+    const request: SavedCodeRequest = {
       language: language,
       problem_id: problem_id,
       user_id: user_id,
     };
 
-    await saveCode(data);
-  };
+    let response = await saveCode(
+      saved.code === null
+        ? { ...request, code: stringified_code }
+        : {
+            ...request,
+            patch: [getPatch(saved.code, stringified_code)],
+            base_version: saved.version,
+          }
+    );
+    if ("error" in response && saved.code !== null) {
+      // Saved elsewhere since, e.g. in another tab: this editor's code wins.
+      response = await saveCode({ ...request, code: stringified_code });
+    }
+    if ("data" in response && response.data && savedRef.current === saved) {
+      savedRef.current = { code: stringified_code, version: response.data.version };
+    }
+  }, [code, language, problem_id, user_id, saveCode]);
+
+  useEffect(() => {
+    const timer = setTimeout(handleSaveCode, AUTOSAVE_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [handleSaveCode]);
 
   const getLanguageIcon = (lang: string) => {
     const icons: Record<string, string> = {
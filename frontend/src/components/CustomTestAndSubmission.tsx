@@ -4,10 +4,13 @@ import React, { useEffect } from "react";
 import { Button } from "./ui/button";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "./ui/tabs";
 import {
+  SubmissionStatusResponse,
   SubmitCodeRequest,
+  useGetSubmissionStatusQuery,
   useRunCustomTestCaseMutation,
   useSubmitCodeMutation,
 } from "@/redux/submission/submissionApi";
+import { subscribeToSubmission } from "@/redux/submission/subscribeToSubmission";
 import LoadingSpinner from "./LoadingSpinner";
 import {
   AlertTriangle,
@@ -49,6 +52,8 @@ type SubmitCodeData = {
   details: string;
 };
 
+const FINISHED_STATUSES = ["done", "failed"];
+
 
 type CustomTestOutput = {
   status: string;
@@ -83,6 +88,23 @@ const CustomTestAndSubmission = ({
     },
   ] = useSubmitCodeMutation();
 
+  const submissionId = submitResponseData?.submission_id;
+  const [isJudging, setIsJudging] = React.useState<boolean>(false);
+  // Judge events are pushed over a WebSocket; the status is polled only if that fails.
+  const [pushFailed, setPushFailed] = React.useState<boolean>(false);
+  const [pushedStatus, setPushedStatus] = React.useState<
+    SubmissionStatusResponse | undefined
+  >(undefined);
+  const [testProgress, setTestProgress] = React.useState<
+    { passed: number; total: number } | undefined
+  >(undefined);
+  const { data: polledStatus } = useGetSubmissionStatusQuery(
+    submissionId as number,
+    { skip: !submissionId || !isJudging || !pushFailed, pollingInterval: 1000 }
+  );
+  const submissionStatus = pushFailed ? polledStatus : pushedStatus;
+  const isSubmitting = isSubmitCodeLoading || isJudging;
+
   const handleRunCode = async () => {
     const runCustomTestCaseRequest = {
       code,
@@ -101,7 +123,12 @@ const CustomTestAndSubmission = ({
       language: language,
       user_id: user_id,
     };
-    await submitCode(submitRequestData);
+    setVerdict(undefined);
+    setPushedStatus(undefined);
+    setTestProgress(undefined);
+    setPushFailed(false);
+    const response = await submitCode(submitRequestData);
+    setIsJudging(!("error" in response));
     setTab("verdict");
   };
 
@@ -114,12 +141,36 @@ const CustomTestAndSubmission = ({
   }, [data, isError, error]);
 
   useEffect(() => {
-    if (submitResponseData) {
-      setVerdict(submitResponseData);
+    if (!submissionId || !isJudging || pushFailed) {
+      return;
+    }
+    return subscribeToSubmission(
+      submissionId,
+      ({ event, data }) => {
+        if (event === "test") {
+          setTestProgress((progress) => ({
+            passed: (progress?.passed ?? 0) + (data.passed ? 1 : 0),
+            total: data.total,
+          }));
+        } else {
+          setPushedStatus(data);
+        }
+      },
+      () => setPushFailed(true)
+    );
+  }, [submissionId, isJudging, pushFailed]);
+
+  useEffect(() => {
+    if (submissionStatus && FINISHED_STATUSES.includes(submissionStatus.status)) {
+      setIsJudging(false);
+      setVerdict({
+        verdict: submissionStatus.verdict ?? "",
+        details: submissionStatus.details ?? "",
+      });
     } else if (isSubmitCodeError) {
       setVerdict((submitCodeError as SubmitCodeError).data);
     }
-  }, [submitResponseData, isSubmitCodeError, submitCodeError]);
+  }, [submissionStatus, isSubmitCodeError, submitCodeError]);
 
   const getVerdictColor = (verdict: string) => {
     switch (verdict) {
@@ -189,13 +240,17 @@ const CustomTestAndSubmission = ({
             </TabsTrigger>
           </TabsList>
 
-          {isLoading || isSubmitCodeLoading ? (
+          {isLoading || isSubmitting ? (
             <Card className="bg-slate-950/50 border-slate-700 mt-1">
               <CardContent className="flex flex-col items-center justify-center h-32 gap-1.5">
                   <LoadingSpinner size={24} />
                   <p className="text-slate-400 text-sm">
                     {isLoading
                       ? "Running your code..."
+                      : submissionStatus && !FINISHED_STATUSES.includes(submissionStatus.status)
+                      ? testProgress
+                        ? `Judging solution (${testProgress.passed}/${testProgress.total} tests passed)...`
+                        : `Judging solution (${submissionStatus.status})...`
                       : "Submitting solution..."}
                   </p>
               </CardContent>
@@ -320,10 +375,10 @@ const CustomTestAndSubmission = ({
 
           <Button
             onClick={handleCodeSubmit}
-            disabled={isSubmitCodeLoading}
+            disabled={isSubmitting}
             className="flex-1 bg-gradient-to-r from-green-600 to-emerald-500 hover:from-green-700 hover:to-emerald-600 text-white border-0 shadow-lg transition-all duration-200 cursor-pointer"
           >
-            {isSubmitCodeLoading ? (
+            {isSubmitting ? (
               <>
                 <LoadingSpinner size={16} className="mr-2" />
                 Submitting...
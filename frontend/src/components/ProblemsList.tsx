@@ -4,7 +4,8 @@ import { useRouter } from "next/navigation";
 import React from "react";
 import { Badge } from "@/components/ui/badge";
 import { Card, CardContent } from "@/components/ui/card";
-import { Filter, Code2, Target } from "lucide-react";
+import { Filter, Code2, Target, Search } from "lucide-react";
+import { Input } from "@/components/ui/input";
 import {
   Select,
   SelectContent,
@@ -42,6 +43,7 @@ interface Problem {
 
 interface GetProblemParams {
   difficulty?: string;
+  search?: string;
 }
 
 
@@ -121,10 +123,19 @@ const columns: ColumnDef<Problem>[] = [
 const ProblemsList = () => {
   const [problemDifficulty, setProblemDifficulty] =
     React.useState<string>("All");
+  const [searchText, setSearchText] = React.useState<string>("");
+  const [search, setSearch] = React.useState<string>("");
   const router = useRouter();
 
+  // Only query once typing pauses, rather than on every keystroke.
+  React.useEffect(() => {
+    const timeout = setTimeout(() => setSearch(searchText.trim()), 300);
+    return () => clearTimeout(timeout);
+  }, [searchText]);
+
   const queryParams: GetProblemParams = {
     difficulty: problemDifficulty === "All" ? "" : problemDifficulty,
+    search,
   };
 
   const { data, isLoading, isError, isSuccess } = useGetProblemsQuery(
@@ -202,6 +213,15 @@ const ProblemsList = () => {
               </p>
             </div>
             <div className="flex items-center space-x-2">
+              <div className="relative">
+                <Search className="absolute left-3 top-1/2 -translate-y-1/2 h-4 w-4 text-slate-400" />
+                <Input
+                  value={searchText}
+                  onChange={(e) => setSearchText(e.target.value)}
+                  placeholder="Search problems"
+                  className="w-[240px] pl-9 bg-slate-800/50 border-slate-700 text-white placeholder:text-slate-500"
+                />
+              </div>
               <Filter className="h-4 w-4 text-slate-400" />
               <Select
                 value={problemDifficulty}
@@ -303,7 +323,7 @@ const ProblemsList = () => {
                                 : "No results found"}
                             </p>
                             <p className="text-slate-500 text-sm">
-                              {problemDifficulty !== "All"
+                              {problemDifficulty !== "All" || search
                                 ? "Try adjusting your search or filters"
                                 : "Problems will appear here once loaded"}
                             </p>
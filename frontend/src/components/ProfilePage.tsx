@@ -8,16 +8,17 @@ import { RootState } from "@/redux/store"
 import { useSelector } from "react-redux"
 import LoadingSpinner from "./LoadingSpinner"
 import { useEffect, useState } from "react"
-import { Submission, useGetUserSubmissionsQuery, UserSubmissionsResponse } from "@/redux/submission/submissionApi"
+import { Submission, useGetUserStatsQuery, useGetUserSubmissionsQuery, UserSubmissionsResponse } from "@/redux/submission/submissionApi"
 
 const ProfilePage = () => {
     const user = useSelector((state: RootState) => state.auth.user);
   const firstLetter = user && user.username.charAt(0).toUpperCase()
 
   const [submissions, setSubmissions] = useState<Submission[]>([]);
-  const { data, isLoading, isError, refetch } = useGetUserSubmissionsQuery(
-    user?.id
-  );
+  const { data, isLoading, isError, refetch } = useGetUserSubmissionsQuery({
+    user_id: user?.id,
+  });
+  const { data: stats } = useGetUserStatsQuery(user?.id, { skip: !user });
   useEffect(() => {
     if (data) {
       const newSubmissions = (data as UserSubmissionsResponse).submissions;
@@ -148,6 +149,31 @@ const ProfilePage = () => {
                 <div className="text-slate-300">
                   <p>Welcome to your coding profile! Track your progress and submissions here.</p>
                 </div>
+
+                {stats && (
+                  <div className="grid grid-cols-2 md:grid-cols-5 gap-3 pt-2">
+                    <div className="p-3 bg-slate-800/30 rounded-lg">
+                      <div className="text-xl font-bold text-white">{stats.problems_solved}</div>
+                      <div className="text-xs text-slate-400">Solved</div>
+                    </div>
+                    <div className="p-3 bg-slate-800/30 rounded-lg">
+                      <div className="text-xl font-bold text-white">{stats.acceptance_rate}%</div>
+                      <div className="text-xs text-slate-400">Acceptance</div>
+                    </div>
+                    <div className="p-3 bg-slate-800/30 rounded-lg">
+                      <div className="text-xl font-bold text-green-400">{stats.solved_by_difficulty.Easy}</div>
+                      <div className="text-xs text-slate-400">Easy</div>
+                    </div>
+                    <div className="p-3 bg-slate-800/30 rounded-lg">
+                      <div className="text-xl font-bold text-yellow-400">{stats.solved_by_difficulty.Medium}</div>
+                      <div className="text-xs text-slate-400">Medium</div>
+                    </div>
+                    <div className="p-3 bg-slate-800/30 rounded-lg">
+                      <div className="text-xl font-bold text-red-400">{stats.solved_by_difficulty.Hard}</div>
+                      <div className="text-xs text-slate-400">Hard</div>
+                    </div>
+                  </div>
+                )}
               </div>
             </div>
           </CardContent>
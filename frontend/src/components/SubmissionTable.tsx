@@ -21,13 +21,23 @@ import { Badge } from "./ui/badge";
 import { Submission } from "@/redux/submission/submissionApi";
 import Link from "next/link";
 import CodeDisplay from "./CodeDisplay";
+import { Button } from "./ui/button";
 
 type Props = {
   submissions: Submission[];
   problemSlug?: string;
+  hasMore?: boolean;
+  isLoadingMore?: boolean;
+  onLoadMore?: () => void;
 };
 
-const SubmissionTable = ({ submissions, problemSlug }: Props) => {
+const SubmissionTable = ({
+  submissions,
+  problemSlug,
+  hasMore,
+  isLoadingMore,
+  onLoadMore,
+}: Props) => {
   const formatTimestamp = (timestamp: string) => {
     const date = new Date(timestamp);
     return {
@@ -137,7 +147,8 @@ const SubmissionTable = ({ submissions, problemSlug }: Props) => {
             <FileText className="h-5 w-5 text-blue-400" />
             <span>Submission History</span>
             <Badge className="bg-blue-500/10 text-blue-400 border-blue-500/20 ml-2">
-              {submissions ? submissions.length : 0} results
+              {submissions ? submissions.length : 0}
+              {hasMore ? "+" : ""} results
             </Badge>
           </CardTitle>
         </CardHeader>
@@ -238,13 +249,15 @@ const SubmissionTable = ({ submissions, problemSlug }: Props) => {
                             </div>
                             <div className="text-slate-300 text-xs">
                               <span className="text-slate-400">Memory:</span>{" "}
-                              {"-----"}
+                              {submission.memory_taken != null
+                                ? `${submission.memory_taken}KB`
+                                : "-----"}
                             </div>
                           </div>
                         </TableCell>
 
                         <TableCell className="py-4">
-                          <CodeDisplay code={submission.code} problem_name={submission.problem_name} language={submission.language} />
+                          <CodeDisplay submission_id={submission.id} problem_name={submission.problem_name} language={submission.language} />
                         </TableCell>
                       </TableRow>
                     );
@@ -269,6 +282,18 @@ const SubmissionTable = ({ submissions, problemSlug }: Props) => {
               </TableBody>
             </Table>
           </div>
+          {hasMore && onLoadMore && (
+            <div className="flex justify-center pt-4">
+              <Button
+                variant="ghost"
+                onClick={onLoadMore}
+                disabled={isLoadingMore}
+                className="text-slate-400 hover:text-blue-400 hover:bg-blue-500/10 cursor-pointer"
+              >
+                {isLoadingMore ? "Loading..." : "Load more"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
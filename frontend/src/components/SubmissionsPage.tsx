@@ -5,6 +5,7 @@ import { Card, CardContent } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { XCircle, RefreshCw } from "lucide-react";
 import {
+  getCursor,
   Submission,
   useGetUserSubmissionsQuery,
   UserSubmissionsResponse,
@@ -17,17 +18,20 @@ import SubmissionTable from "./SubmissionTable";
 const SubmissionsPage = () => {
   const user = useSelector((state: RootState) => state.auth.user);
   const [submissions, setSubmissions] = useState<Submission[]>([]);
-  const { data, isLoading, isError, refetch } = useGetUserSubmissionsQuery(
-    user?.id
-  );
+  const [cursor, setCursor] = useState<string | null>(null);
+  const { data, isLoading, isFetching, isError, refetch } =
+    useGetUserSubmissionsQuery({ user_id: user?.id, cursor });
   useEffect(() => {
     if (data) {
       const newSubmissions = (data as UserSubmissionsResponse).submissions;
-      setSubmissions(newSubmissions);
+      // The first page replaces the list, later pages are appended to it.
+      setSubmissions((previous) =>
+        cursor ? [...previous, ...newSubmissions] : newSubmissions
+      );
     }
-  }, [data]);
+  }, [data]); // eslint-disable-line react-hooks/exhaustive-deps
 
-  if (isLoading) {
+  if (isLoading && !cursor) {
     return (
       <div className="h-[calc(100vh-4.6rem)] bg-slate-950 flex flex-col items-center justify-center">
         <LoadingSpinner size={50} />
@@ -65,7 +69,12 @@ const SubmissionsPage = () => {
 
   return (
     <div className="min-h-screen bg-slate-950 py-8">
-      <SubmissionTable submissions={submissions} />
+      <SubmissionTable
+        submissions={submissions}
+        hasMore={Boolean(data?.next)}
+        isLoadingMore={isFetching}
+        onLoadMore={() => setCursor(getCursor(data?.next ?? null))}
+      />
     </div>
   );
 };
@@ -8,6 +8,7 @@ import {
   RefreshCw,
 } from "lucide-react";
 import {
+  getCursor,
   Submission,
   useGetUserSubmissionByProblemIdQuery,
   UserSubmissionsResponse,
@@ -24,20 +25,25 @@ type Props = {
 const UserProblemSubmissions = ({problemSlug}: Props) => {
   const user = useSelector((state: RootState) => state.auth.user);
   const [submissions, setSubmissions] = useState<Submission[]>([]);
-  const { data, isLoading, isError, refetch } = useGetUserSubmissionByProblemIdQuery(
+  const [cursor, setCursor] = useState<string | null>(null);
+  const { data, isLoading, isFetching, isError, refetch } = useGetUserSubmissionByProblemIdQuery(
     {
       user_id: user?.id,
       problem_slug: encodeURIComponent(problemSlug),
+      cursor,
     }
   );
   useEffect(() => {
     if (data) {
       const newSubmissions = (data as UserSubmissionsResponse).submissions;
-      setSubmissions(newSubmissions);
+      // The first page replaces the list, later pages are appended to it.
+      setSubmissions((previous) =>
+        cursor ? [...previous, ...newSubmissions] : newSubmissions
+      );
     }
-  }, [data]);
+  }, [data]); // eslint-disable-line react-hooks/exhaustive-deps
 
-  if (isLoading) {
+  if (isLoading && !cursor) {
     return (
       <div className="min-h-screen bg-slate-950 flex flex-col items-center justify-center">
           <LoadingSpinner size={37} />
@@ -75,7 +81,13 @@ const UserProblemSubmissions = ({problemSlug}: Props) => {
 
   return (
     <div className="min-h-screen bg-slate-950 py-8">
-      <SubmissionTable submissions={submissions} problemSlug={problemSlug}  />
+      <SubmissionTable
+        submissions={submissions}
+        problemSlug={problemSlug}
+        hasMore={Boolean(data?.next)}
+        isLoadingMore={isFetching}
+        onLoadMore={() => setCursor(getCursor(data?.next ?? null))}
+      />
     </div>
   );
 }
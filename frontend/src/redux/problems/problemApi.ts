@@ -15,6 +15,7 @@ export interface Problem {
 
 export interface GetProblemParams {
   difficulty?: string;
+  search?: string;
 }
 
 export interface GetProblemDetialParam {
@@ -53,6 +54,9 @@ const problemApi = createApi({
         if (params.difficulty) {
           queryParams.append("difficulty", params.difficulty);
         }
+        if (params.search) {
+          queryParams.append("search", params.search);
+        }
         const queryString = queryParams.toString();
         if (queryString) {
           url = `${url}?${queryString}`;
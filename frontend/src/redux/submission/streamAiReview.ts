@@ -0,0 +1,55 @@
+import { getAIReviewRequest } from "./submissionApi";
+
+// Reads the server-sent events of `ai-review/stream/` and hands every piece of text
+// to `onText` as it arrives. Resolves once the stream is done, rejects on an error event.
+export const streamAiReview = async (
+  body: getAIReviewRequest,
+  onText: (text: string) => void,
+  signal?: AbortSignal
+): Promise<void> => {
+  const access =
+    typeof window !== "undefined" ? localStorage.getItem("access") : null;
+  const response = await fetch(
+    `${(process.env.NEXT_PUBLIC_API_URL ?? "").replace(/\/$/, "")}/ai-review/stream/`,
+    {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        ...(access ? { Authorization: `Bearer ${access}` } : {}),
+      },
+      body: JSON.stringify(body),
+      signal,
+    }
+  );
+  if (!response.ok || !response.body) {
+    throw new Error(`AI review failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) {
+      return;
+    }
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split("\n\n");
+    buffer = events.pop() ?? "";
+    for (const event of events) {
+      const lines = event.split("\n");
+      const name = lines.find((line) => line.startsWith("event: "))?.slice(7);
+      const data = lines.find((line) => line.startsWith("data: "))?.slice(6);
+      const payload = data ? JSON.parse(data) : {};
+      if (name === "done") {
+        return;
+      }
+      if (name === "error") {
+        throw new Error(payload.error);
+      }
+      if (payload.text) {
+        onText(payload.text);
+      }
+    }
+  }
+};
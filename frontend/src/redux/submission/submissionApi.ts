@@ -9,15 +9,24 @@ interface GetSavedCodeParams {
 
 interface SavedCodeResponse {
   code: string;
+  version: number;
 }
 
-interface SavedCodeRequest {
-  code: string;
+// Either the full `code`, or a `patch` of [start, end, text] edits to the code saved at
+// `base_version`, each replacing the text between the two offsets.
+export interface SavedCodeRequest {
+  code?: string;
+  patch?: [number, number, string][];
+  base_version?: number;
   user_id: number | undefined;
   problem_id: number;
   language: string;
 }
 
+interface SavedCodeResult {
+  version: number;
+}
+
 interface RunCustomTestCaseRequest {
   code?: string;
   user_input: string;
@@ -36,8 +45,15 @@ export interface SubmitCodeRequest {
 }
 
 export interface SubmitCodeResponse {
-  verdict: string;
-  details: string;
+  submission_id: number;
+  status: string;
+}
+
+export interface SubmissionStatusResponse {
+  submission_id: number;
+  status: string;
+  verdict?: string;
+  details?: string;
 }
 
 export interface getAIReviewRequest {
@@ -56,7 +72,6 @@ export interface getAiReviewResponse {
 export interface Submission {
   id: number;
   problem_name: string;
-  code: string;
   language: string;
   verdict: string;
   problem_id: number;
@@ -67,13 +82,38 @@ export interface Submission {
 
 export interface UserSubmissionsResponse {
   submissions: Submission[];
+  next: string | null;
+  previous: string | null;
+}
+
+export interface SubmissionCodeResponse {
+  id: number;
+  code: string;
+  language: string;
+}
+
+export interface UserStatsResponse {
+  user_id: number;
+  problems_solved: number;
+  problems_attempted: number;
+  attempts: number;
+  accepted_attempts: number;
+  acceptance_rate: number;
+  solved_by_difficulty: Record<"Easy" | "Medium" | "Hard", number>;
 }
 
+// The list endpoints return full page links; the query hooks take just their cursor.
+export const getCursor = (link: string | null) =>
+  link ? new URL(link).searchParams.get("cursor") : null;
+
+const withCursor = (url: string, cursor?: string | null) =>
+  cursor ? `${url}?cursor=${encodeURIComponent(cursor)}` : url;
+
 const submissionApi = createApi({
   reducerPath: "submissionApi",
   baseQuery: customBaseQuery,
   endpoints: (builder) => ({
-    saveCode: builder.mutation<void, SavedCodeRequest>({
+    saveCode: builder.mutation<SavedCodeResult, SavedCodeRequest>({
       query: (body) => ({
         url: "save-code/",
         method: "POST",
@@ -118,6 +158,12 @@ const submissionApi = createApi({
         body,
       }),
     }),
+    getSubmissionStatus: builder.query<SubmissionStatusResponse, number>({
+      query: (submission_id) => ({
+        url: `execute/status/${submission_id}`,
+        method: "GET",
+      }),
+    }),
     getAiReview: builder.mutation<getAiReviewResponse, getAIReviewRequest>({
       query: (body) => ({
         url: "ai-review/",
@@ -125,18 +171,33 @@ const submissionApi = createApi({
         body,
       }),
     }),
-    getUserSubmissions: builder.query<UserSubmissionsResponse, number | undefined>({
-      query: (user_id: number) => ({
-        url: `/submissions/${user_id}`,
+    getUserSubmissions: builder.query<
+      UserSubmissionsResponse,
+      { user_id: number | undefined; cursor?: string | null }
+    >({
+      query: ({ user_id, cursor }) => ({
+        url: withCursor(`/submissions/${user_id}`, cursor),
         method: "GET",
       }),
     }),
     getUserSubmissionByProblemId: builder.query<
       UserSubmissionsResponse,
-      { user_id: number | undefined; problem_slug: string }
+      { user_id: number | undefined; problem_slug: string; cursor?: string | null }
     >({
-      query: ({ user_id, problem_slug }) => ({
-        url: `/submissions/${user_id}/${problem_slug}`,
+      query: ({ user_id, problem_slug, cursor }) => ({
+        url: withCursor(`/submissions/${user_id}/${problem_slug}`, cursor),
+        method: "GET",
+      }),
+    }),
+    getSubmissionCode: builder.query<SubmissionCodeResponse, number>({
+      query: (submission_id) => ({
+        url: `/submissions/code/${submission_id}`,
+        method: "GET",
+      }),
+    }),
+    getUserStats: builder.query<UserStatsResponse, number | undefined>({
+      query: (user_id) => ({
+        url: `/stats/${user_id}`,
         method: "GET",
       }),
     }),
@@ -148,9 +209,12 @@ export const {
   useGetSavedCodeQuery,
   useRunCustomTestCaseMutation,
   useSubmitCodeMutation,
+  useGetSubmissionStatusQuery,
   useGetAiReviewMutation,
   useGetUserSubmissionsQuery,
   useGetUserSubmissionByProblemIdQuery,
+  useGetSubmissionCodeQuery,
+  useGetUserStatsQuery,
 } = submissionApi;
 
 export default submissionApi;
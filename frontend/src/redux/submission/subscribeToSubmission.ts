@@ -0,0 +1,58 @@
+import { SubmissionStatusResponse } from "./submissionApi";
+
+export interface SubmissionTestResult {
+  submission_id: number;
+  test: number;
+  total: number;
+  passed: boolean;
+  execution_time: number;
+  memory_used: number;
+}
+
+export type SubmissionEvent =
+  | { event: "status" | "verdict"; data: SubmissionStatusResponse }
+  | { event: "test"; data: SubmissionTestResult };
+
+// Opens a WebSocket on `execute/events/<id>` and hands each judge event to `onEvent`
+// as it happens. `onFailure` is called if the socket closes before the verdict arrives,
+// e.g. when the backend is not served over ASGI. Returns a function that closes the socket.
+export const subscribeToSubmission = (
+  submissionId: number,
+  onEvent: (event: SubmissionEvent) => void,
+  onFailure: () => void
+): (() => void) => {
+  const access =
+    typeof window !== "undefined" ? localStorage.getItem("access") : null;
+  const baseUrl = (process.env.NEXT_PUBLIC_API_URL ?? "")
+    .replace(/\/$/, "")
+    .replace(/^http/, "ws");
+  let finished = false;
+  let socket: WebSocket;
+  try {
+    socket = new WebSocket(
+      `${baseUrl}/execute/events/${submissionId}?token=${encodeURIComponent(access ?? "")}`
+    );
+  } catch {
+    onFailure();
+    return () => {};
+  }
+
+  socket.onmessage = (message) => {
+    const event = JSON.parse(message.data) as SubmissionEvent;
+    if (event.event === "verdict") {
+      finished = true;
+    }
+    onEvent(event);
+  };
+  socket.onclose = () => {
+    if (!finished) {
+      finished = true;
+      onFailure();
+    }
+  };
+
+  return () => {
+    finished = true;
+    socket.close();
+  };
+};